@@ -0,0 +1,351 @@
+"""
+Benchmark suite for bokcolmaps. To run at the command line enter:
+python run_benchmarks.py --output results.json
+
+Measures import time, constructor wall time, peak (Python heap) memory,
+serialised document size, update latency and slicer section latency over a
+range of grid sizes, z depths and spot counts. Results are written as JSON
+so they can be compared between releases with:
+python run_benchmarks.py --output new.json --compare old.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from importlib import metadata
+
+import numpy
+
+from bokeh.document import Document
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.ColourMapLPSlider import ColourMapLPSlider
+from bokcolmaps.SpotPlot import SpotPlot
+from bokcolmaps.CMSlicer2D import CMSlicer2D
+from bokcolmaps.CMSlicer3D import CMSlicer3D
+
+
+def make_grid_data(nx: int, ny: int, nz: int, seed: int=0) -> tuple:
+
+    """
+    Generate reproducible gridded data
+    args...
+        nx: number of x coordinates
+        ny: number of y coordinates
+        nz: number of z coordinates
+    kwargs...
+        seed: random number generator seed
+    """
+
+    rng = numpy.random.default_rng(seed)
+
+    x = numpy.linspace(0, 1, nx)
+    y = numpy.linspace(0, 1, ny)
+    z = numpy.arange(nz, dtype=float)
+    dm = rng.random((nz, ny, nx))
+
+    return x, y, z, dm
+
+
+def make_spot_data(ns: int, nz: int, seed: int=0) -> tuple:
+
+    """
+    Generate reproducible spot data
+    args...
+        ns: number of spots
+        nz: number of z coordinates
+    kwargs...
+        seed: random number generator seed
+    """
+
+    rng = numpy.random.default_rng(seed)
+
+    x = rng.random(ns)
+    y = rng.random(ns)
+    z = numpy.arange(nz, dtype=float)
+    dm = rng.random((nz, ns))
+
+    return x, y, z, dm
+
+
+def warm_up() -> None:
+
+    """
+    Construct each benchmarked class once with small data (untimed), so that
+    the deferred imports (bokeh.plotting, interpg) and first-call compilation
+    are not counted in the construction time and peak memory
+    """
+
+    x, y, z, dm = make_grid_data(4, 4, 2)
+    ColourMap(x, y, z, dm)
+    ColourMapLPSlider(x, y, z, dm)
+    CMSlicer2D(x, y, numpy.array([0]), dm[0])
+    CMSlicer3D(x, y, z, dm)
+
+    x, y, z, dm = make_spot_data(4, 2)
+    SpotPlot(x, y, z, dm)
+
+
+def measure_construction(cls: type, *args: tuple, **kwargs: dict) -> tuple:
+
+    """
+    Construct an instance of cls, returning it with the wall time (s) of an
+    untraced construction and the peak traced memory (bytes) of a separate
+    traced construction, as tracing slows construction several times
+    (call warm_up first)
+    """
+
+    tracemalloc.start()
+    cls(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    obj = cls(*args, **kwargs)
+    dt = time.perf_counter() - t0
+
+    return obj, dt, peak
+
+
+def measure_latency(func: callable, calls: list) -> float:
+
+    """
+    Mean wall time (s) of func over a list of argument tuples
+    """
+
+    t0 = time.perf_counter()
+    for args in calls:
+        func(*args)
+
+    return (time.perf_counter() - t0) / max(len(calls), 1)
+
+
+def document_bytes(model: object) -> int:
+
+    """
+    Size (bytes) of the JSON serialised document containing the model
+    """
+
+    doc = Document()
+    doc.add_root(model)
+
+    return len(json.dumps(doc.to_json(deferred=False)))
+
+
+def zind_calls(nz: int, ncalls: int) -> list:
+
+    """
+    Cycle of z index arguments for the update benchmarks
+    """
+
+    return [(n % nz,) for n in range(ncalls)]
+
+
+def bench_colourmap(grids: list, depths: list, ncalls: int) -> list:
+
+    """
+    Benchmark the ColourMap and ColourMapLPSlider classes
+    """
+
+    results = []
+
+    for n in grids:
+        for nz in depths:
+
+            x, y, z, dm = make_grid_data(n, n, nz)
+
+            cm, dt, peak = measure_construction(ColourMap, x, y, z, dm)
+            latency = measure_latency(cm.update_image, zind_calls(nz, ncalls))
+            results.append({'benchmark': 'ColourMap', 'nx': n, 'ny': n, 'nz': nz,
+                            'construct_s': dt, 'peak_bytes': peak,
+                            'document_bytes': document_bytes(cm),
+                            'update_image_s': latency})
+
+            cm, dt, peak = measure_construction(ColourMapLPSlider, x, y, z, dm)
+            latency = measure_latency(cm.cmaplp.cmplot.update_image, zind_calls(nz, ncalls))
+            results.append({'benchmark': 'ColourMapLPSlider', 'nx': n, 'ny': n, 'nz': nz,
+                            'construct_s': dt, 'peak_bytes': peak,
+                            'document_bytes': document_bytes(cm),
+                            'update_image_s': latency})
+
+    return results
+
+
+def bench_spotplot(spots: list, depths: list, ncalls: int) -> list:
+
+    """
+    Benchmark the SpotPlot class
+    """
+
+    results = []
+
+    for ns in spots:
+        for nz in depths:
+
+            x, y, z, dm = make_spot_data(ns, nz)
+            if nz == 1:
+                dm = dm[0]  # SpotPlot expects 1D data for a single z value
+
+            sp, dt, peak = measure_construction(SpotPlot, x, y, z, dm)
+            calls = [('value', 0, zind) for zind, in zind_calls(nz, ncalls)]
+            latency = measure_latency(sp.input_change, calls)
+            results.append({'benchmark': 'SpotPlot', 'ns': ns, 'nz': nz,
+                            'construct_s': dt, 'peak_bytes': peak,
+                            'document_bytes': document_bytes(sp),
+                            'input_change_s': latency})
+
+    return results
+
+
+def bench_slicer(grids: list, depths: list, ncalls: int) -> list:
+
+    """
+    Benchmark the CMSlicer2D and CMSlicer3D section calculations
+    """
+
+    results = []
+
+    for n in grids:
+
+        x, y, z, dm = make_grid_data(n, n, 1)
+
+        sl, dt, peak = measure_construction(CMSlicer2D, x, y, numpy.array([0]), dm[0])
+        latency = measure_latency(sl._change_slice, [()] * ncalls)
+        results.append({'benchmark': 'CMSlicer2D', 'nx': n, 'ny': n, 'nz': 1,
+                        'construct_s': dt, 'peak_bytes': peak,
+                        'change_slice_s': latency})
+
+        for nz in depths:
+
+            x, y, z, dm = make_grid_data(n, n, nz)
+
+            sl, dt, peak = measure_construction(CMSlicer3D, x, y, z, dm)
+            latency = measure_latency(sl._change_slice, [()] * ncalls)
+            results.append({'benchmark': 'CMSlicer3D', 'nx': n, 'ny': n, 'nz': nz,
+                            'construct_s': dt, 'peak_bytes': peak,
+                            'change_slice_s': latency})
+
+    return results
+
+
+def bench_imports(modules: list, repeats: int) -> list:
+
+    """
+    Benchmark the import time of each module in a fresh interpreter
+    (minimum over the repeats)
+    """
+
+    results = []
+
+    for module in modules:
+
+        code = 'import time; t0 = time.perf_counter(); import ' + module + '; print(time.perf_counter() - t0)'
+        times = [float(subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                      text=True, check=True).stdout)
+                 for _ in range(repeats)]
+        results.append({'benchmark': 'import', 'module': module, 'import_s': min(times)})
+
+    return results
+
+
+def get_environment() -> dict:
+
+    """
+    Versions of the packages that affect the results
+    """
+
+    env = {'python': platform.python_version(), 'machine': platform.machine()}
+    for pkg in ['bokcolmaps', 'bokeh', 'numpy', 'interpg']:
+        try:
+            env[pkg] = metadata.version(pkg)
+        except metadata.PackageNotFoundError:
+            env[pkg] = None
+
+    return env
+
+
+def result_key(result: dict) -> tuple:
+
+    """
+    Key identifying a benchmark case (i.e. everything except the measurements)
+    """
+
+    return tuple((k, v) for k, v in sorted(result.items()) if k in ['benchmark', 'module', 'nx', 'ny', 'nz', 'ns'])
+
+
+def compare_results(new: dict, old: dict) -> list:
+
+    """
+    Ratios (new/old) of each measurement for cases present in both result sets
+    """
+
+    old_cases = {result_key(r): r for r in old['results']}
+
+    ratios = []
+    for r in new['results']:
+        o = old_cases.get(result_key(r))
+        if o is None:
+            continue
+        ratio = dict(result_key(r))
+        for k, v in r.items():
+            if (k not in ratio) and o.get(k):
+                ratio[k] = v / o[k]
+        ratios.append(ratio)
+
+    return ratios
+
+
+def main() -> None:
+
+    """
+    Run the benchmarks and write (and optionally compare) the results
+    """
+
+    parser = argparse.ArgumentParser(description='Run the bokcolmaps benchmarks')
+    parser.add_argument('--grids', type=int, nargs='+', default=[50, 200, 500],
+                        help='grid sizes (number of x and y coordinates)')
+    parser.add_argument('--depths', type=int, nargs='+', default=[1, 10, 50],
+                        help='z depths')
+    parser.add_argument('--spots', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='spot counts')
+    parser.add_argument('--calls', type=int, default=20,
+                        help='number of calls per update latency measurement')
+    parser.add_argument('--modules', nargs='+',
+                        default=['bokcolmaps', 'bokcolmaps.get_min_max', 'bokcolmaps.read_colourmap',
+                                 'bokcolmaps.ColourMap', 'bokcolmaps.ColourMapLPSlider', 'bokcolmaps.CMSlicer3D'],
+                        help='modules for the import time benchmark')
+    parser.add_argument('--import-repeats', type=int, default=3,
+                        help='number of fresh interpreters per import time measurement')
+    parser.add_argument('--output', default='bench_output.json',
+                        help='results file')
+    parser.add_argument('--compare', default=None,
+                        help='previous results file to compare against')
+    args = parser.parse_args()
+
+    results = bench_imports(args.modules, args.import_repeats)
+
+    warm_up()
+
+    results += bench_colourmap(args.grids, args.depths, args.calls) + \
+        bench_spotplot(args.spots, args.depths, args.calls) + \
+        bench_slicer(args.grids, [d for d in args.depths if d > 1], max(args.calls // 10, 1))
+
+    output = {'environment': get_environment(), 'results': results}
+
+    with open(args.output, 'wt') as f:
+        json.dump(output, f, indent=1)
+
+    if args.compare is not None:
+        with open(args.compare, 'rt') as f:
+            old = json.load(f)
+        for ratio in compare_results(output, old):
+            print(ratio)
+
+
+if __name__ == '__main__':
+    main()
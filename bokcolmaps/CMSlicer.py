@@ -19,6 +19,7 @@ from bokcolmaps.ColourMapLPSlider import ColourMapLPSlider
 from bokcolmaps.ColourMap import ColourMap
 
 from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
 from bokcolmaps.check_kwargs import check_kwargs
 
 
@@ -51,17 +52,22 @@ class CMSlicer(Row, DataModel):
             hoverdisp: display the hover tool readout if True
             padleft: padding (pixels) to left of slice plot (default 0)
             padabove: padding (pixels) above slice plot (default 0)
+            cscale: colour scale ('linear', 'eqhist', 'log' or 'symlog')
+            autoscale: autoscaling mode ('slice', 'global' or 'window:N')
+            linthresh: scale of the linear region for the symlog colour scale
+        and the kwargs in get_common_kwargs (output_backend also applies to the slice plot)
         """
 
         super().__init__()
 
         self._extra_kwargs = ['cmheight', 'cmwidth', 'spheight', 'spwidth', 'lpheight', 'lpwidth', 'splab', 'revz', 'hoverdisp', 'sphoverdisp',
-                              'padleft', 'padabove', 'padleftlp', 'padabovelp']
+                              'padleft', 'padabove', 'padleftlp', 'padabovelp', 'cscale', 'autoscale', 'linthresh']
 
         check_kwargs(kwargs, extra_kwargs=self._extra_kwargs)
 
         palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
             rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
 
         cmheight = kwargs.get('cmheight', 575)
         cmwidth = kwargs.get('cmwidth', 500)
@@ -72,6 +78,9 @@ class CMSlicer(Row, DataModel):
         hoverdisp = kwargs.get('hoverdisp', True)
         padleft = kwargs.get('padleft', 0)
         padabove = kwargs.get('padabove', 0)
+        cscale = kwargs.get('cscale', 'linear')
+        autoscale = kwargs.get('autoscale', 'slice')
+        linthresh = kwargs.get('linthresh', 1)
 
         x0, x1 = x[0], x[-1]
         ymean = (y[0] + y[-1]) / 2
@@ -85,7 +94,10 @@ class CMSlicer(Row, DataModel):
                                              'cmheight': [cmheight], 'cmwidth': [cmwidth],
                                              'spheight': [spheight], 'spwidth': [spwidth],
                                              'padleft': [padleft], 'padabove': [padabove],
-                                             'revz': [revz], 'hoverdisp': [hoverdisp]})
+                                             'revz': [revz], 'hoverdisp': [hoverdisp], 'cscale': [cscale],
+                                             'autoscale': [autoscale],
+                                             'linthresh': [linthresh],
+                                             'output_backend': [output_backend]})
 
         self._is_selecting = False
 
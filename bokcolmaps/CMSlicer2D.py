@@ -9,12 +9,10 @@ from bokeh.models.layouts import Column, Row
 from bokeh.models.widgets import Div
 from bokeh.events import Tap
 from bokeh.core.properties import Instance
-from bokeh.plotting import figure
 from bokeh.models.glyphs import Line
 
-from interpg.interp_2d_line import interp_2d_line
-
 from bokcolmaps.CMSlicer import CMSlicer
+from bokcolmaps.Instrumentation import Instrumentation
 from bokcolmaps.ColourMap import ColourMap
 
 
@@ -34,6 +32,8 @@ class CMSlicer2D(CMSlicer, DataModel):
             dm: 2D NumPy array of the data for display, y.size, x.size
         """
 
+        from bokeh.plotting import figure
+
         super().__init__(x, y, **kwargs)
 
         params = self.cmap_params.data
@@ -45,7 +45,10 @@ class CMSlicer2D(CMSlicer, DataModel):
                               rmin=params['rmin'][0], rmax=params['rmax'][0],
                               xran=params['xran'][0], yran=params['yran'][0],
                               hover=params['hoverdisp'][0],
-                              alpha=params['alpha'][0], nan_colour=params['nan_colour'][0])
+                              alpha=params['alpha'][0], nan_colour=params['nan_colour'][0],
+                              cscale=params['cscale'][0], autoscale=params['autoscale'][0],
+                              linthresh=params['linthresh'][0],
+                              output_backend=params['output_backend'][0])
 
         self.cmap.plot.on_event(Tap, self.toggle_select)
 
@@ -70,40 +73,49 @@ class CMSlicer2D(CMSlicer, DataModel):
         Change the slice displayed in the separate figure
         """
 
-        c_i, r_i = self.get_interp_coords(self.cmap.datasrc)
+        from interpg.interp_2d_line import interp_2d_line  # Deferred as slow to import
+        from bokeh.plotting import figure
+
+        with Instrumentation.timer('CMSlicer2D._change_slice') as timer:
+
+            c_i, r_i = self.get_interp_coords(self.cmap.datasrc)
+
+            x = self.cmap.datasrc.data['x'][0]
+            y = self.cmap.datasrc.data['y'][0]
 
-        x = self.cmap.datasrc.data['x'][0]
-        y = self.cmap.datasrc.data['y'][0]
+            dm = self.cmap.get_dm()
+            dm = numpy.reshape(dm, [y.size, x.size])
 
-        dm = self.cmap.datasrc.data['dm'][0]
-        dm = numpy.reshape(dm, [y.size, x.size])
+            dm_i, z_i = interp_2d_line(y, x, dm, c_i)
 
-        dm_i, z_i = interp_2d_line(y, x, dm, c_i)
+            iplot = figure(x_axis_label=self.cmap_params.data['splab'][0],
+                           y_axis_label=self.cmap_params.data['dmlab'][0],
+                           height=self.cmap_params.data['spheight'][0], width=self.cmap_params.data['spwidth'][0],
+                           x_range=[r_i[0], r_i[-1]], toolbar_location='right',
+                           output_backend=self.cmap_params.data['output_backend'][0])
 
-        iplot = figure(x_axis_label=self.cmap_params.data['splab'][0], y_axis_label=self.cmap_params.data['dmlab'][0],
-                       height=self.cmap_params.data['spheight'][0], width=self.cmap_params.data['spwidth'][0],
-                       x_range=[r_i[0], r_i[-1]], toolbar_location='right')
+            iplot.line(r_i, dm_i, line_color='blue', line_width=2, line_alpha=1)
 
-        iplot.line(r_i, dm_i, line_color='blue', line_width=2, line_alpha=1)
+            iplot.y_range.start = numpy.min(dm_i[numpy.isfinite(dm_i)])
+            iplot.y_range.end = numpy.max(dm_i[numpy.isfinite(dm_i)])
 
-        iplot.y_range.start = numpy.min(dm_i[numpy.isfinite(dm_i)])
-        iplot.y_range.end = numpy.max(dm_i[numpy.isfinite(dm_i)])
+            if self.cmap_params.data['revz'][0]:
+                iplot.y_range.start, iplot.y_range.end = iplot.y_range.end, iplot.y_range.start
 
-        if self.cmap_params.data['revz'][0]:
-            iplot.y_range.start, iplot.y_range.end = iplot.y_range.end, iplot.y_range.start
+            iplot.title.text = self.cmap_params.data['dmlab'][0] + ' along track'
 
-        iplot.title.text = self.cmap_params.data['dmlab'][0] + ' along track'
+            iplot.title.text_font = 'garamond'
+            iplot.title.text_font_size = '12pt'
+            iplot.title.text_font_style = 'bold'
+            iplot.title.align = 'center'
 
-        iplot.title.text_font = 'garamond'
-        iplot.title.text_font_size = '12pt'
-        iplot.title.text_font_style = 'bold'
-        iplot.title.align = 'center'
+            iplot.xaxis.axis_label_text_font = 'garamond'
+            iplot.xaxis.axis_label_text_font_size = '10pt'
+            iplot.xaxis.axis_label_text_font_style = 'bold'
+            iplot.yaxis.axis_label_text_font = 'garamond'
+            iplot.yaxis.axis_label_text_font_size = '10pt'
+            iplot.yaxis.axis_label_text_font_style = 'bold'
 
-        iplot.xaxis.axis_label_text_font = 'garamond'
-        iplot.xaxis.axis_label_text_font_size = '10pt'
-        iplot.xaxis.axis_label_text_font_style = 'bold'
-        iplot.yaxis.axis_label_text_font = 'garamond'
-        iplot.yaxis.axis_label_text_font_size = '10pt'
-        iplot.yaxis.axis_label_text_font_style = 'bold'
+            self.children[1].children[1].children[1] = iplot
 
-        self.children[1].children[1].children[1] = iplot
+            timer.nbytes = dm_i.nbytes
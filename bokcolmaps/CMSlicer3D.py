@@ -9,12 +9,10 @@ from bokeh.models.layouts import Column, Row
 from bokeh.models.widgets import Div
 from bokeh.events import Tap
 from bokeh.core.properties import Instance
-from bokeh.plotting import figure
 from bokeh.models.glyphs import Line
 
-from interpg.interp_2d_line import interp_2d_line
-
 from bokcolmaps.CMSlicer import CMSlicer
+from bokcolmaps.Instrumentation import Instrumentation
 from bokcolmaps.ColourMapLPSlider import ColourMapLPSlider
 from bokcolmaps.ColourMap import ColourMap
 
@@ -42,6 +40,8 @@ class CMSlicer3D(CMSlicer, DataModel):
             padabovelp: padding (pixels) above ColourMapLP line plot (default 0)
         """
 
+        from bokeh.plotting import figure
+
         super().__init__(x, y, **kwargs)
 
         params = self.cmap_params.data
@@ -63,7 +63,10 @@ class CMSlicer3D(CMSlicer, DataModel):
                                       revz=params['revz'][0], hoverdisp=params['hoverdisp'][0],
                                       scbutton=params['scbutton'][0],
                                       alpha=params['alpha'][0], nan_colour=params['nan_colour'][0],
-                                      padleft=params['padleftlp'][0], padabove=params['padabovelp'][0])
+                                      padleft=params['padleftlp'][0], padabove=params['padabovelp'][0],
+                                      cscale=params['cscale'][0], autoscale=params['autoscale'][0],
+                                      linthresh=params['linthresh'][0],
+                                      output_backend=params['output_backend'][0])
 
         self.cmap.cmaplp.cmplot.plot.on_event(Tap, self.toggle_select)
 
@@ -88,28 +91,38 @@ class CMSlicer3D(CMSlicer, DataModel):
         Change the slice displayed in the separate line plot
         """
 
-        c_i, r_i = self.get_interp_coords(self.cmap.cmaplp.cmplot.datasrc)
+        from interpg.interp_2d_line import interp_2d_line  # Deferred as slow to import
+
+        with Instrumentation.timer('CMSlicer3D._change_slice') as timer:
+
+            c_i, r_i = self.get_interp_coords(self.cmap.cmaplp.cmplot.datasrc)
+
+            x = self.cmap.cmaplp.cmplot.datasrc.data['x'][0]
+            y = self.cmap.cmaplp.cmplot.datasrc.data['y'][0]
+            z = self.cmap.cmaplp.cmplot.datasrc.data['z'][0]
 
-        x = self.cmap.cmaplp.cmplot.datasrc.data['x'][0]
-        y = self.cmap.cmaplp.cmplot.datasrc.data['y'][0]
-        z = self.cmap.cmaplp.cmplot.datasrc.data['z'][0]
+            dm = self.cmap.cmaplp.cmplot.get_dm()
+            dm = numpy.reshape(dm, [z.size, y.size, x.size])
 
-        dm = self.cmap.cmaplp.cmplot.datasrc.data['dm'][0]
-        dm = numpy.reshape(dm, [z.size, y.size, x.size])
+            dm_i, z_i = interp_2d_line(y, x, dm, c_i, z=z)
 
-        dm_i, z_i = interp_2d_line(y, x, dm, c_i, z=z)
+            if self.cmap_params.data['revz'][0]:
+                z_i = numpy.flipud(z_i)
+                dm_i = numpy.flipud(dm_i)
 
-        if self.cmap_params.data['revz'][0]:
-            z_i = numpy.flipud(z_i)
-            dm_i = numpy.flipud(dm_i)
+            iplot = ColourMap(r_i, z_i, [0], dm_i, palette=self.cmap_params.data['palette'][0],
+                              cfile=self.cmap_params.data['cfile'][0], revcols=self.cmap_params.data['revcols'][0],
+                              xlab=self.cmap_params.data['splab'][0], ylab=self.cmap_params.data['zlab'][0],
+                              dmlab=self.cmap_params.data['dmlab'][0] + ' along track',
+                              height=self.cmap_params.data['spheight'][0], width=self.cmap_params.data['spwidth'][0],
+                              rmin=self.cmap_params.data['rmin'][0], rmax=self.cmap_params.data['rmax'][0],
+                              alpha=self.cmap_params.data['alpha'][0],
+                              nan_colour=self.cmap_params.data['nan_colour'][0],
+                              hover=self.cmap_params.data['sphoverdisp'], cscale=self.cmap_params.data['cscale'][0],
+                              autoscale=self.cmap_params.data['autoscale'][0],
+                              linthresh=self.cmap_params.data['linthresh'][0],
+                              output_backend=self.cmap_params.data['output_backend'][0])
 
-        iplot = ColourMap(r_i, z_i, [0], dm_i, palette=self.cmap_params.data['palette'][0],
-                          cfile=self.cmap_params.data['cfile'][0], revcols=self.cmap_params.data['revcols'][0],
-                          xlab=self.cmap_params.data['splab'][0], ylab=self.cmap_params.data['zlab'][0],
-                          dmlab=self.cmap_params.data['dmlab'][0] + ' along track',
-                          height=self.cmap_params.data['spheight'][0], width=self.cmap_params.data['spwidth'][0],
-                          rmin=self.cmap_params.data['rmin'][0], rmax=self.cmap_params.data['rmax'][0],
-                          alpha=self.cmap_params.data['alpha'][0], nan_colour=self.cmap_params.data['nan_colour'][0],
-                          hover=self.cmap_params.data['sphoverdisp'])
+            self.children[1].children[1].children[1] = iplot
 
-        self.children[1].children[1].children[1] = iplot
+            timer.nbytes = dm_i.nbytes
@@ -2,25 +2,37 @@
 ColourMap class definition
 """
 
+from collections import OrderedDict
+
 import numpy
 
 from bokeh.model import DataModel
 
-from bokeh.models import ColumnDataSource, Plot, ColorBar, HoverTool
-from bokeh.models.mappers import LinearColorMapper
+from bokeh.models import ColumnDataSource, Plot, ColorBar, HoverTool, Div
+from bokeh.models.mappers import ContinuousColorMapper, LinearColorMapper, LogColorMapper
 from bokeh.models.ranges import Range1d
 from bokeh.models.layouts import Column
 from bokeh.models.callbacks import CustomJS
 
-from bokeh.core.properties import Instance, String, Float, Bool, Int
-
-from bokeh.plotting import figure
+from bokeh.core.properties import Instance, Nullable, String, Float, Bool, Int
 
 from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
 from bokcolmaps.check_kwargs import check_kwargs
 from bokcolmaps.generate_colourbar import generate_colourbar
 from bokcolmaps.read_colourmap import read_colourmap
 from bokcolmaps.get_min_max import get_min_max
+from bokcolmaps.get_percentile_min_max import get_percentile_min_max, parse_percentile
+from bokcolmaps.get_slice_histograms import get_slice_histograms
+from bokcolmaps.get_slice_min_max import get_slice_min_max, parse_autoscale
+from bokcolmaps.symlog_transform import symlog_transform, js_symlog_transform
+from bokcolmaps.palette_to_rgba import palette_to_rgba
+from bokcolmaps.get_projection import get_projection, projection_modes
+from bokcolmaps.ContourOverlay import ContourOverlay
+from bokcolmaps.RegionStats import RegionStats
+from bokcolmaps.FullResTiles import FullResTiles
+from bokcolmaps.DatasetRegistry import DatasetRegistry
+from bokcolmaps.Instrumentation import Instrumentation
 
 
 class ColourMap(Column, DataModel):
@@ -37,14 +49,19 @@ class ColourMap(Column, DataModel):
     datasrc = Instance(ColumnDataSource)
     mmsrc = Instance(ColumnDataSource)
     cvals = Instance(ColumnDataSource)
+    ctsrc = Nullable(Instance(ColumnDataSource))  # Contour lines (if contours)
+    statsdiv = Nullable(Instance(Div))  # Box selection statistics (if boxstats)
+    reqsrc = Nullable(Instance(ColumnDataSource))  # Full resolution tile requests (if fullres)
+    tilesrc = Nullable(Instance(ColumnDataSource))  # Full resolution tiles (if fullres)
 
-    cmap = Instance(LinearColorMapper)
+    cmap = Instance(ContinuousColorMapper)
 
     _title_root = String
     _zlab = String
 
     _autoscale = Bool
     _revcols = Bool
+    _cscale = String
 
     _xsize = Int
     _ysize = Int
@@ -68,16 +85,85 @@ class ColourMap(Column, DataModel):
             height: plot height (pixels)
             width: plot width (pixels)
             hover: Boolean to enable hover tool readout
+            cscale: colour scale, 'linear' (default), 'eqhist' (histogram
+                    equalised per slice between the colour scale limits),
+                    'log' or 'symlog' (symmetric log, see symlog_transform).
+                    Limits and hover readout are in the original units.
+            linthresh: scale of the linear region for the symlog colour scale
+            autoscale: autoscaling mode (if rmin and rmax not both given),
+                       'slice' (default) for the limits of each slice,
+                       'global' for the limits of all slices or 'window:N'
+                       for the limits of the N slices centred on each slice
+            dmserver: keep dm on the server only (for Bokeh Server
+                      applications with large data): slices are then sent by
+                      update_image or input_change, not by the JS slider
+                      callback cjs_slider
+            render: 'client' (default) for colour mapping in the browser or
+                    'rgba' for mapping each slice to RGBA on the server
+                    (smaller payload and less work for thin clients, implies
+                    dmserver, no data value in the hover readout)
+            rgbacache: number of RGBA slices cached for render 'rgba' (keyed
+                       by slice and colour scale limits, default 32)
+            contours: list of contour levels to overlay (computed on the
+                      server, so slices must then be changed by update_image
+                      or input_change rather than cjs_slider)
+            contour_colour: contour line colour (default 'Black')
+            contour_cache: number of slices of contours cached (default 64)
+            projections: list of projections over z ('max', 'mean' or 'min',
+                         see get_projection) to display as extra slices after
+                         the last z index
+            boxstats: Boolean to add a box select tool with a readout of
+                      the statistics of the selected region of the displayed
+                      slice (computed on the server from summed-area tables,
+                      see get_region_stats)
+            fullres: (xf, yf, dmf) full resolution coordinates and data, if
+                     x, y and dm are a downsampled version for display, for
+                     the hover readout to give the exact values at the cursor
+                     (for Bokeh Server applications). dmf may be any array
+                     supporting NumPy slicing (e.g. memory mapped), with the
+                     same number of slices as dm. Tiles of dmf are sent to
+                     the client when needed and cached on both sides.
         """
 
-        check_kwargs(kwargs, extra_kwargs=['height', 'width', 'hover'])
+        from bokeh.plotting import figure  # Deferred to keep package import fast
+
+        check_kwargs(kwargs, extra_kwargs=['height', 'width', 'hover', 'cscale', 'autoscale', 'linthresh', 'dmserver',
+                                           'render', 'rgbacache', 'contours', 'contour_colour',
+                                           'contour_cache', 'projections', 'boxstats',
+                                           'fullres'])
 
         palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
             rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
 
         height = kwargs.get('height', 575)
         width = kwargs.get('width', 500)
         hover = kwargs.get('hover', True)
+        cscale = kwargs.get('cscale', 'linear')
+        automode = kwargs.get('autoscale', 'slice')
+        linthresh = kwargs.get('linthresh', 1)
+        dmserver = kwargs.get('dmserver', False)
+        render = kwargs.get('render', 'client')
+        rgbacache = kwargs.get('rgbacache', 32)
+        contours = kwargs.get('contours', None)
+        contour_colour = kwargs.get('contour_colour', 'Black')
+        contour_cache = kwargs.get('contour_cache', 64)
+        boxstats = kwargs.get('boxstats', False)
+        fullres = kwargs.get('fullres', None)
+        projections = kwargs.get('projections', None)
+
+        if render not in ['client', 'rgba']:
+            raise ValueError('Invalid render mode: ' + str(render))
+        if render == 'rgba':  # The client has no need of dm
+            dmserver = True
+
+        if cscale not in ['linear', 'eqhist', 'log', 'symlog']:
+            raise ValueError('Invalid colour scale: ' + str(cscale))
+        projections = [] if projections is None else list(projections)
+        for mode in projections:
+            if mode not in projection_modes:
+                raise ValueError('Invalid projection mode: ' + str(mode))
+        parse_autoscale(automode)
 
         super().__init__()
 
@@ -86,11 +172,23 @@ class ColourMap(Column, DataModel):
         self._title_root = dmlab
         self._zlab = zlab
 
+        # Percentile limits mean autoscaling with robust minimum and maximum values
+
+        self._plims = None
+        pmin, pmax = parse_percentile(rmin), parse_percentile(rmax)
+        if (pmin is not None) or (pmax is not None):
+            if ((pmin is None) and (rmin is not None)) or ((pmax is None) and (rmax is not None)):
+                raise ValueError('rmin and rmax must both be percentiles if either is')
+            self._plims = (0 if pmin is None else pmin, 100 if pmax is None else pmax)
+            rmin = rmax = None
+
         is3D = True if len(dm.shape) == 3 else False
 
         self._autoscale = True
         if (rmin is not None) and (rmax is not None):
             self._autoscale = False
+            if (cscale == 'log') and (min(rmin, rmax) <= 0):
+                raise ValueError('rmin and rmax must be positive for a log colour scale')
         else:
             if rmin is None:
                 if is3D:
@@ -117,31 +215,86 @@ class ColourMap(Column, DataModel):
         else:
             d = dm
 
+        dm = dm.reshape((self._zsize, self._ysize, self._xsize))
+
+        shared = DatasetRegistry.find(dm)  # Cached statistics if dm is a shared dataset
+
         # Get minimum and maximum values for the colour mapping
 
-        if self._autoscale:
-            minvals = [None] * self._zsize
-            maxvals = [None] * self._zsize
-            for zind in range(self._zsize):
-                minvals[zind], maxvals[zind] = get_min_max(dm[zind], self._cbdelta)
-        else:
-            minvals = [rmin] * self._zsize
-            maxvals = [rmax] * self._zsize
+        with Instrumentation.timer('ColourMap.stats'):
+            if self._autoscale and (shared is not None):
+                minvals, maxvals = shared.get_slice_min_max(self._cbdelta, mode=automode, plims=self._plims,
+                                                            positive=(cscale == 'log'))
+            elif self._autoscale:
+                minvals, maxvals = get_slice_min_max(dm, self._cbdelta, mode=automode, plims=self._plims,
+                                                     positive=(cscale == 'log'))
+            else:
+                minvals = [rmin] * self._zsize
+                maxvals = [rmax] * self._zsize
+
+        self._cscale = cscale
+        pminvals, pmaxvals = self._setup_projections(projections, dm, shared, rmin, rmax)
+        minvals = numpy.concatenate((minvals, pminvals))
+        maxvals = numpy.concatenate((maxvals, pmaxvals))
+
+        self._mmauto = self._autoscale  # Whether mmsrc holds autoscaling limits
+        self._automode = automode
+        self._zhead = 0  # Ring buffer slot for the next appended slice
+        self._dmown = False  # Whether dm has been copied for appending
         self.mmsrc = ColumnDataSource(data={'minvals': minvals, 'maxvals': maxvals})
 
-        dm = dm.flatten()
+        self._linthresh = linthresh
+        if (self._cscale == 'eqhist') and (shared is not None):
+            hists = shared.get_slice_histograms(minvals[:self._zsize], maxvals[:self._zsize], 1024)
+        elif self._cscale == 'eqhist':
+            hists = get_slice_histograms(dm, minvals[:self._zsize], maxvals[:self._zsize], 1024)
+        if (self._cscale == 'eqhist') and projections:
+            hists = numpy.concatenate((hists, get_slice_histograms(self._projdm, minvals[self._zsize:],
+                                                                   maxvals[self._zsize:], 1024)))
+        elif self._cscale == 'symlog':  # Only the displayed slice is transformed
+            d = self._transform(d)
+
+        dm = dm.ravel()  # No copy if dm is contiguous (e.g. a shared dataset)
+
+        self._dmserver = dmserver
+        self._dm = dm if dmserver else None  # Otherwise in datasrc (see get_dm)
+
+        self._render = render
+        self._rgbacache = OrderedDict()  # (zind, low, high) to RGBA image
+        self._rgbasize = rgbacache
+        self._zind = 0  # Displayed slice
 
         # All variables stored as single item lists in order to be the same
         # length (as required by ColumnDataSource)
 
-        self.datasrc = ColumnDataSource(data={'x': [x], 'y': [y], 'z': [z],
-                                              'image': [d], 'dm': [dm],
-                                              'xp': [0], 'yp': [0], 'dp': [0]})
+        self.datasrc = ColumnDataSource(data={'x': [x], 'y': [y], 'z': [z.copy()],
+                                              'image': [d],
+                                              'dm': [dm[:0] if dmserver else self._with_projections(dm)],
+                                              'xp': [0], 'yp': [0], 'dp': [0], 'zi': [0]})
+
+        # Features computed on the server (see _features)
+
+        self._stats = RegionStats(x, y, self._get_slice)
+        self._tiles = None
+        if fullres is not None:
+            self._tiles = FullResTiles(self.datasrc, *fullres, self._zsize)
+            self.reqsrc, self.tilesrc = self._tiles.reqsrc, self._tiles.tilesrc
+
+        # JS (inverse) transforms for the displayed image values
+
+        if self._cscale == 'symlog':
+            js_tf = """
+        var linthresh = """ + repr(float(self._linthresh)) + ';' + js_symlog_transform
+        else:
+            js_tf = """
+        var tf = function(v) {return v;};
+        var itf = tf;
+        """
 
         # JS code for slider in classes ColourMapSlider
         # and ColourMapLPSlider
 
-        js_slider = """
+        js_slider = js_tf + """
         var dind = cb_obj['value'];
         var data = datasrc.data;
 
@@ -155,25 +308,39 @@ class ColourMap(Column, DataModel):
 
         var sind = dind*nx*ny;
         for (var i = 0; i < nx*ny; i++) {
-            d[i] = dm[sind+i];
+            d[i] = tf(dm[sind+i]);
         }
+        data['zi'] = [dind];
 
         datasrc.change.emit();
 
         var minval = mmsrc.data['minvals'][dind];
         var maxval = mmsrc.data['maxvals'][dind];
 
-        cmap.low = minval;
-        cmap.high = maxval;
+        cmap.low = tf(minval);
+        cmap.high = tf(maxval);
 
         var z = data['z'][0];
-        cmplot.title.text = title_root + ', ' + zlab + ' = ' + z[dind].toString();
+        var ztext = (dind < z.length) ? zlab + ' = ' + z[dind].toString() : projlabs[dind - z.length];
+        cmplot.title.text = title_root + ', ' + ztext;
+        """
+
+        # Histogram equalisation: the palette is remapped for each slice
+        # from the precomputed palette indices
+
+        js_eqhist = """
+        var cinds = mmsrc.data['cinds'][dind];
+        var pal = new Array(cinds.length);
+        for (var i = 0; i < cinds.length; i++) {
+            pal[i] = palette[cinds[i]];
+        }
+        cmap.palette = pal;
         """
 
         # JS code defined whether or not hover tool used as may be needed in
         # class ColourMapLP
 
-        self._js_hover = """
+        self._js_hover = js_tf + """
         var geom = cb_data['geometry'];
         var data = datasrc.data;
 
@@ -193,19 +360,22 @@ class ColourMap(Column, DataModel):
             data['xp'] = [x[xind]];
             data['yp'] = [y[yind]];
             var zind = yind*x.length + xind;
-            data['dp'] = [d[zind]];
+            data['dp'] = [itf(d[zind])];
         }
         """
 
         ptools = ['reset, pan, wheel_zoom, box_zoom, save']
 
         if hover:
-            cjs_hover = CustomJS(args={'datasrc': self.datasrc},
-                                 code=self._js_hover)
-            htool = HoverTool(tooltips=[(xlab, '@xp{0.00}'),
-                                        (ylab, '@yp{0.00}'),
-                                        (dmlab, '@dp{0.00}')],
-                              callback=cjs_hover, point_policy='follow_mouse')
+            if self._tiles is not None:
+                cjs_hover = self._tiles.get_hover(self._js_hover)
+            else:
+                cjs_hover = CustomJS(args={'datasrc': self.datasrc},
+                                     code=self._js_hover)
+            tooltips = [(xlab, '@xp{0.00}'), (ylab, '@yp{0.00}')]
+            if (render == 'client') or (self._tiles is not None):  # Otherwise no data values (RGBA image)
+                tooltips.append((dmlab, '@dp{0.00}'))
+            htool = HoverTool(tooltips=tooltips, callback=cjs_hover, point_policy='follow_mouse')
             ptools.append(htool)
 
         # Default to whole range unless externally controlled
@@ -224,82 +394,157 @@ class ColourMap(Column, DataModel):
         # Get the colourmap
 
         self._revcols = revcols
-        self._get_cmap(cfile, rmin, rmax, palette, nan_colour)
+        with Instrumentation.timer('ColourMap.cmap'):
+            self._get_cmap(cfile, rmin, rmax, palette, nan_colour)
+
+        self._palette = list(self.cmap.palette)
+        if self._cscale == 'eqhist':
+            with Instrumentation.timer('ColourMap.eqhist'):
+                self.mmsrc.data['cinds'] = self._get_eqhist_inds(hists)
+                self.cmap.palette = self._get_eqhist_palette(0)
+            js_slider += js_eqhist
+
+        if self._render == 'rgba':
+            self._lut = palette_to_rgba(self._palette)
+            self._nanrgba = palette_to_rgba([nan_colour])[0]
+            self.datasrc.data['image'] = [self._get_rgba(0)]
 
         # Create the plot
 
-        self.plot = figure(x_axis_label=xlab, y_axis_label=ylab,
-                           x_range=xran, y_range=yran,
-                           height=height, width=width,
-                           tools=ptools, toolbar_location='right')
+        with Instrumentation.timer('ColourMap.figure'):
+
+            self.plot = figure(x_axis_label=xlab, y_axis_label=ylab,
+                               x_range=xran, y_range=yran,
+                               height=height, width=width,
+                               tools=ptools, toolbar_location='right', output_backend=output_backend)
+
+            self.cjs_slider = CustomJS(args={'datasrc': self.datasrc, 'mmsrc': self.mmsrc,
+                                             'cmap': self.cmap, 'cmplot': self.plot,
+                                             'title_root': self._title_root, 'zlab': self._zlab,
+                                             'palette': self._palette,
+                                             'projlabs': [self._get_projection_label(p)
+                                                          for p in range(len(self._projs))]},
+                                       code=js_slider)
 
-        self.cjs_slider = CustomJS(args={'datasrc': self.datasrc, 'mmsrc': self.mmsrc,
-                                         'cmap': self.cmap, 'cmplot': self.plot,
-                                         'title_root': self._title_root, 'zlab': self._zlab},
-                                   code=js_slider)
+            # Set the title
 
-        # Set the title
+            if len(self.datasrc.data['z'][0]) > 1:
+                self.plot.title.text = self._title_root + ', ' + \
+                    self._zlab + ' = ' + str(self.datasrc.data['z'][0][0])
+            else:
+                self.plot.title.text = self._title_root
 
-        if len(self.datasrc.data['z'][0]) > 1:
-            self.plot.title.text = self._title_root + ', ' + \
-                self._zlab + ' = ' + str(self.datasrc.data['z'][0][0])
-        else:
-            self.plot.title.text = self._title_root
+            self.plot.title.text_font = 'garamond'
+            self.plot.title.text_font_size = '12pt'
+            self.plot.title.text_font_style = 'bold'
+            self.plot.title.align = 'center'
 
-        self.plot.title.text_font = 'garamond'
-        self.plot.title.text_font_size = '12pt'
-        self.plot.title.text_font_style = 'bold'
-        self.plot.title.align = 'center'
+            # The image is displayed such that x and y coordinate values
+            # correspond to the centres of rectangles
 
-        # The image is displayed such that x and y coordinate values
-        # correspond to the centres of rectangles
+            pw = abs(x[-1] - x[0]) + abs(x[1] - x[0])
+            ph = abs(y[-1] - y[0]) + abs(y[1] - y[0])
 
-        pw = abs(x[-1] - x[0]) + abs(x[1] - x[0])
-        ph = abs(y[-1] - y[0]) + abs(y[1] - y[0])
+            xs = xran.start
+            if xs is None:
+                xs = 0
+            else:
+                xs += xoffs
 
-        xs = xran.start
-        if xs is None:
-            xs = 0
-        else:
-            xs += xoffs
+            ys = yran.start
+            if ys is None:
+                ys = 0
+            else:
+                ys += yoffs
 
-        ys = yran.start
-        if ys is None:
-            ys = 0
-        else:
-            ys += yoffs
+            orig_str_x = 'left'
+            orig_str_y = 'bottom'
+
+            if x[-1] < x[0]:
+                orig_str_x = 'right'
+            if y[-1] < y[0]:
+                orig_str_y = 'top'
+
+            origin = orig_str_y + '_' + orig_str_x
 
-        orig_str_x = 'left'
-        orig_str_y = 'bottom'
+            if self._render == 'rgba':
+                self.plot.image_rgba('image', source=self.datasrc, x=xs, y=ys,
+                                     dw=pw, dh=ph, global_alpha=alpha,
+                                     origin=origin, anchor=origin)
+            else:
+                self.plot.image('image', source=self.datasrc, x=xs, y=ys,
+                                dw=pw, dh=ph, color_mapper=self.cmap, global_alpha=alpha,
+                                origin=origin, anchor=origin)
 
-        if x[-1] < x[0]:
-            orig_str_x = 'right'
-        if y[-1] < y[0]:
-            orig_str_y = 'top'
+            self._contours = None
+            if contours is not None:
+                self._contours = ContourOverlay(self.plot, x, y, self._get_slice, contours,
+                                                colour=contour_colour, cache=contour_cache)
+                self.ctsrc = self._contours.ctsrc
 
-        origin = orig_str_y + '_' + orig_str_x
+            # Needed for HoverTool...
 
-        self.plot.image('image', source=self.datasrc, x=xs, y=ys,
-                        dw=pw, dh=ph, color_mapper=self.cmap, global_alpha=alpha,
-                        origin=origin, anchor=origin)
+            hvrect = self.plot.rect(x=(x[0] + x[-1]) / 2, y=(y[0] + y[-1]) / 2, width=pw, height=ph,
+                                    line_alpha=0, fill_alpha=0, source=self.datasrc)
 
-        # Needed for HoverTool...
+            self.plot.xaxis.axis_label_text_font = 'garamond'
+            self.plot.xaxis.axis_label_text_font_size = '10pt'
+            self.plot.xaxis.axis_label_text_font_style = 'bold'
 
-        self.plot.rect(x=(x[0] + x[-1]) / 2, y=(y[0] + y[-1]) / 2, width=pw, height=ph,
-                       line_alpha=0, fill_alpha=0, source=self.datasrc)
+            self.plot.yaxis.axis_label_text_font = 'garamond'
+            self.plot.yaxis.axis_label_text_font_size = '10pt'
+            self.plot.yaxis.axis_label_text_font_style = 'bold'
 
-        self.plot.xaxis.axis_label_text_font = 'garamond'
-        self.plot.xaxis.axis_label_text_font_size = '10pt'
-        self.plot.xaxis.axis_label_text_font_style = 'bold'
+            mmdata = self.mmsrc.data  # Ticks over the limits of all the slices
+            self.cbar = generate_colourbar(self.cmap, cbarwidth=round(height / 20),
+                                           cscale=self._cscale, linthresh=self._linthresh,
+                                           rmin=numpy.min(mmdata['minvals']), rmax=numpy.max(mmdata['maxvals']))
+            self.plot.add_layout(self.cbar, 'below')
 
-        self.plot.yaxis.axis_label_text_font = 'garamond'
-        self.plot.yaxis.axis_label_text_font_size = '10pt'
-        self.plot.yaxis.axis_label_text_font_style = 'bold'
+            self.children.append(self.plot)
+            if boxstats:
+                self.statsdiv = self._stats.add_box_select(self.plot, hvrect, width)
+                self.children.append(self.statsdiv)
+
+            # Server side features, each told of the displayed slice by update
+            # and of changed slices by invalidate
+
+            self._features = [f for f in [self._contours, self._stats, self._tiles] if f is not None]
+
+            # Whether slices must be changed by update_image or input_change (on
+            # the server) rather than by cjs_slider in the browser, as the server
+            # holds dm (dmserver) or a feature needs each displayed slice. Read by
+            # the slider classes (ColourMapSlider, ColourMapLPSlider,
+            # ColourMapSliderGroup) to choose their callback.
+
+            self._server_slices = dmserver or any(f.server_slices for f in self._features)
+
+    def _get_min_max(self, d: numpy.ndarray) -> tuple:
+
+        """
+        Get the autoscaling limits for a slice
+        """
 
-        self.cbar = generate_colourbar(self.cmap, cbarwidth=round(height / 20))
-        self.plot.add_layout(self.cbar, 'below')
+        if self._plims is not None:  # Sampled before any masking
+            return get_percentile_min_max(d, self._cbdelta, *self._plims, positive=(self._cscale == 'log'))
 
-        self.children.append(self.plot)
+        if self._cscale == 'log':
+            d = d[d > 0]
+            if d.size == 0:
+                return 1, 1 + self._cbdelta
+
+        return get_min_max(d, self._cbdelta)
+
+    def _transform(self, d: numpy.ndarray) -> numpy.ndarray:
+
+        """
+        Transform values for display (only needed for the symlog colour scale)
+        """
+
+        if self._cscale == 'symlog':
+            return symlog_transform(d, self._linthresh)
+
+        return d
 
     def _get_cmap(self, cfile: str, rmin: float, rmax: float, palette: list, nan_colour: str) -> None:
 
@@ -308,7 +553,7 @@ class ColourMap(Column, DataModel):
         """
 
         if self._autoscale:
-            min_val, max_val = get_min_max(self.datasrc.data['image'][0], self._cbdelta)
+            min_val, max_val = self.mmsrc.data['minvals'][0], self.mmsrc.data['maxvals'][0]
         else:
             min_val = rmin
             max_val = rmax
@@ -324,7 +569,82 @@ class ColourMap(Column, DataModel):
             pal.reverse()
             palette = tuple(pal)
 
-        self.cmap = LinearColorMapper(palette=palette, nan_color=nan_colour, low=min_val, high=max_val)
+        if self._cscale == 'log':
+            self.cmap = LogColorMapper(palette=palette, nan_color=nan_colour, low=min_val, high=max_val)
+        else:
+            self.cmap = LinearColorMapper(palette=palette, nan_color=nan_colour,
+                                          low=self._transform(min_val), high=self._transform(max_val))
+
+    def _get_eqhist_inds(self, hists: numpy.ndarray) -> list:
+
+        """
+        Convert the slice histograms to palette indices for histogram
+        equalisation (one array per slice, each the length of the histogram,
+        which becomes the length of the remapped palette)
+        """
+
+        ncols = len(self._palette)
+        nbins = hists.shape[1]
+
+        # Cumulative distribution at the centre of each bin (linear if the
+        # slice has no finite values)
+
+        cdf = numpy.cumsum(hists, axis=1) - hists / 2
+        totals = hists.sum(axis=1, keepdims=True)
+        cdf = numpy.divide(cdf, totals, out=(numpy.arange(nbins) + 0.5)[None, :] / nbins * numpy.ones_like(cdf),
+                           where=totals > 0)
+
+        inds = numpy.clip(numpy.floor(cdf * ncols), 0, ncols - 1)
+        inds = inds.astype(numpy.uint8 if ncols <= 256 else numpy.uint16)
+
+        return list(inds)
+
+    def _get_eqhist_palette(self, zind: int) -> list:
+
+        """
+        Get the histogram equalised palette for a slice
+        """
+
+        return [self._palette[i] for i in self.mmsrc.data['cinds'][zind]]
+
+    def _get_rgba(self, zind: int) -> numpy.ndarray:
+
+        """
+        Map a slice to RGBA with the current colour scale limits (and the
+        palette lookup table), as the colour mapper would in the browser.
+        Results are cached by slice and limits.
+        """
+
+        low, high = self.cmap.low, self.cmap.high
+        key = (zind, low, high)
+        if key in self._rgbacache:
+            self._rgbacache.move_to_end(key)
+            return self._rgbacache[key]
+
+        d = self._transform(self._get_slice(zind))
+        nans = numpy.isnan(d)
+
+        lut = self._lut
+        if self._cscale == 'eqhist':
+            lut = lut[self.mmsrc.data['cinds'][zind]]
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            if self._cscale == 'log':  # Non-positive values get the lowest colour
+                d, low, high = numpy.log(d), numpy.log(low), numpy.log(high)
+            inds = numpy.floor((d - low) / (high - low) * lut.size)
+        inds[numpy.isnan(inds)] = 0
+        inds = numpy.clip(inds, 0, lut.size - 1).astype(numpy.intp)
+
+        rgba = lut[inds]
+        rgba[nans] = self._nanrgba
+        rgba = rgba.reshape((self._ysize, self._xsize))
+
+        if self._rgbasize > 0:
+            self._rgbacache[key] = rgba
+            if len(self._rgbacache) > self._rgbasize:
+                self._rgbacache.popitem(last=False)
+
+        return rgba
 
     def _read_cmap(self, fname: str) -> None:
 
@@ -334,6 +654,127 @@ class ColourMap(Column, DataModel):
 
         self.cvals = read_colourmap(fname)
 
+    def get_dm(self) -> numpy.ndarray:
+
+        """
+        Get the (flattened) data array, only held in datasrc if not dmserver
+        """
+
+        if self._dmserver:
+            return self._dm
+
+        return self.datasrc.data['dm'][0][:self._zsize * self._xsize * self._ysize]  # Without projections
+
+    def _get_slice(self, zind: int) -> numpy.ndarray:
+
+        """
+        Get a 2D slice, or a projection for z indices after the last slice
+        """
+
+        if zind >= self._zsize:
+            return self._projdm[zind - self._zsize]
+
+        ssize = self._xsize * self._ysize
+
+        return self.get_dm()[zind * ssize:(zind + 1) * ssize].reshape((self._ysize, self._xsize))
+
+    def _get_title(self, zind: int) -> str:
+
+        """
+        Get the plot title for a slice or projection
+        """
+
+        if zind >= self._zsize:
+            return self._title_root + ', ' + self._get_projection_label(zind - self._zsize)
+
+        return self._title_root + ', ' + self._zlab + ' = ' + str(self.datasrc.data['z'][0][zind])
+
+    def _get_projection_label(self, p: int) -> str:
+
+        names = {'max': 'maximum', 'mean': 'mean', 'min': 'minimum'}
+
+        return names[self._projs[p]] + ' over ' + self._zlab
+
+    def _setup_projections(self, projections: list, dm: numpy.ndarray, shared: object,
+                           rmin: float, rmax: float) -> tuple:
+
+        """
+        Set up the projections over z (cached if dm is a shared dataset),
+        displayed as extra slices after the last z index, and return their
+        colour scale limits
+        """
+
+        self._projs = projections
+        self._projdm = self._get_projections(dm, shared)
+
+        if not projections:
+            return [], []
+        if self._autoscale:
+            return self._get_projection_limits()
+
+        return [rmin] * len(projections), [rmax] * len(projections)
+
+    def _get_projections(self, dm: numpy.ndarray, shared: object=None) -> numpy.ndarray:
+
+        """
+        Get the projections of dm (3D) over z
+        """
+
+        projdm = numpy.empty((len(self._projs), self._ysize, self._xsize))
+
+        with Instrumentation.timer('ColourMap.projections', projdm.nbytes):
+            for p, mode in enumerate(self._projs):
+                if shared is not None:
+                    projdm[p] = shared.get_projection(mode)
+                else:
+                    projdm[p] = get_projection(dm, mode)
+
+        return projdm
+
+    def _get_projection_limits(self) -> tuple:
+
+        """
+        Get the autoscaling limits of the projections (separate from those
+        of the slices)
+        """
+
+        return get_slice_min_max(self._projdm, self._cbdelta, plims=self._plims,
+                                 positive=(self._cscale == 'log'))
+
+    def _with_projections(self, dm: numpy.ndarray) -> numpy.ndarray:
+
+        """
+        Append the projections to the flattened dm for the client (copies dm)
+        """
+
+        if not self._projs:
+            return dm
+
+        return numpy.concatenate((dm, self._projdm.ravel()))
+
+    def input_change(self, attrname: str, old: int, new: int) -> None:
+
+        """
+        Callback for use with e.g. sliders in Bokeh Server applications
+        (needed instead of cjs_slider if dmserver)
+        """
+
+        self.update_image(new)
+
+        if self._zsize + len(self._projs) > 1:
+            self.plot.title.text = self._get_title(new)
+
+    def set_contours(self, levels: list) -> None:
+
+        """
+        Change the contour levels (if created with contours)
+        """
+
+        if self._contours is None:
+            raise ValueError('Invalid contours: ColourMap created without contours')
+
+        self._contours.set_levels(levels)
+
     def update_image(self, zind: int) -> None:
 
         """
@@ -341,23 +782,244 @@ class ColourMap(Column, DataModel):
         (e.g. for Bokeh Server applications)
         """
 
-        d = self.datasrc.data['dm'][0][zind * self._xsize * self._ysize:
-                                       (zind + 1) * self._xsize * self._ysize]
-        self.datasrc.patch({'image': [(0, d.reshape((self._ysize, self._xsize)))]})
+        with Instrumentation.timer('ColourMap.update_image') as timer:
 
-        if self._autoscale:
-            self.update_cbar()
+            self._zind = zind
+
+            d = self._get_slice(zind)
+            if self._render == 'client':
+                self.datasrc.patch({'image': [(0, self._transform(d))]})
+                timer.nbytes = d.nbytes
+
+            if self._autoscale:
+                if self._mmauto:  # Precomputed limits
+                    self.cmap.low = self._transform(self.mmsrc.data['minvals'][zind])
+                    self.cmap.high = self._transform(self.mmsrc.data['maxvals'][zind])
+                else:
+                    self.update_cbar()
+
+            if self._cscale == 'eqhist':
+                self.cmap.palette = self._get_eqhist_palette(zind)
+
+            if self._render == 'rgba':  # After the colour scale limits are set
+                rgba = self._get_rgba(zind)
+                self.datasrc.patch({'image': [(0, rgba)]})
+                timer.nbytes = rgba.nbytes
+
+            for feature in self._features:
+                feature.update(zind)
+
+    def append_slice(self, d: numpy.ndarray, zval: float, display: bool=True) -> int:
+
+        """
+        Add a new slice (e.g. from a live feed), treating dm as a ring buffer
+        with capacity the initial number of slices: the oldest slice is
+        overwritten and only the new slice, its z value and its colour scale
+        limits are sent to clients (as patches). dm is copied on the first
+        call so the array passed in (or a shared dataset) is not modified.
+        Slices are stored in arrival order modulo the capacity, so the slider
+        index of the newest slice is the returned slot. Several slices can be
+        appended at once (in a single patch).
+        args...
+            d: 2D NumPy array of the new slice, dimensions y.size, x.size
+               (or 3D for several slices in arrival order, first dimension z)
+            zval: z coordinate of the new slice (or 1D NumPy array of them)
+        kwargs...
+            display: display the newest slice if True
+        returns the ring buffer slot (z index) of the newest slice
+        """
+
+        if (d.ndim not in [2, 3]) or (d.shape[-2:] != (self._ysize, self._xsize)):
+            raise ValueError('Slice dimensions not consistent with dm array')
+        if self._tiles is not None:
+            raise ValueError('Invalid append_slice: not possible with full resolution data')
+
+        d = d.reshape((-1, self._ysize, self._xsize))
+        zvals = numpy.atleast_1d(zval)
+        if zvals.size != d.shape[0]:
+            raise ValueError('Number of z values not consistent with number of slices')
+
+        with Instrumentation.timer('ColourMap.append_slice', d.nbytes):
+
+            if not self._dmown:
+                if self._dmserver:
+                    self._dm = self._dm.copy()
+                else:
+                    self.datasrc.data['dm'] = [self.datasrc.data['dm'][0].copy()]
+                self._dmown = True
+
+            # Only the newest slices fit in the buffer
+
+            d = d[-self._zsize:]
+            zvals = zvals[-self._zsize:]
+            zinds = (self._zhead + numpy.arange(d.shape[0])) % self._zsize
+            self._zhead = (zinds[-1] + 1) % self._zsize
+
+            # One patch entry per contiguous run of slots (two if the buffer wraps)
+
+            ssize = self._xsize * self._ysize
+            dmpatch = []
+            zpatch = []
+            for run in numpy.split(numpy.arange(zinds.size), numpy.nonzero(numpy.diff(zinds) != 1)[0] + 1):
+                z0, z1 = int(zinds[run[0]]), int(zinds[run[-1]]) + 1
+                dmpatch.append(((0, slice(z0 * ssize, z1 * ssize)), d[run].ravel()))
+                zpatch.append(((0, slice(z0, z1)), zvals[run]))
+            if self._dmserver:
+                for (_, sl), v in dmpatch:
+                    self._dm[sl] = v
+                self.datasrc.patch({'z': zpatch})
+            else:
+                self.datasrc.patch({'dm': dmpatch, 'z': zpatch})
+
+            # Limits (and palette indices) for the new slices only, unless they
+            # depend on other slices too
+
+            dm = self.get_dm().reshape((self._zsize, self._ysize, self._xsize))
+            zsel = numpy.sort(zinds)
+            if self._mmauto and (parse_autoscale(self._automode)[0] != 'slice'):
+                zsel = numpy.arange(self._zsize)
+
+            if self._mmauto:
+                if zsel.size == self._zsize:
+                    minvals, maxvals = get_slice_min_max(dm, self._cbdelta, mode=self._automode, plims=self._plims,
+                                                         positive=(self._cscale == 'log'))
+                else:
+                    minvals, maxvals = get_slice_min_max(dm[zsel], self._cbdelta, plims=self._plims,
+                                                         positive=(self._cscale == 'log'))
+                self.mmsrc.patch({'minvals': [(int(z), v) for z, v in zip(zsel, minvals)],
+                                  'maxvals': [(int(z), v) for z, v in zip(zsel, maxvals)]})
+
+            if self._cscale == 'eqhist':
+                hists = get_slice_histograms(dm[zsel], numpy.asarray(self.mmsrc.data['minvals'])[zsel],
+                                             numpy.asarray(self.mmsrc.data['maxvals'])[zsel],
+                                             self.mmsrc.data['cinds'][0].size)
+                self.mmsrc.patch({'cinds': list(zip(zsel.tolist(), self._get_eqhist_inds(hists)))})
+
+            for key in [k for k in self._rgbacache if (k[0] in zinds) or (k[0] in zsel)]:
+                del self._rgbacache[key]
+            for feature in self._features:
+                feature.invalidate(zinds)
+
+            if self._projs:  # Recomputed from the whole buffer
+                self._update_projections(dm)
+
+            if display:
+                self.update_image(int(zinds[-1]))
+                if self._zsize > 1:
+                    self.plot.title.text = self._title_root + ', ' + self._zlab + ' = ' + str(zvals[-1])
+
+        return int(zinds[-1])
+
+    def set_data(self, dm: numpy.ndarray) -> None:
+
+        """
+        Replace the data with a new array of the same dimensions (e.g. a
+        different section of a larger array), keeping the coordinates. The
+        colour scale limits, palette indices, projections and caches are
+        recomputed and the displayed slice is updated. A non-contiguous dm
+        (e.g. a strided view) is copied once.
+        args...
+            dm: NumPy array of the new data, dimensions as the initial dm
+        """
+
+        if (dm.shape[-2:] != (self._ysize, self._xsize)) or (dm.size != self._zsize * self._ysize * self._xsize):
+            raise ValueError('Invalid data: dimensions ' + str(dm.shape))
+        if self._tiles is not None:
+            raise ValueError('Invalid set_data: not possible with full resolution data')
+
+        with Instrumentation.timer('ColourMap.set_data', dm.nbytes):
+
+            dm = numpy.ascontiguousarray(dm).reshape((self._zsize, self._ysize, self._xsize))
+            if self._dmserver:
+                self._dm = dm.ravel()
+            else:
+                self.datasrc.data['dm'] = [self._with_projections(dm.ravel())]
+            self._dmown = False  # dm may be the caller's array
+
+            zinds = numpy.arange(self._zsize)
+            if self._mmauto:
+                minvals, maxvals = get_slice_min_max(dm, self._cbdelta, mode=self._automode, plims=self._plims,
+                                                     positive=(self._cscale == 'log'))
+                self.mmsrc.patch({'minvals': [(slice(0, self._zsize), minvals)],
+                                  'maxvals': [(slice(0, self._zsize), maxvals)]})
+
+            if self._cscale == 'eqhist':
+                hists = get_slice_histograms(dm, numpy.asarray(self.mmsrc.data['minvals'])[zinds],
+                                             numpy.asarray(self.mmsrc.data['maxvals'])[zinds],
+                                             self.mmsrc.data['cinds'][0].size)
+                self.mmsrc.patch({'cinds': list(zip(zinds.tolist(), self._get_eqhist_inds(hists)))})
+
+            self._rgbacache.clear()
+            for feature in self._features:
+                feature.invalidate()
+
+            if self._projs:
+                self._update_projections(dm)
+
+            self.update_image(self._zind)
+
+    def _update_projections(self, dm: numpy.ndarray) -> None:
+
+        """
+        Recompute the projections after appending slices and patch them
+        (and their limits) for the clients
+        """
+
+        self._projdm = self._get_projections(dm)
+        pinds = self._zsize + numpy.arange(len(self._projs))
+
+        if not self._dmserver:
+            self.datasrc.patch({'dm': [((0, slice(self._zsize * self._xsize * self._ysize, None)),
+                                        self._projdm.ravel())]})
+
+        if self._mmauto:
+            minvals, maxvals = self._get_projection_limits()
+            self.mmsrc.patch({'minvals': [(int(z), v) for z, v in zip(pinds, minvals)],
+                              'maxvals': [(int(z), v) for z, v in zip(pinds, maxvals)]})
+
+        if self._cscale == 'eqhist':
+            hists = get_slice_histograms(self._projdm, numpy.asarray(self.mmsrc.data['minvals'])[pinds],
+                                         numpy.asarray(self.mmsrc.data['maxvals'])[pinds],
+                                         self.mmsrc.data['cinds'][0].size)
+            self.mmsrc.patch({'cinds': list(zip(pinds.tolist(), self._get_eqhist_inds(hists)))})
+
+        for key in [k for k in self._rgbacache if k[0] in pinds]:
+            del self._rgbacache[key]
+        for feature in self._features:
+            feature.invalidate(pinds)
+
+    def get_region_stats(self, x0: float, x1: float, y0: float, y1: float, zind: int=None) -> dict:
+
+        """
+        Get the statistics of the finite values of a slice in a rectangle
+        (in constant time from the summed-area tables of the slice, see
+        RegionStats)
+        args...
+            x0, x1: x coordinate range
+            y0, y1: y coordinate range
+        kwargs...
+            zind: z index of the slice (the displayed slice if None)
+        returns dict of count, sum, mean and std (NaN if count is zero)
+        """
+
+        return self._stats.get_region_stats(x0, x1, y0, y1, zind=self._zind if zind is None else zind)
 
     def update_cbar(self) -> None:
 
         """
-        Update the colour scale (needed when the data for display changes).
+        Update the colour scale (needed when the data for display changes)
+        to the limits of the displayed image.
         """
 
-        d = self.datasrc.data['image'][0]
-        min_val, max_val = get_min_max(d, self._cbdelta)
-        self.cmap.low = min_val
-        self.cmap.high = max_val
+        with Instrumentation.timer('ColourMap.update_cbar'):
+
+            if self._render == 'rgba':  # Limits of the displayed slice
+                d = self._transform(self._get_slice(self._zind))
+            else:
+                d = self.datasrc.data['image'][0]
+            min_val, max_val = self._get_min_max(d)
+            self.cmap.low = min_val
+            self.cmap.high = max_val
 
     def set_autoscale(self, val: bool) -> None:
 
@@ -374,3 +1036,4 @@ class ColourMap(Column, DataModel):
         """
 
         return self._autoscale
+
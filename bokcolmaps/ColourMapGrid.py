@@ -0,0 +1,276 @@
+"""
+ColourMapGrid class definition
+"""
+
+import numpy
+
+from bokeh.model import DataModel
+
+from bokeh.models import ColumnDataSource, Plot, ColorBar, HoverTool, CDSView, IndexFilter, GridPlot
+from bokeh.models.mappers import LinearColorMapper
+from bokeh.models.ranges import Range1d
+from bokeh.models.layouts import Column
+from bokeh.models.callbacks import CustomJS
+
+from bokeh.core.properties import Instance, List, String, Float
+
+from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
+from bokcolmaps.check_kwargs import check_kwargs
+from bokcolmaps.generate_colourbar import generate_colourbar
+from bokcolmaps.read_colourmap import read_colourmap
+from bokcolmaps.get_percentile_min_max import get_percentile_min_max, parse_percentile
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+class ColourMapGrid(Column, DataModel):
+
+    """
+    Plots chosen slices of a data cube side by side as a grid of colour maps
+    ("small multiples") with linked ranges. The panels share one data source
+    (one row per panel, each a view of a slice of dm), one colour mapper,
+    one colour bar and one hover callback, so the data and mapping are not
+    duplicated per panel as they would be with separate ColourMaps.
+    """
+
+    grid = Instance(GridPlot)
+    plots = List(Instance(Plot))
+    cbplot = Instance(Plot)
+    cbar = Instance(ColorBar)
+
+    datasrc = Instance(ColumnDataSource)
+    cmap = Instance(LinearColorMapper)
+
+    _title_root = String
+    _zlab = String
+
+    _cbdelta = Float
+
+    _js_hover = String
+
+    def __init__(self, x: numpy.array, y: numpy.array, z: numpy.array, dm: numpy.ndarray, **kwargs: dict) -> None:
+
+        """
+        args...
+            x: 1D NumPy array of x coordinates
+            y: 1D NumPy array of y coordinates
+            z: 1D NumPy array of z coordinates
+            dm: 3D NumPy array of the data, dimensions z.size, y.size, x.size
+        kwargs: all in get_common_kwargs (the colour scale limits are those
+        of the chosen slices if rmin and rmax not both given) plus...
+            zinds: z indices of the slices to plot (default all)
+            ncols: number of panels in each row of the grid (default 4)
+            height: panel height (pixels)
+            width: panel width (pixels)
+            hover: Boolean to enable hover tool readout
+        """
+
+        from bokeh.plotting import figure, gridplot  # Deferred to keep package import fast
+
+        check_kwargs(kwargs, extra_kwargs=['zinds', 'ncols', 'height', 'width', 'hover'])
+
+        palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
+            rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
+
+        zinds = kwargs.get('zinds', None)
+        ncols = kwargs.get('ncols', 4)
+        height = kwargs.get('height', 250)
+        width = kwargs.get('width', 250)
+        hover = kwargs.get('hover', True)
+
+        if len(dm.shape) != 3:
+            raise ValueError('dm array must be 3D')
+        if (x.size != dm.shape[2]) or (y.size != dm.shape[1]) or (z.size != dm.shape[0]):
+            raise ValueError('x, y or z array size not consistent with dimensions of dm array')
+
+        if zinds is None:
+            zinds = range(z.size)
+        zinds = [int(zi) for zi in zinds]
+        if len(zinds) == 0:
+            raise ValueError('Invalid z indices: none chosen')
+        for zi in zinds:
+            if (zi < 0) or (zi >= z.size):
+                raise ValueError('Invalid z index: ' + str(zi))
+
+        super().__init__()
+
+        self._cbdelta = 0.01  # Min colourbar range (used if values are equal)
+
+        self._title_root = dmlab
+        self._zlab = zlab
+
+        # Colour scale limits of the chosen slices (percentiles for robust limits)
+
+        with Instrumentation.timer('ColourMapGrid.stats'):
+            pmin, pmax = parse_percentile(rmin), parse_percentile(rmax)
+            if (pmin is not None) or (pmax is not None):
+                if ((pmin is None) and (rmin is not None)) or ((pmax is None) and (rmax is not None)):
+                    raise ValueError('rmin and rmax must both be percentiles if either is')
+                rmin, rmax = _get_limits(dm, zinds, self._cbdelta,
+                                         0 if pmin is None else pmin, 100 if pmax is None else pmax)
+            elif (rmin is None) or (rmax is None):
+                min_val, max_val = _get_limits(dm, zinds, self._cbdelta)
+                rmin = min_val if rmin is None else rmin
+                rmax = max_val if rmax is None else rmax
+
+        # One row per panel, each image a view of a slice of dm (no copies)
+
+        npanels = len(zinds)
+        self.datasrc = ColumnDataSource(data={'image': [dm[zi] for zi in zinds],
+                                              'z': [z[zi] for zi in zinds],
+                                              'xp': [0] * npanels, 'yp': [0] * npanels,
+                                              'dp': [0] * npanels})
+
+        # Get the colourmap
+
+        if cfile is not None:
+            palette = read_colourmap(cfile).data['colours']
+        if revcols:
+            pal = list(palette)
+            pal.reverse()
+            palette = tuple(pal)
+        self.cmap = LinearColorMapper(palette=palette, nan_color=nan_colour, low=rmin, high=rmax)
+
+        # One hover callback for all panels: the hovered panel's row is given
+        # by the index filter of the hovered renderer. Every row gets the
+        # readout so the tooltip is correct whichever row it shows.
+
+        self._js_hover = """
+        var geom = cb_data['geometry'];
+        var data = datasrc.data;
+
+        var renderer = cb_data['renderer'];
+        var filter = ((renderer != null) && (renderer.view != null)) ? renderer.view.filter : null;
+        if ((filter == null) || (filter.indices == null) || (filter.indices.length == 0)) {
+            return;
+        }
+        var p = filter.indices[0];
+
+        var dx = x[1] - x[0];
+        var dy = y[1] - y[0];
+        var xind = Math.floor((geom.x + dx/2 - x[0])/dx);
+        var yind = Math.floor((geom.y + dy/2 - y[0])/dy);
+
+        if ((xind >= 0) && (xind < x.length) && (yind >= 0) && (yind < y.length)) {
+            var n = data['image'].length;
+            data['xp'] = new Array(n).fill(x[xind]);
+            data['yp'] = new Array(n).fill(y[yind]);
+            data['dp'] = new Array(n).fill(data['image'][p][yind*x.length + xind]);
+        }
+        """
+
+        # Linked ranges (whole range unless externally controlled)
+
+        xoffs = (x[0] - x[1]) / 2
+        if xran is None:
+            xran = Range1d(start=x[0], end=x[-1])
+        else:
+            xoffs += x[0] - xran.start
+        yoffs = (y[0] - y[1]) / 2
+        if yran is None:
+            yran = Range1d(start=y[0], end=y[-1])
+        else:
+            yoffs += y[0] - yran.start
+
+        # The images are displayed such that x and y coordinate values
+        # correspond to the centres of rectangles
+
+        pw = abs(x[-1] - x[0]) + abs(x[1] - x[0])
+        ph = abs(y[-1] - y[0]) + abs(y[1] - y[0])
+
+        xs = 0 if xran.start is None else xran.start + xoffs
+        ys = 0 if yran.start is None else yran.start + yoffs
+
+        origin = ('top' if y[-1] < y[0] else 'bottom') + '_' + ('right' if x[-1] < x[0] else 'left')
+
+        cjs_hover = CustomJS(args={'datasrc': self.datasrc, 'x': x, 'y': y}, code=self._js_hover)
+
+        # Create the panels
+
+        with Instrumentation.timer('ColourMapGrid.figure'):
+
+            for p, zi in enumerate(zinds):
+
+                plot = figure(x_axis_label=xlab, y_axis_label=ylab,
+                              x_range=xran, y_range=yran,
+                              height=height, width=width,
+                              tools='reset, pan, wheel_zoom, box_zoom, save', output_backend=output_backend)
+
+                plot.title.text = self._zlab + ' = ' + str(z[zi])
+                plot.title.text_font = 'garamond'
+                plot.title.text_font_size = '10pt'
+                plot.title.text_font_style = 'bold'
+                plot.title.align = 'center'
+
+                view = CDSView(filter=IndexFilter(indices=[p]))
+
+                plot.image('image', source=self.datasrc, view=view, x=xs, y=ys,
+                           dw=pw, dh=ph, color_mapper=self.cmap, global_alpha=alpha,
+                           origin=origin, anchor=origin)
+
+                # Needed for HoverTool...
+
+                rect = plot.rect(x=(x[0] + x[-1]) / 2, y=(y[0] + y[-1]) / 2, width=pw, height=ph,
+                                 line_alpha=0, fill_alpha=0, source=self.datasrc,
+                                 view=CDSView(filter=IndexFilter(indices=[p])))
+
+                if hover:
+                    plot.add_tools(HoverTool(tooltips=[(xlab, '@xp{0.00}'),
+                                                       (ylab, '@yp{0.00}'),
+                                                       (dmlab, '@dp{0.00}')],
+                                             renderers=[rect], callback=cjs_hover,
+                                             point_policy='follow_mouse'))
+
+                plot.xaxis.axis_label_text_font = 'garamond'
+                plot.xaxis.axis_label_text_font_size = '10pt'
+                plot.xaxis.axis_label_text_font_style = 'bold'
+
+                plot.yaxis.axis_label_text_font = 'garamond'
+                plot.yaxis.axis_label_text_font_size = '10pt'
+                plot.yaxis.axis_label_text_font_style = 'bold'
+
+                self.plots.append(plot)
+
+            self.grid = gridplot(self.plots, ncols=ncols, merge_tools=True, toolbar_location='right')
+
+            # One colour bar for all panels
+
+            self.cbplot = figure(height=round(height / 5) + 60, width=min(ncols, npanels) * width,
+                                 x_axis_type=None, y_axis_type=None, toolbar_location=None,
+                                 outline_line_color=None, output_backend=output_backend)
+            self.cbar = generate_colourbar(self.cmap, cbarwidth=round(height / 10))
+            self.cbar.title = self._title_root
+            self.cbplot.add_layout(self.cbar, 'center')
+
+            self.children.append(self.grid)
+            self.children.append(self.cbplot)
+
+
+def _get_limits(dm: numpy.ndarray, zinds: list, delta: float, pmin: float=None, pmax: float=None) -> tuple:
+
+    """
+    Colour scale limits of the values of the chosen slices pooled
+    (percentiles if pmin and pmax given, sampled from each slice in turn),
+    without indexing dm with zinds (which would copy the slices)
+    """
+
+    if pmin is not None:
+        return get_percentile_min_max([dm[zi] for zi in zinds], delta, pmin, pmax)
+
+    # Extremes of the finite values of each slice (no offset until combined)
+
+    mins, maxs = [], []
+    for zi in zinds:
+        dfi = dm[zi][numpy.isfinite(dm[zi])]
+        if dfi.size > 0:
+            mins.append(dfi.min())
+            maxs.append(dfi.max())
+
+    if not mins:
+        return 0, delta
+    min_val, max_val = min(mins), max(maxs)
+    if max_val == min_val:
+        max_val += delta
+
+    return min_val, max_val
@@ -13,14 +13,15 @@ from bokeh.models.widgets import Div
 from bokeh.models.callbacks import CustomJS
 from bokeh.models.tools import HoverTool
 
-from bokeh.core.properties import Instance, String
-
-from bokeh.plotting import figure
+from bokeh.core.properties import Instance, Nullable, String
 
 from bokcolmaps.ColourMap import ColourMap
 
 from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
 from bokcolmaps.check_kwargs import check_kwargs
+from bokcolmaps.get_percentile_min_max import parse_percentile
+from bokcolmaps.Instrumentation import Instrumentation
 
 
 class ColourMapLP(Row, DataModel):
@@ -35,6 +36,7 @@ class ColourMapLP(Row, DataModel):
     btn = Instance(Button)
     lplot = Instance(Plot)
     lpds = Instance(ColumnDataSource)
+    hvsrc = Nullable(Instance(ColumnDataSource))  # Hover cell sent to the server (dmserver only)
     _cmxlab = String
     _cmylab = String
     _js_hover = String
@@ -53,12 +55,29 @@ class ColourMapLP(Row, DataModel):
                   ColourMapLP not used with Bokeh Server)
         padleft: padding (pixels) to left of line plot (default 0)
         padabove: padding (pixels) above line plot (default 0)
+        cscale: colour scale ('linear', 'eqhist', 'log' or 'symlog')
+        autoscale: autoscaling mode ('slice', 'global' or 'window:N')
+        linthresh: scale of the linear region for the symlog colour scale
+        dmserver: keep dm on the server only (see ColourMap), in which case the
+                  hover tool sends the cell under the cursor to the server
+                  and only that profile is sent back
+        hoverinterval: minimum time (milliseconds) between hover cells sent
+                       to the server if dmserver (default 100)
+        render: 'client' or 'rgba' (see ColourMap, implies dmserver)
+        rgbacache: number of RGBA slices cached for render 'rgba'
+        contours: list of contour levels to overlay (see ColourMap)
+        boxstats: add a box selection statistics readout (see ColourMap)
         """
 
-        check_kwargs(kwargs, extra_kwargs=['cmheight', 'cmwidth', 'lpheight', 'lpwidth', 'revz', 'hoverdisp', 'scbutton', 'padleft', 'padabove'])
+        from bokeh.plotting import figure
+
+        check_kwargs(kwargs, extra_kwargs=['cmheight', 'cmwidth', 'lpheight', 'lpwidth', 'revz', 'hoverdisp',
+                                           'scbutton', 'padleft', 'padabove', 'cscale', 'autoscale', 'linthresh',
+                                           'dmserver', 'hoverinterval', 'render', 'rgbacache', 'contours', 'boxstats'])
 
         palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
             rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
 
         cmheight = kwargs.get('cmheight', 575)
         cmwidth = kwargs.get('cmwidth', 500)
@@ -70,93 +89,165 @@ class ColourMapLP(Row, DataModel):
         padleft = kwargs.get('padleft', 0)
         padabove = kwargs.get('padabove', 0)
         hover = kwargs.get('hover', True)
+        cscale = kwargs.get('cscale', 'linear')
+        autoscale = kwargs.get('autoscale', 'slice')
+        linthresh = kwargs.get('linthresh', 1)
+        dmserver = kwargs.get('dmserver', False)
+        hoverinterval = kwargs.get('hoverinterval', 100)
+        render = kwargs.get('render', 'client')
+        rgbacache = kwargs.get('rgbacache', 32)
+        contours = kwargs.get('contours', None)
+        boxstats = kwargs.get('boxstats', False)
+        if render == 'rgba':  # No dm on the client for the profiles either
+            dmserver = True
 
         super().__init__()
 
-        # Data source for the line plot
+        # Data source for the line plot, in time order after appending
+        # slices (slot is the ring buffer slot of each point)
         xi = round(x.size / 2)
         yi = round(y.size / 2)
-        self.lpds = ColumnDataSource(data={'x': dm[:, yi, xi], 'y': z})
+        self.lpds = ColumnDataSource(data={'x': dm[:, yi, xi].copy(), 'y': z.copy(),
+                                           'slot': numpy.arange(z.size)})
+        self._lpind = yi * x.size + xi  # Last profile position set from Python
 
         self.cmplot = ColourMap(x, y, z, dm,
                                 palette=palette, cfile=cfile, revcols=revcols,
                                 xlab=xlab, ylab=ylab, zlab=zlab, dmlab=dmlab,
                                 height=cmheight, width=cmwidth, rmin=rmin,
                                 rmax=rmax, xran=xran, yran=yran, hover=hover,
-                                alpha=alpha, nan_colour=nan_colour)
+                                alpha=alpha, nan_colour=nan_colour, output_backend=output_backend,
+                                cscale=cscale, autoscale=autoscale, linthresh=linthresh,
+                                dmserver=dmserver, render=render, rgbacache=rgbacache,
+                                contours=contours, boxstats=boxstats)
 
         # Custom hover tool to render profile at cursor position in line plot
+        # (the cell is kept to redraw the profile when slices are appended)
+
+        js_profile = """
+            var dm = datasrc.data['dm'][0];
+            var lx = lpsrc.data['x'];
+            var slot = lpsrc.data['slot'];
+            var skip = datasrc.data['x'][0].length*datasrc.data['y'][0].length;
+            for (var i = 0; i < lx.length; i++) {
+                lx[i] = dm[lpsrc._ind + slot[i]*skip];
+            }
+        """
 
         self._js_hover = self.cmplot._js_hover + """
         var lpdata = lpsrc.data;
         var lx = lpdata['x'];
 
         if ((xind >= 0) && (xind < x.length) && (yind >= 0) && (yind < y.length)) {
-            var dm = data['dm'][0];
-
-            var skip = x.length*y.length;
+            lpsrc._ind = zind;
+            """ + js_profile + """
+        }
+        else {
             for (var i = 0; i < lx.length; i++) {
-                lx[i] = dm[zind + i*skip];
+                lx[i] = NaN;
+            }
+        }
+        lpsrc.change.emit();
+        """
+
+        # Or with dm on the server, send the latest cell at most once per
+        # interval for the server to send back the profile
+
+        js_hover_server = self.cmplot._js_hover + """
+        var lx = lpsrc.data['x'];
+
+        if ((xind >= 0) && (xind < x.length) && (yind >= 0) && (yind < y.length)) {
+            hvsrc._pending = [xind, yind];
+            if (hvsrc._timer == null) {
+                var wait = Math.max(0, (hvsrc._last || 0) + interval - Date.now());
+                hvsrc._timer = setTimeout(function() {
+                    hvsrc._timer = null;
+                    var cell = hvsrc._pending;
+                    var sent = hvsrc.data;
+                    if ((cell != null) && ((cell[0] != sent['xind'][0]) || (cell[1] != sent['yind'][0]))) {
+                        hvsrc._last = Date.now();
+                        hvsrc.data = {'xind': [cell[0]], 'yind': [cell[1]]};
+                    }
+                }, wait);
             }
         }
         else {
+            hvsrc._pending = null;
             for (var i = 0; i < lx.length; i++) {
                 lx[i] = NaN;
             }
+            lpsrc.change.emit();
         }
-        lpsrc.change.emit();
         """
 
-        cjs = CustomJS(args={'datasrc': self.cmplot.datasrc,
-                             'lpsrc': self.lpds},
-                       code=self._js_hover)
+        if dmserver:
+            self.hvsrc = ColumnDataSource(data={'xind': [-1], 'yind': [-1]})
+            self.hvsrc.on_change('data', self._hover_profile)
+            cjs = CustomJS(args={'datasrc': self.cmplot.datasrc, 'lpsrc': self.lpds,
+                                 'hvsrc': self.hvsrc, 'interval': hoverinterval},
+                           code=js_hover_server)
+        else:
+            cjs = CustomJS(args={'datasrc': self.cmplot.datasrc,
+                                 'lpsrc': self.lpds},
+                           code=self._js_hover)
+            self.lpds.js_on_change('data', CustomJS(args={'datasrc': self.cmplot.datasrc,
+                                                          'lpsrc': self.lpds},
+                                                    code="""
+        if (lpsrc._ind != null) {  // Profile at the hovered cell, not the one sent
+            """ + js_profile + """
+            lpsrc.change.emit();
+        }
+        """))
         if hoverdisp:
-            htool = HoverTool(tooltips=[(xlab, '@xp{0.00}'),
-                                        (ylab, '@yp{0.00}'),
-                                        (dmlab, '@dp{0.00}')],
-                              callback=cjs, point_policy='follow_mouse')
+            tooltips = [(xlab, '@xp{0.00}'), (ylab, '@yp{0.00}')]
+            if render == 'client':  # The RGBA image has no data values
+                tooltips.append((dmlab, '@dp{0.00}'))
+            htool = HoverTool(tooltips=tooltips, callback=cjs, point_policy='follow_mouse')
         else:
             htool = HoverTool(tooltips=None, callback=cjs)
 
         self.cmplot.plot.add_tools(htool)
 
-        self.lplot = figure(x_axis_label=dmlab, y_axis_label=zlab,
-                            height=lpheight, width=lpwidth,
-                            tools=['reset, pan, wheel_zoom, box_zoom, save'],
-                            toolbar_location='right')
+        with Instrumentation.timer('ColourMapLP.figure'):
 
-        if revz:
-            self.lplot.y_range.start = z[-1]
-            self.lplot.y_range.end = z[0]
-        else:
-            self.lplot.y_range.start = z[0]
-            self.lplot.y_range.end = z[-1]
-        if (rmin is not None) and (rmax is not None):
-            self.lplot.x_range.start = rmin
-            self.lplot.x_range.end = rmax
+            self.lplot = figure(x_axis_label=dmlab, y_axis_label=zlab,
+                                height=lpheight, width=lpwidth,
+                                tools=['reset, pan, wheel_zoom, box_zoom, save'],
+                                toolbar_location='right', output_backend=output_backend)
+
+            if revz:
+                self.lplot.y_range.start = z[-1]
+                self.lplot.y_range.end = z[0]
+            else:
+                self.lplot.y_range.start = z[0]
+                self.lplot.y_range.end = z[-1]
+            if (rmin is not None) and (rmax is not None) and \
+               (parse_percentile(rmin) is None) and (parse_percentile(rmax) is None):
+                self.lplot.x_range.start = rmin
+                self.lplot.x_range.end = rmax
 
-        self.lplot.line('x', 'y', source=self.lpds, line_color='blue',
-                        line_width=2, line_alpha=1)
+            self.lplot.line('x', 'y', source=self.lpds, line_color='blue',
+                            line_width=2, line_alpha=1)
 
-        self.lplot.title.text = 'Profile at cursor'
+            self.lplot.title.text = 'Profile at cursor'
 
-        self.lplot.title.text_font = 'garamond'
-        self.lplot.title.text_font_size = '12pt'
-        self.lplot.title.text_font_style = 'bold'
-        self.lplot.title.align = 'center'
+            self.lplot.title.text_font = 'garamond'
+            self.lplot.title.text_font_size = '12pt'
+            self.lplot.title.text_font_style = 'bold'
+            self.lplot.title.align = 'center'
 
-        self.lplot.xaxis.axis_label_text_font = 'garamond'
-        self.lplot.xaxis.axis_label_text_font_size = '10pt'
-        self.lplot.xaxis.axis_label_text_font_style = 'bold'
+            self.lplot.xaxis.axis_label_text_font = 'garamond'
+            self.lplot.xaxis.axis_label_text_font_size = '10pt'
+            self.lplot.xaxis.axis_label_text_font_style = 'bold'
 
-        self.lplot.xaxis[0].ticker = AdaptiveTicker(desired_num_ticks=5)
-        self.lplot.xaxis[0].formatter = NumeralTickFormatter(format="0.00")
+            self.lplot.xaxis[0].ticker = AdaptiveTicker(desired_num_ticks=5)
+            self.lplot.xaxis[0].formatter = NumeralTickFormatter(format="0.00")
 
-        self.lplot.yaxis.axis_label_text_font = 'garamond'
-        self.lplot.yaxis.axis_label_text_font_size = '10pt'
-        self.lplot.yaxis.axis_label_text_font_style = 'bold'
+            self.lplot.yaxis.axis_label_text_font = 'garamond'
+            self.lplot.yaxis.axis_label_text_font_size = '10pt'
+            self.lplot.yaxis.axis_label_text_font_style = 'bold'
 
-        self.lpcon = Column(Div(text='', width=lpwidth, height=padabove), self.lplot)
+            self.lpcon = Column(Div(text='', width=lpwidth, height=padabove), self.lplot)
 
         if scbutton:
             self.btn = Button(label='Snap to centre', align='center')
@@ -171,6 +262,7 @@ class ColourMapLP(Row, DataModel):
 
         self._cmxlab = xlab
         self._cmylab = ylab
+        self._revz = revz
 
         self.centre_lp()
 
@@ -181,30 +273,89 @@ class ColourMapLP(Row, DataModel):
         centre of the image.
         """
 
-        # Get current colourmap axes centre points
+        with Instrumentation.timer('ColourMapLP.centre_lp') as timer:
+
+            # Get current colourmap axes centre points
 
-        x = (self.cmplot.plot.x_range.start + self.cmplot.plot.x_range.end) / 2
-        y = (self.cmplot.plot.y_range.start + self.cmplot.plot.y_range.end) / 2
+            x = (self.cmplot.plot.x_range.start + self.cmplot.plot.x_range.end) / 2
+            y = (self.cmplot.plot.y_range.start + self.cmplot.plot.y_range.end) / 2
 
-        # Find closet x and y indexes to centre of ranges
+            # Find closet x and y indexes to centre of ranges
+
+            ds = self.cmplot.datasrc.data
+            xa = ds['x'][0]
+            ya = ds['y'][0]
+            xi, = numpy.where(xa >= x)
+            xind = yind = 0
+            if xi.size > 0:
+                xind = xi[0]
+                if (xind > 0) and (abs(xa[xind - 1] - x) < abs(xa[xind] - x)):
+                    xind = xind - 1
+            yi, = numpy.where(ya >= y)
+            if yi.size > 0:
+                yind = yi[0]
+                if (yind > 0) and (abs(ya[yind - 1] - y) < abs(ya[yind] - y)):
+                    yind = yind - 1
+
+            # Update line plot source
+
+            if (xi.size > 0) and (yi.size > 0):
+                self._set_profile(xind, yind)
+                timer.nbytes = self.lpds.data['x'].nbytes
+
+    def _set_profile(self, xind: int, yind: int) -> None:
+
+        """
+        Set the line plot to the profile at the given x and y indices
+        """
 
         ds = self.cmplot.datasrc.data
-        xa = ds['x'][0]
-        ya = ds['y'][0]
-        xi, = numpy.where(xa >= x)
-        xind = yind = 0
-        if xi.size > 0:
-            xind = xi[0]
-            if (xind > 0) and (abs(xa[xind - 1] - x) < abs(xa[xind] - x)):
-                xind = xind - 1
-        yi, = numpy.where(ya >= y)
-        if yi.size > 0:
-            yind = yi[0]
-            if (yind > 0) and (abs(ya[yind - 1] - y) < abs(ya[yind] - y)):
-                yind = yind - 1
-
-        # Update line plot source
-
-        if (xi.size > 0) and (yi.size > 0):
-            skip = xa.size * ya.size
-            self.lpds.data['x'] = ds['dm'][0][yind * xa.size + xind::skip]
+        xsize = ds['x'][0].size
+        skip = xsize * ds['y'][0].size
+        self._lpind = yind * xsize + xind
+        self.lpds.data['x'] = self.cmplot.get_dm()[self._lpind::skip][self.lpds.data['slot']]
+
+    def _hover_profile(self, attrname: str, old: dict, new: dict) -> None:
+
+        """
+        Callback for the hover cell sent by the client (if dmserver)
+        """
+
+        with Instrumentation.timer('ColourMapLP.hover_profile'):
+            xind, yind = int(new['xind'][0]), int(new['yind'][0])
+            if (xind >= 0) and (yind >= 0):
+                self._set_profile(xind, yind)
+
+    def append_slice(self, d: numpy.ndarray, zval: float, display: bool=True) -> int:
+
+        """
+        Add a new slice to the ring buffer of the colour map (see
+        ColourMap.append_slice) and resend the line plot profile in time
+        order (for the cell last hovered, on the client or the server)
+        args...
+            d: 2D NumPy array of the new slice, dimensions y.size, x.size
+               (or 3D for several slices in arrival order, first dimension z)
+            zval: z coordinate of the new slice (or 1D NumPy array of them)
+        kwargs...
+            display: display the newest slice if True
+        returns the ring buffer slot (z index) of the newest slice
+        """
+
+        zind = self.cmplot.append_slice(d, zval, display=display)
+
+        # Slots from the oldest to the newest slice
+
+        nz = self.lpds.data['y'].size
+        slot = (zind + 1 + numpy.arange(nz)) % nz
+
+        skip = d.shape[-1] * d.shape[-2]
+        self.lpds.data = {'x': self.cmplot.get_dm()[self._lpind::skip][slot],
+                          'y': self.cmplot.datasrc.data['z'][0][slot], 'slot': slot}
+
+        z = self.lpds.data['y']
+        if self._revz:
+            self.lplot.y_range.start, self.lplot.y_range.end = z.max(), z.min()
+        else:
+            self.lplot.y_range.start, self.lplot.y_range.end = z.min(), z.max()
+
+        return zind
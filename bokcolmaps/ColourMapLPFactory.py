@@ -0,0 +1,229 @@
+"""
+ColourMapLPFactory class definition
+"""
+
+import json
+import re
+
+import numpy
+
+from bokcolmaps.check_kwargs import check_kwargs
+from bokcolmaps.get_slice_min_max import get_slice_min_max
+from bokcolmaps.DatasetRegistry import DatasetRegistry
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+class ColourMapLPFactory:
+
+    """
+    Fast construction of many ColourMapLP plots with the same layout and
+    options but different data (e.g. for dashboards). A template ColourMapLP
+    is built and serialised (json_item) once, with placeholders for the data
+    sources, ranges, glyph positions and titles. Each plot is then a copy of
+    the serialised template with fresh model ids and these values filled in,
+    so no Bokeh models are constructed per plot. Only the JS (client side)
+    features are supported as the copies have no Python callbacks.
+
+    Usage...
+        factory = ColourMapLPFactory(cmheight=300, cmwidth=300, cscale='log')
+        items = [factory.get_json(x, y, z, dm, title=name) for name, dm in ...]
+        (then Bokeh.embed.embed_item(JSON.parse(item), 'div_id') in the page)
+    """
+
+    def __init__(self, **kwargs: dict) -> None:
+
+        """
+        kwargs: all for ColourMapLP except...
+            xran, yran: each plot has its own ranges, set from its data
+            cscale: 'linear', 'log' or 'symlog' only
+            scbutton, dmserver, hoverinterval, render, rgbacache, contours,
+            boxstats: need Bokeh Server callbacks
+        """
+
+        from bokeh.embed import json_item  # Deferred to keep import fast
+        from bokeh.models import Image, Rect
+
+        from bokcolmaps.ColourMapLP import ColourMapLP
+
+        check_kwargs(kwargs, extra_kwargs=['cmheight', 'cmwidth', 'lpheight', 'lpwidth', 'revz', 'hoverdisp',
+                                           'padleft', 'padabove', 'cscale', 'autoscale', 'linthresh'])
+        for kwarg in ['xran', 'yran']:
+            if kwarg in kwargs:
+                raise ValueError('Invalid keyword argument: ' + kwarg)
+
+        cscale = kwargs.get('cscale', 'linear')
+        if cscale not in ['linear', 'log', 'symlog']:
+            raise ValueError('Invalid colour scale: ' + str(cscale))
+
+        self._revz = kwargs.get('revz', False)
+
+        with Instrumentation.timer('ColourMapLPFactory.template'):
+
+            # Template with the minimum data (replaced in every plot)
+
+            c = numpy.arange(2, dtype=float)
+            template = ColourMapLP(c, c, c, numpy.ones((2, 2, 2)), **kwargs)
+            cmplot = template.cmplot
+
+            self._cmplot = cmplot  # For the colour scale settings
+            self._title_root = cmplot._title_root
+            self._zlab = cmplot._zlab
+            self._minmax = cmplot.mmsrc.data['minvals'][0], cmplot.mmsrc.data['maxvals'][0]
+
+            item = json_item(template)
+
+            models = {}
+            _index(item['doc'], models)
+
+            # Placeholders for the values set per plot
+
+            for name, model, attr in [('datasrc', cmplot.datasrc, 'data'), ('mmsrc', cmplot.mmsrc, 'data'),
+                                      ('lpds', template.lpds, 'data'),
+                                      ('low', cmplot.cmap, 'low'), ('high', cmplot.cmap, 'high'),
+                                      ('title', cmplot.plot.title, 'text'),
+                                      ('xstart', cmplot.plot.x_range, 'start'), ('xend', cmplot.plot.x_range, 'end'),
+                                      ('ystart', cmplot.plot.y_range, 'start'), ('yend', cmplot.plot.y_range, 'end'),
+                                      ('zstart', template.lplot.y_range, 'start'),
+                                      ('zend', template.lplot.y_range, 'end')]:
+                models[model.id]['attributes'][attr] = '@V:' + name + '@'
+
+            # Found by glyph type, not position, so other renderers may be added
+
+            image, = [r for r in cmplot.plot.renderers if isinstance(r.glyph, Image)]
+            rect, = [r for r in cmplot.plot.renderers if isinstance(r.glyph, Rect)]
+            for renderer, specs, attrs in [(image, ['x', 'y', 'dw', 'dh'], ['origin', 'anchor']),
+                                           (rect, ['x', 'y', 'width', 'height'], [])]:
+                prefix = '@V:' + type(renderer.glyph).__name__ + '_'
+                for glyph in [renderer.glyph, renderer.nonselection_glyph, renderer.muted_glyph]:
+                    if (glyph is None) or isinstance(glyph, str):  # None or 'auto'
+                        continue
+                    for attr in specs:
+                        models[glyph.id]['attributes'][attr] = {'type': 'value', 'value': prefix + attr + '@'}
+                    for attr in attrs:
+                        models[glyph.id]['attributes'][attr] = prefix + attr + '@'
+
+            args = models[cmplot.cjs_slider.id]['attributes']['args']
+            if 'title_root' not in [k for k, _ in args['entries']]:  # Fail loudly if ColourMap changes
+                raise ValueError('Invalid template: no title_root argument in cjs_slider')
+            args['entries'] = [(k, '@V:title_root@' if k == 'title_root' else v) for k, v in args['entries']]
+
+            # Model ids prefixed per plot to be unique in a page
+
+            self._template = re.sub(r'"(id|root_id)": "', r'"\1": "@ID@', json.dumps(item))
+
+    def get_json(self, x: numpy.array, y: numpy.array, z: numpy.array, dm: numpy.ndarray, title: str=None) -> str:
+
+        """
+        Get a plot as json_item JSON
+        args...
+            x: 1D NumPy array of x coordinates
+            y: 1D NumPy array of y coordinates
+            z: 1D NumPy array of z coordinates
+            dm: 3D NumPy array of the data, dimensions z.size, y.size, x.size
+        kwargs...
+            title: colour map title (in place of dmlab)
+        """
+
+        from bokeh.core.serialization import Serializer  # Deferred to keep import fast
+        from bokeh.util.serialization import make_id
+
+        if (len(dm.shape) != 3) or (dm.shape != (z.size, y.size, x.size)):
+            raise ValueError('x, y or z array size not consistent with dimensions of dm array')
+        if (x.size < 2) or (y.size < 2):  # As for ColourMapLP
+            raise ValueError('x and y arrays must each have at least two coordinates')
+
+        with Instrumentation.timer('ColourMapLPFactory.get_json') as timer:
+
+            cmplot = self._cmplot
+            title_root = self._title_root if title is None else title
+
+            # Colour scale limits as for ColourMap
+
+            if cmplot._autoscale:
+                shared = DatasetRegistry.find(dm)
+                positive = cmplot._cscale == 'log'
+                if shared is not None:
+                    minvals, maxvals = shared.get_slice_min_max(cmplot._cbdelta, mode=cmplot._automode,
+                                                                plims=cmplot._plims, positive=positive)
+                else:
+                    minvals, maxvals = get_slice_min_max(dm, cmplot._cbdelta, mode=cmplot._automode,
+                                                         plims=cmplot._plims, positive=positive)
+            else:
+                minvals, maxvals = [self._minmax[0]] * z.size, [self._minmax[1]] * z.size
+
+            if cmplot._cscale == 'log':
+                low, high = minvals[0], maxvals[0]
+            else:
+                low, high = cmplot._transform(minvals[0]), cmplot._transform(maxvals[0])
+
+            # Image position as for ColourMap (x and y coordinates at the centres
+            # of the rectangles)
+
+            pw = abs(x[-1] - x[0]) + abs(x[1] - x[0])
+            ph = abs(y[-1] - y[0]) + abs(y[1] - y[0])
+            origin = ('top' if y[-1] < y[0] else 'bottom') + '_' + ('right' if x[-1] < x[0] else 'left')
+
+            if z.size > 1:
+                ptitle = title_root + ', ' + self._zlab + ' = ' + str(z[0])
+            else:
+                ptitle = title_root
+
+            xind, yind = _nearest(x, (x[0] + x[-1]) / 2), _nearest(y, (y[0] + y[-1]) / 2)
+
+            values = {'datasrc': {'x': [x], 'y': [y], 'z': [z], 'image': [cmplot._transform(dm[0])],
+                                  'dm': [dm.ravel()], 'xp': [0], 'yp': [0], 'dp': [0], 'zi': [0]},
+                      'mmsrc': {'minvals': numpy.asarray(minvals), 'maxvals': numpy.asarray(maxvals)},
+                      'lpds': {'x': dm[:, yind, xind].copy(), 'y': z, 'slot': numpy.arange(z.size)},
+                      'low': float(low), 'high': float(high),
+                      'title': ptitle, 'title_root': title_root,
+                      'xstart': float(x[0]), 'xend': float(x[-1]),
+                      'ystart': float(y[0]), 'yend': float(y[-1]),
+                      'zstart': float(z[-1] if self._revz else z[0]), 'zend': float(z[0] if self._revz else z[-1]),
+                      'Image_x': float(x[0] + (x[0] - x[1]) / 2), 'Image_y': float(y[0] + (y[0] - y[1]) / 2),
+                      'Image_dw': float(pw), 'Image_dh': float(ph),
+                      'Image_origin': origin, 'Image_anchor': origin,
+                      'Rect_x': float((x[0] + x[-1]) / 2), 'Rect_y': float((y[0] + y[-1]) / 2),
+                      'Rect_width': float(pw), 'Rect_height': float(ph)}
+
+            serializer = Serializer(deferred=False)
+            encoded = {name: json.dumps(serializer.encode(value)) for name, value in values.items()}
+
+            item = re.sub(r'"@V:(\w+)@"', lambda m: encoded[m.group(1)],
+                          self._template.replace('@ID@', make_id() + '-'))
+
+            timer.nbytes = len(item)
+
+        return item
+
+
+def _index(rep: object, models: dict) -> None:
+
+    """
+    Index the serialised models by id
+    """
+
+    if isinstance(rep, dict):
+        if (rep.get('type') == 'object') and ('id' in rep):
+            rep.setdefault('attributes', {})
+            models[rep['id']] = rep
+        for val in rep.values():
+            _index(val, models)
+    elif isinstance(rep, (list, tuple)):
+        for val in rep:
+            _index(val, models)
+
+
+def _nearest(a: numpy.array, v: float) -> int:
+
+    """
+    Index of the coordinate nearest v (as ColourMapLP.centre_lp)
+    """
+
+    i, = numpy.where(a >= v)
+    if i.size == 0:
+        return 0
+    ind = i[0]
+    if (ind > 0) and (abs(a[ind - 1] - v) < abs(a[ind] - v)):
+        ind -= 1
+
+    return int(ind)
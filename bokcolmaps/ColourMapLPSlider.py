@@ -14,6 +14,7 @@ from bokeh.core.properties import Instance
 from bokcolmaps.ColourMapLP import ColourMapLP
 
 from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
 from bokcolmaps.check_kwargs import check_kwargs
 
 
@@ -33,10 +34,13 @@ class ColourMapLPSlider(Column, DataModel):
         All init arguments same as for ColourMapLP
         """
 
-        check_kwargs(kwargs, extra_kwargs=['cmheight', 'cmwidth', 'lpheight', 'lpwidth', 'revz', 'hoverdisp', 'scbutton', 'padleft', 'padabove'])
+        check_kwargs(kwargs, extra_kwargs=['cmheight', 'cmwidth', 'lpheight', 'lpwidth', 'revz', 'hoverdisp',
+                                           'scbutton', 'padleft', 'padabove', 'cscale', 'autoscale', 'linthresh',
+                                           'dmserver', 'hoverinterval', 'render', 'rgbacache', 'contours', 'boxstats'])
 
         palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
             rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
 
         cmheight = kwargs.get('cmheight', 575)
         cmwidth = kwargs.get('cmwidth', 500)
@@ -47,6 +51,15 @@ class ColourMapLPSlider(Column, DataModel):
         scbutton = kwargs.get('scbutton', False)
         padleft = kwargs.get('padleft', 0)
         padabove = kwargs.get('padabove', 0)
+        cscale = kwargs.get('cscale', 'linear')
+        autoscale = kwargs.get('autoscale', 'slice')
+        linthresh = kwargs.get('linthresh', 1)
+        dmserver = kwargs.get('dmserver', False)
+        render = kwargs.get('render', 'client')
+        rgbacache = kwargs.get('rgbacache', 32)
+        contours = kwargs.get('contours', None)
+        boxstats = kwargs.get('boxstats', False)
+        hoverinterval = kwargs.get('hoverinterval', 100)
 
         super().__init__()
 
@@ -60,14 +73,21 @@ class ColourMapLPSlider(Column, DataModel):
                                   lpheight=lpheight, lpwidth=lpwidth,
                                   rmin=rmin, rmax=rmax, xran=xran, yran=yran,
                                   revz=revz, hoverdisp=hoverdisp, scbutton=scbutton,
-                                  alpha=alpha, nan_colour=nan_colour,
-                                  padleft=padleft, padabove=padabove)
+                                  alpha=alpha, nan_colour=nan_colour, output_backend=output_backend,
+                                  padleft=padleft, padabove=padabove,
+                                  cscale=cscale, autoscale=autoscale, linthresh=linthresh,
+                                  dmserver=dmserver, hoverinterval=hoverinterval,
+                                  render=render, rgbacache=rgbacache,
+                                  contours=contours, boxstats=boxstats)
 
         self.zslider = Slider(title=zlab + ' index', start=0, end=z.size - 1,
                               step=1, value=0, orientation='horizontal',
                               width=self.cmaplp.cmplot.plot.width)
 
-        self.zslider.js_on_change('value', self.cmaplp.cmplot.cjs_slider)
+        if self.cmaplp.cmplot._server_slices:  # Slices are sent by the server
+            self.zslider.on_change('value', self.cmaplp.cmplot.input_change)
+        else:
+            self.zslider.js_on_change('value', self.cmaplp.cmplot.cjs_slider)
 
         self.children.append(Column(self.zslider, width=self.width))
         self.children.append(self.cmaplp)
@@ -0,0 +1,185 @@
+"""
+ColourMapOrtho class definition
+"""
+
+import functools
+
+import numpy
+
+from bokeh.model import DataModel
+
+from bokeh.models import Span
+from bokeh.models.layouts import Row
+from bokeh.events import Tap
+
+from bokeh.core.properties import Instance
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
+from bokcolmaps.check_kwargs import check_kwargs
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+class ColourMapOrtho(Row, DataModel):
+
+    """
+    Orthogonal sections of a data cube: x-y, x-z and y-z ColourMaps linked
+    by a crosshair (for Bokeh Server applications). Tapping a panel moves
+    the crosshair there. The x-y panel holds dm itself (no copy) and the
+    x-z and y-z panels each hold a contiguous copy of their section (no
+    interpolation), and only the panels whose section changed are updated.
+    """
+
+    xyplot = Instance(ColourMap)
+    xzplot = Instance(ColourMap)
+    yzplot = Instance(ColourMap)
+
+    def __init__(self, x: numpy.array, y: numpy.array, z: numpy.array, dm: numpy.ndarray, **kwargs: dict) -> None:
+
+        """
+        args...
+            x: 1D NumPy array of x coordinates
+            y: 1D NumPy array of y coordinates
+            z: 1D NumPy array of z coordinates (uniform for the x-z and y-z
+               sections to be rendered correctly)
+            dm: 3D NumPy array of the data, dimensions z.size, y.size, x.size
+        kwargs: all in get_common_kwargs plus...
+            height: panel height (pixels)
+            width: panel width (pixels)
+            hover: Boolean to enable hover tool readout
+            cscale: colour scale ('linear', 'log' or 'symlog')
+            linthresh: scale of the linear region for the symlog colour scale
+        """
+
+        check_kwargs(kwargs, extra_kwargs=['height', 'width', 'hover', 'cscale', 'linthresh'])
+
+        palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
+            rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
+
+        height = kwargs.get('height', 400)
+        width = kwargs.get('width', 400)
+        hover = kwargs.get('hover', True)
+        cscale = kwargs.get('cscale', 'linear')
+        linthresh = kwargs.get('linthresh', 1)
+
+        if cscale not in ['linear', 'log', 'symlog']:
+            raise ValueError('Invalid colour scale: ' + str(cscale))
+        if (len(dm.shape) != 3) or (dm.shape != (z.size, y.size, x.size)):
+            raise ValueError('x, y or z array size not consistent with dimensions of dm array')
+
+        super().__init__()
+
+        self._x, self._y, self._z = x, y, z
+        self._dm = dm
+        self._dmlab = dmlab
+        self._labs = xlab, ylab, zlab
+        self._inds = [x.size // 2, y.size // 2, 0]  # Crosshair x, y and z indices
+
+        xi, yi = self._inds[:2]
+        common = {'palette': palette, 'cfile': cfile, 'revcols': revcols, 'dmlab': dmlab,
+                  'rmin': rmin, 'rmax': rmax, 'alpha': alpha, 'nan_colour': nan_colour,
+                  'output_backend': output_backend, 'height': height, 'width': width,
+                  'hover': hover, 'cscale': cscale, 'linthresh': linthresh}
+
+        # The x-z and y-z sections are strided views of dm, copied once by
+        # numpy.ascontiguousarray (the panels would otherwise copy them when
+        # flattening)
+
+        with Instrumentation.timer('ColourMapOrtho.panels'):
+
+            self.xyplot = ColourMap(x, y, z, dm, xlab=xlab, ylab=ylab, zlab=zlab,
+                                    xran=xran, yran=yran, dmserver=True, **common)
+            self.xzplot = ColourMap(x, z, y[yi:yi + 1], numpy.ascontiguousarray(dm[:, yi, :]),
+                                    xlab=xlab, ylab=zlab, zlab=ylab,
+                                    xran=self.xyplot.plot.x_range, dmserver=True, **common)
+            self.yzplot = ColourMap(y, z, x[xi:xi + 1], numpy.ascontiguousarray(dm[:, :, xi]),
+                                    xlab=ylab, ylab=zlab, zlab=xlab,
+                                    xran=self.xyplot.plot.y_range, yran=self.xzplot.plot.y_range,
+                                    dmserver=True, **common)
+
+        # Crosshair (vertical and horizontal lines on each panel)
+
+        self._spans = {}
+        for name, panel, h, v in [('xy', self.xyplot, 0, 1), ('xz', self.xzplot, 0, 2), ('yz', self.yzplot, 1, 2)]:
+            self._spans[name] = (Span(dimension='height', line_color='White', line_dash='dashed'),
+                                 Span(dimension='width', line_color='White', line_dash='dashed'))
+            for span in self._spans[name]:
+                panel.plot.add_layout(span)
+            panel.plot.on_event(Tap, functools.partial(self._tap, h, v))
+
+        self._update_titles()
+        self._update_spans()
+
+        self.children.append(self.xyplot)
+        self.children.append(self.xzplot)
+        self.children.append(self.yzplot)
+
+    def _tap(self, h: int, v: int, event: Tap) -> None:
+
+        """
+        Move the crosshair to a tapped position (h and v are the indices of
+        the panel's horizontal and vertical axis coordinates in x, y, z)
+        """
+
+        coords = self._x, self._y, self._z
+        inds = list(self._inds)
+        inds[h] = int(numpy.argmin(numpy.abs(coords[h] - event.x)))
+        inds[v] = int(numpy.argmin(numpy.abs(coords[v] - event.y)))
+
+        self.set_position(*inds)
+
+    def set_position(self, xind: int, yind: int, zind: int) -> None:
+
+        """
+        Move the crosshair, updating only the sections which change
+        args...
+            xind: x index (0 to x.size - 1)
+            yind: y index (0 to y.size - 1)
+            zind: z index (0 to z.size - 1)
+        """
+
+        for lab, ind, coords in [('x', xind, self._x), ('y', yind, self._y), ('z', zind, self._z)]:
+            if (not isinstance(ind, (int, numpy.integer))) or (ind < 0) or (ind >= coords.size):
+                raise ValueError('Invalid ' + lab + ' index: ' + str(ind))
+
+        with Instrumentation.timer('ColourMapOrtho.set_position'):
+
+            old = self._inds
+            self._inds = [int(xind), int(yind), int(zind)]
+
+            if zind != old[2]:
+                self.xyplot.update_image(zind)
+            if yind != old[1]:
+                self.xzplot.set_data(self._dm[:, yind, :])  # Strided views (copied once)
+            if xind != old[0]:
+                self.yzplot.set_data(self._dm[:, :, xind])
+
+            self._update_titles()
+            self._update_spans()
+
+    def get_position(self) -> tuple:
+
+        """
+        Return the crosshair x, y and z indices
+        """
+
+        return tuple(self._inds)
+
+    def _update_titles(self) -> None:
+
+        xi, yi, zi = self._inds
+        xlab, ylab, zlab = self._labs
+        self.xyplot.plot.title.text = self._dmlab + ', ' + zlab + ' = ' + str(self._z[zi])
+        self.xzplot.plot.title.text = self._dmlab + ', ' + ylab + ' = ' + str(self._y[yi])
+        self.yzplot.plot.title.text = self._dmlab + ', ' + xlab + ' = ' + str(self._x[xi])
+
+    def _update_spans(self) -> None:
+
+        xi, yi, zi = self._inds
+        for name, (h, v) in [('xy', (self._x[xi], self._y[yi])), ('xz', (self._x[xi], self._z[zi])),
+                             ('yz', (self._y[yi], self._z[zi]))]:
+            vspan, hspan = self._spans[name]
+            vspan.location = float(h)
+            hspan.location = float(v)
@@ -14,6 +14,7 @@ from bokeh.core.properties import Instance
 from bokcolmaps.ColourMap import ColourMap
 
 from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
 from bokcolmaps.check_kwargs import check_kwargs
 
 
@@ -33,14 +34,26 @@ class ColourMapSlider(Column, DataModel):
         All init arguments same as for ColourMap
         """
 
-        check_kwargs(kwargs, extra_kwargs=['height', 'width', 'hover'])
+        check_kwargs(kwargs, extra_kwargs=['height', 'width', 'hover', 'cscale', 'autoscale', 'linthresh', 'dmserver',
+                                           'render', 'rgbacache', 'contours', 'projections', 'boxstats', 'fullres'])
 
         palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
             rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
 
         height = kwargs.get('height', 575)
         width = kwargs.get('width', 500)
         hover = kwargs.get('hover', True)
+        cscale = kwargs.get('cscale', 'linear')
+        autoscale = kwargs.get('autoscale', 'slice')
+        linthresh = kwargs.get('linthresh', 1)
+        dmserver = kwargs.get('dmserver', False)
+        render = kwargs.get('render', 'client')
+        rgbacache = kwargs.get('rgbacache', 32)
+        contours = kwargs.get('contours', None)
+        projections = kwargs.get('projections', None)
+        boxstats = kwargs.get('boxstats', False)
+        fullres = kwargs.get('fullres', None)
 
         super().__init__()
 
@@ -52,13 +65,21 @@ class ColourMapSlider(Column, DataModel):
                               xlab=xlab, ylab=ylab, zlab=zlab, dmlab=dmlab,
                               height=height, width=width, rmin=rmin, rmax=rmax,
                               xran=xran, yran=yran, hover=hover,
-                              alpha=alpha, nan_colour=nan_colour)
-
-        self.zslider = Slider(title=zlab + ' index', start=0, end=z.size - 1,
+                              alpha=alpha, nan_colour=nan_colour, output_backend=output_backend,
+                              cscale=cscale, autoscale=autoscale, linthresh=linthresh,
+                              dmserver=dmserver, render=render, rgbacache=rgbacache,
+                              contours=contours, projections=projections,
+                              boxstats=boxstats, fullres=fullres)
+
+        nproj = 0 if projections is None else len(projections)  # Extra slices after the last z index
+        self.zslider = Slider(title=zlab + ' index', start=0, end=z.size + nproj - 1,
                               step=1, value=0, orientation='horizontal',
                               width=self.cmap.plot.width)
 
-        self.zslider.js_on_change('value', self.cmap.cjs_slider)
+        if self.cmap._server_slices:  # Slices are sent by the server
+            self.zslider.on_change('value', self.cmap.input_change)
+        else:
+            self.zslider.js_on_change('value', self.cmap.cjs_slider)
 
         self.children.append(Column(self.zslider, width=self.width))
         self.children.append(self.cmap)
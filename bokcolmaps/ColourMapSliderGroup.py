@@ -0,0 +1,185 @@
+"""
+ColourMapSliderGroup class definition
+"""
+
+from bokeh.model import DataModel
+
+from bokeh.models import Model
+from bokeh.models.widgets import Slider
+from bokeh.models.layouts import Column, Row
+from bokeh.models.callbacks import CustomJS
+
+from bokeh.core.properties import Instance, List
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.symlog_transform import js_symlog_transform
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+class ColourMapSliderGroup(Column, DataModel):
+
+    """
+    A single slider linked to the z coordinate of several colour maps
+    (e.g. different variables on the same z axis). Each slider movement
+    runs one JS callback for all the maps, which copies the slices and
+    updates the colour scales and titles in one animation frame (slider
+    movements between frames are coalesced), or if any map keeps its data
+    on the server (dmserver or render 'rgba') or needs the displayed slice
+    there (contours or boxstats) one server callback updating all the maps
+    with the document held, so the changes are sent together.
+    """
+
+    cmaps = List(Instance(ColourMap))
+    zslider = Instance(Slider)
+
+    def __init__(self, plots: list, **kwargs: dict) -> None:
+
+        """
+        args...
+            plots: list of ColourMap, ColourMapLP, ColourMapSlider or
+                   ColourMapLPSlider objects with the same number of slices
+                   (the sliders of ColourMapSlider and ColourMapLPSlider
+                   objects are hidden)
+        kwargs...
+            width: slider width (pixels, default that of the first map)
+            server: use the server callback even if all the maps have dm
+                    on the client (default False)
+        """
+
+        for kwarg in kwargs:  # No common kwargs
+            if kwarg not in ['width', 'server']:
+                raise ValueError('Invalid keyword argument: ' + kwarg)
+
+        server = kwargs.get('server', False)
+
+        super().__init__()
+
+        for p in plots:
+            self.cmaps.append(_get_cmap(p))
+            if hasattr(p, 'zslider'):
+                p.zslider.visible = False
+
+        zsize = self.cmaps[0]._zsize
+        for cm in self.cmaps:
+            if cm._zsize != zsize:
+                raise ValueError('Inconsistent numbers of slices: ' + str(cm._zsize) + ', ' + str(zsize))
+
+        width = kwargs.get('width', self.cmaps[0].plot.width)
+
+        self.zslider = Slider(title=self.cmaps[0]._zlab + ' index', start=0, end=zsize - 1,
+                              step=1, value=0, orientation='horizontal', width=width)
+
+        if server or any(cm._server_slices for cm in self.cmaps):
+            self.zslider.on_change('value', self.input_change)
+        else:
+            self.zslider.js_on_change('value', self._get_js_slider())
+
+        self.children.append(Column(self.zslider, width=width))
+        self.children.append(Row(children=list(plots)))
+
+    def _get_js_slider(self) -> CustomJS:
+
+        """
+        Get the JS slider callback for all the maps
+        """
+
+        js_slider = """
+        if (slider._raf != null) {
+            return;  // Already scheduled, and the latest value will be used
+        }
+
+        slider._raf = requestAnimationFrame(function() {
+            slider._raf = null;
+            var dind = slider.value;
+
+            for (var m = 0; m < datasrcs.length; m++) {
+                var linthresh = linthreshs[m];
+                """ + js_symlog_transform + """
+                if (linthresh == null) {
+                    tf = function(v) {return v;};
+                }
+
+                var data = datasrcs[m].data;
+                var d = data['image'][0];
+                var dm = data['dm'][0];
+                var n = d.length;
+                var sind = dind*n;
+                for (var i = 0; i < n; i++) {
+                    d[i] = tf(dm[sind+i]);
+                }
+                data['zi'] = [dind];
+
+                var mmdata = mmsrcs[m].data;
+                cmaps[m].low = tf(mmdata['minvals'][dind]);
+                cmaps[m].high = tf(mmdata['maxvals'][dind]);
+
+                if (palettes[m] != null) {  // Histogram equalisation
+                    var cinds = mmdata['cinds'][dind];
+                    var pal = new Array(cinds.length);
+                    for (var i = 0; i < cinds.length; i++) {
+                        pal[i] = palettes[m][cinds[i]];
+                    }
+                    cmaps[m].palette = pal;
+                }
+
+                plots[m].title.text = title_roots[m] + ', ' + zlabs[m] + ' = ' + data['z'][0][dind].toString();
+            }
+
+            for (var m = 0; m < datasrcs.length; m++) {
+                datasrcs[m].change.emit();
+            }
+        });
+        """
+
+        return CustomJS(args={'slider': self.zslider,
+                              'datasrcs': [cm.datasrc for cm in self.cmaps],
+                              'mmsrcs': [cm.mmsrc for cm in self.cmaps],
+                              'cmaps': [cm.cmap for cm in self.cmaps],
+                              'plots': [cm.plot for cm in self.cmaps],
+                              'title_roots': [cm._title_root for cm in self.cmaps],
+                              'zlabs': [cm._zlab for cm in self.cmaps],
+                              'linthreshs': [float(cm._linthresh) if cm._cscale == 'symlog' else None
+                                             for cm in self.cmaps],
+                              'palettes': [cm._palette if cm._cscale == 'eqhist' else None
+                                           for cm in self.cmaps]},
+                        code=js_slider)
+
+    def input_change(self, attrname: str, old: int, new: int) -> None:
+
+        """
+        Callback for the slider in Bokeh Server applications (also usable
+        to set the slice of all the maps from Python)
+        """
+
+        with Instrumentation.timer('ColourMapSliderGroup.input_change'):
+            doc = self.document
+            if (doc is not None) and (doc.callbacks.hold_value is not None):
+                doc = None  # Already held by the caller
+            if doc is not None:
+                doc.hold('combine')
+            try:
+                for cm in self.cmaps:
+                    cm.input_change(attrname, old, new)
+            finally:
+                if doc is not None:
+                    doc.unhold()
+
+
+def _get_cmap(plot: Model) -> ColourMap:
+
+    """
+    Get the ColourMap of a ColourMap, ColourMapLP, ColourMapSlider or
+    ColourMapLPSlider object
+    """
+
+    if hasattr(plot, 'cmaplp'):  # ColourMapLPSlider
+        plot = plot.cmaplp
+    if hasattr(plot, 'cmplot'):  # ColourMapLP
+        plot = plot.cmplot
+    if (not isinstance(plot, ColourMap)) and isinstance(getattr(plot, 'cmap', None), ColourMap):  # ColourMapSlider
+        plot = plot.cmap
+
+    if not isinstance(plot, ColourMap):
+        raise ValueError('Invalid plot: ' + type(plot).__name__)
+
+    return plot
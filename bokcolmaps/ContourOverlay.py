@@ -0,0 +1,104 @@
+"""
+ContourOverlay class definition
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable
+
+import numpy
+
+from bokeh.models import ColumnDataSource, Plot
+
+from bokcolmaps.get_contours import get_contours
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+class ContourOverlay:
+
+    """
+    Contour lines overlaid on the displayed slice of a ColourMap (see its
+    contours kwarg). The lines are computed on the server, cached by slice
+    and levels, and only their geometry is sent when the slice changes.
+    """
+
+    server_slices = True  # Needs each displayed slice (see ColourMap.update_image)
+
+    def __init__(self, plot: Plot, x: numpy.array, y: numpy.array, get_slice: Callable, levels: list,
+                 colour: str='Black', cache: int=64) -> None:
+
+        """
+        args...
+            plot: Bokeh plot of the image
+            x: 1D NumPy array of x coordinates
+            y: 1D NumPy array of y coordinates
+            get_slice: function returning the 2D slice for a z index
+            levels: list of contour levels
+        kwargs...
+            colour: contour line colour
+            cache: number of slices of contours cached
+        """
+
+        self._x = x
+        self._y = y
+        self._get_slice = get_slice
+        self._levels = tuple(float(c) for c in levels)
+        self._cache = OrderedDict()  # (zind, levels) to contour lines
+        self._cachesize = cache
+        self._zind = 0
+
+        self.ctsrc = ColumnDataSource(data=self._get_contours(0))
+        plot.multi_line('xs', 'ys', source=self.ctsrc, line_color=colour, line_width=1)
+
+    def _get_contours(self, zind: int) -> dict:
+
+        """
+        Get the contour lines of a slice (cached by slice and levels)
+        """
+
+        key = (zind, self._levels)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        with Instrumentation.timer('ColourMap.contours'):
+            xs, ys = get_contours(self._x, self._y, self._get_slice(zind), self._levels)
+            lines = {'xs': xs, 'ys': ys, 'level': list(self._levels)}
+
+        if self._cachesize > 0:
+            self._cache[key] = lines
+            if len(self._cache) > self._cachesize:
+                self._cache.popitem(last=False)
+
+        return lines
+
+    def set_levels(self, levels: list) -> None:
+
+        """
+        Change the contour levels (the lines of the displayed slice are
+        updated)
+        """
+
+        self._levels = tuple(float(c) for c in levels)
+        self.ctsrc.data = self._get_contours(self._zind)
+
+    def update(self, zind: int) -> None:
+
+        """
+        Update the lines for a newly displayed slice
+        """
+
+        self._zind = zind
+        self.ctsrc.data = self._get_contours(zind)
+
+    def invalidate(self, zinds: list=None) -> None:
+
+        """
+        Remove the cached lines of slices whose data have changed (all
+        slices if zinds is None)
+        """
+
+        if zinds is None:
+            self._cache.clear()
+        else:
+            for key in [k for k in self._cache if k[0] in zinds]:
+                del self._cache[key]
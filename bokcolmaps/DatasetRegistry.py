@@ -0,0 +1,81 @@
+"""
+DatasetRegistry class definition
+"""
+
+import threading
+
+from collections.abc import Callable
+
+import numpy
+
+from bokcolmaps.SharedDataset import SharedDataset
+
+
+class DatasetRegistry:
+
+    """
+    Process-wide registry of shared data cubes for Bokeh Server
+    applications, so that the cube, its flattened view and its statistics
+    are built once and referenced by every session rather than copied per
+    session.
+
+    Usage (in the application script, run for each session)...
+        ds = DatasetRegistry.get('cube', load_data)  # load_data returns x, y, z, dm
+        cm = ColourMapLPSlider(ds.x, ds.y, ds.z, ds.dm)
+    """
+
+    _datasets = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, key: str, loader: Callable) -> SharedDataset:
+
+        """
+        Get a shared dataset, building it on first use
+        args...
+            key: dataset name
+            loader: function returning x, y, z and dm (called once)
+        """
+
+        with cls._lock:
+            if key not in cls._datasets:
+                cls._datasets[key] = SharedDataset(*loader())
+            return cls._datasets[key]
+
+    @classmethod
+    def find(cls, dm: numpy.ndarray) -> SharedDataset:
+
+        """
+        Return the shared dataset whose data buffer dm is (None if there
+        isn't one)
+        """
+
+        if dm.flags.writeable:  # Shared data are always read-only
+            return None
+
+        with cls._lock:
+            for ds in cls._datasets.values():
+                if ds.shares_buffer(dm):
+                    return ds
+
+        return None
+
+    @classmethod
+    def remove(cls, key: str) -> None:
+
+        """
+        Remove a dataset (its memory is freed once no plots use it)
+        """
+
+        with cls._lock:
+            cls._datasets.pop(key, None)
+
+    @classmethod
+    def clear(cls) -> None:
+
+        """
+        Remove all datasets
+        """
+
+        with cls._lock:
+            cls._datasets.clear()
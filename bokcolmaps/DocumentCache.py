@@ -0,0 +1,244 @@
+"""
+DocumentCache class definition
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from collections.abc import Callable
+
+import numpy
+
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+class DocumentCache:
+
+    """
+    On-disk cache of serialised plots (standalone HTML or json_item JSON)
+    keyed by a SHA-256 hash of the data arrays and keyword arguments, so
+    that re-plotting unchanged data skips the statistics, figure
+    construction and encoding. The least recently used entries are removed
+    when the total size exceeds a cap.
+
+    Usage...
+        cache = DocumentCache('/tmp/bokcolmaps_cache')
+        html = cache.get_document(ColourMapLPSlider, x, y, z, dm, cscale='log')
+        plot_colourmap(dm, cache=cache)
+    """
+
+    def __init__(self, path: str, max_bytes: int=2**30) -> None:
+
+        """
+        args...
+            path: cache directory (created if needed)
+        kwargs...
+            max_bytes: maximum total size of the cached documents
+        """
+
+        self._path = path
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def get_key(*args: tuple, **kwargs: dict) -> str:
+
+        """
+        Get the cache key (hex SHA-256 digest) for plot arguments: arrays
+        are hashed by dtype, shape and contents, Bokeh models (e.g. xran) by
+        type and non-default property values (not by repr, which includes
+        the id unique to each model), containers by their items and anything
+        else by repr (kwargs in name order), with the Bokeh version as the
+        documents depend on it
+        """
+
+        import bokeh  # Deferred to keep import fast
+
+        h = hashlib.sha256(bokeh.__version__.encode())
+
+        for a in list(args) + [kwargs[k] for k in sorted(kwargs)]:
+            _update_hash(h, a, set())
+            h.update(b'\0')
+
+        h.update(repr(sorted(kwargs)).encode())
+
+        return h.hexdigest()
+
+    def get(self, key: str, fmt: str='html') -> str:
+
+        """
+        Get a cached document (None if not cached)
+        args...
+            key: cache key from get_key
+        kwargs...
+            fmt: 'html' or 'json'
+        """
+
+        fname = self._get_fname(key, fmt)
+
+        try:
+            with open(fname, 'rt', encoding='utf-8') as f:
+                doc = f.read()
+        except FileNotFoundError:
+            return None
+
+        os.utime(fname)  # Most recently used
+
+        return doc
+
+    def put(self, key: str, doc: str, fmt: str='html') -> None:
+
+        """
+        Cache a document, removing the least recently used documents if the
+        size cap is exceeded
+        """
+
+        fd, tmpname = tempfile.mkstemp(dir=self._path, suffix='.tmp')
+        with os.fdopen(fd, 'wt', encoding='utf-8') as f:
+            f.write(doc)
+        os.replace(tmpname, self._get_fname(key, fmt))  # Atomic, for concurrent readers
+
+        self._evict()
+
+    def get_document(self, build: Callable, *args: tuple, fmt: str='html', **kwargs: dict) -> str:
+
+        """
+        Get the serialised plot build(*args, **kwargs), with build e.g. a
+        plot class such as ColourMapLPSlider, from the cache or else by
+        building and serialising the plot and caching it
+        kwargs...
+            fmt: 'html' (standalone HTML, resources inline) or 'json'
+                 (json_item, for embedding)
+        """
+
+        if fmt not in ['html', 'json']:
+            raise ValueError('Invalid format: ' + str(fmt))
+
+        key = self.get_key(getattr(build, '__qualname__', repr(build)), *args, **kwargs)
+
+        doc = self.get(key, fmt)
+        if doc is not None:
+            return doc
+
+        from bokeh.embed import file_html, json_item  # Deferred to keep import fast
+        from bokeh.resources import INLINE
+
+        plot = build(*args, **kwargs)
+
+        with Instrumentation.timer('DocumentCache.serialise'):
+            if fmt == 'html':
+                doc = file_html(plot, INLINE)
+            else:
+                doc = json.dumps(json_item(plot))
+
+        self.put(key, doc, fmt)
+
+        return doc
+
+    def clear(self) -> None:
+
+        """
+        Remove all cached documents
+        """
+
+        with self._lock:
+            for fname in self._list():
+                _remove(fname)
+
+    def get_size(self) -> int:
+
+        """
+        Get the total size of the cached documents (bytes)
+        """
+
+        return sum(os.path.getsize(fname) for fname in self._list())
+
+    def _get_fname(self, key: str, fmt: str) -> str:
+
+        return os.path.join(self._path, key + '.' + fmt)
+
+    def _list(self) -> list:
+
+        return [os.path.join(self._path, f) for f in os.listdir(self._path) if f.endswith(('.html', '.json'))]
+
+    def _evict(self) -> None:
+
+        """
+        Remove the least recently used documents until within the size cap
+        """
+
+        with self._lock:
+            entries = []
+            for fname in self._list():
+                try:
+                    st = os.stat(fname)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, fname))
+
+            total = sum(e[1] for e in entries)
+            for _, size, fname in sorted(entries):
+                if total <= self._max_bytes:
+                    break
+                _remove(fname)
+                total -= size
+
+
+def _update_hash(h: object, a: object, seen: set) -> None:
+
+    """
+    Add an argument to the cache key hash (seen holds the ids of the models
+    being hashed, as models may refer to each other)
+    """
+
+    from bokeh.model import Model  # Deferred to keep import fast
+
+    if isinstance(a, numpy.ndarray):
+        h.update((str(a.dtype) + str(a.shape)).encode())
+        if a.flags.c_contiguous or (a.ndim < 2):
+            h.update(numpy.ascontiguousarray(a).data)  # No copy if contiguous
+        else:
+            for chunk in a:  # Copied a chunk at a time
+                h.update(numpy.ascontiguousarray(chunk).data)
+    elif isinstance(a, Model):
+        h.update(type(a).__qualname__.encode())
+        if a.id in seen:  # Reference to a model already being hashed
+            h.update(b'@')
+            return
+        seen.add(a.id)
+        props = a.properties_with_values(include_defaults=False)
+        for name in sorted(props):
+            h.update(name.encode() + b'=')
+            _update_hash(h, props[name], seen)
+            h.update(b'\0')
+        seen.discard(a.id)
+    elif isinstance(a, (list, tuple)):
+        h.update((type(a).__name__ + '[').encode())
+        for v in a:
+            _update_hash(h, v, seen)
+            h.update(b',')
+        h.update(b']')
+    elif isinstance(a, dict):
+        h.update(b'{')
+        for k in sorted(a, key=repr):
+            h.update(repr(k).encode() + b':')
+            _update_hash(h, a[k], seen)
+            h.update(b',')
+        h.update(b'}')
+    elif isinstance(a, (set, frozenset)):
+        h.update(repr(sorted(a, key=repr)).encode())
+    else:
+        h.update(repr(a).encode())
+
+
+def _remove(fname: str) -> None:
+
+    try:
+        os.remove(fname)
+    except FileNotFoundError:
+        pass
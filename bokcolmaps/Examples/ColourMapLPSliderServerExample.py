@@ -5,15 +5,19 @@ bokeh serve --show ColourMapLPSliderServerExample.py
 To use the ColourMapSlider (i.e. without a line plot)
 just import and instantiate that instead (same init parameters)
 To disable the hover tool readout, add kwarg hoverdisp=False.
+
+The data are loaded once into a DatasetRegistry and shared (read-only) by
+all the browser sessions, as are their colour scale limits.
 """
 
 from bokeh.io import curdoc
 
 from bokcolmaps.ColourMapLPSlider import ColourMapLPSlider
+from bokcolmaps.DatasetRegistry import DatasetRegistry
 from bokcolmaps.Examples import example_data
 
-x, y, z, D = example_data()
+ds = DatasetRegistry.get('example', example_data)
 
-cm = ColourMapLPSlider(x, y, z, D, xlab='x val', ylab='y val', zlab='power val', dmlab='Function val', scbutton=True)
+cm = ColourMapLPSlider(ds.x, ds.y, ds.z, ds.dm, xlab='x val', ylab='y val', zlab='power val', dmlab='Function val', scbutton=True)
 
 curdoc().add_root(cm)
@@ -0,0 +1,234 @@
+"""
+FrameIngestor class definition
+"""
+
+import asyncio
+import logging
+import threading
+
+from collections.abc import AsyncIterable, Callable
+
+import numpy
+
+from bokeh.document import Document
+
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+class FrameIngestor:
+
+    """
+    Ingestion adapter for Bokeh Server applications fed faster than the
+    browser can render (e.g. by an acquisition loop). Frames are plot update
+    calls such as ColourMap.update_image, ColourMap.append_slice or
+    SpotPlot.input_change. Only the latest pending frame for each update
+    method of each plot is kept (older ones are counted as dropped), except
+    that append_slice frames are merged into one call stacking the data so
+    no appended data are lost. Pending frames are applied in the order in
+    which each method of each plot was first queued, in one next tick
+    callback of the document, so the event loop never has a backlog of
+    stale updates (even with several plots fed in turn).
+
+    submit may be called from any thread. put and ingest are for asyncio
+    producers running on the document's event loop and wait for pending
+    frames to be applied when a frame is dropped or too many are pending
+    (backpressure). A frame which raises an exception is logged (to the
+    'bokcolmaps' logger) and counted as failed, and the later frames are
+    still applied.
+
+    Usage...
+        ingestor = FrameIngestor(doc)
+        ingestor.submit(cmap.update_image, zind)
+        await ingestor.put(cmap.append_slice, d, zval)
+        await ingestor.ingest(frames, splot.input_change)
+    """
+
+    def __init__(self, doc: Document, max_pending: int=64) -> None:
+
+        """
+        args...
+            doc: Bokeh Document of the plots (e.g. from curdoc())
+        kwargs...
+            max_pending: number of pending frames above which put waits
+        """
+
+        self._doc = doc
+        self._max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._pending = {}  # Plot and method to [func, args, kwargs, number of frames]
+        self._waiters = []  # (loop, future) pairs waiting for the next apply
+        self._scheduled = False
+
+        self._submitted = 0
+        self._dropped = 0
+        self._applied = 0
+        self._failed = 0
+
+    def submit(self, func: Callable, *args: tuple, **kwargs: dict) -> bool:
+
+        """
+        Queue a frame without waiting, replacing (or for append_slice
+        merging with) any pending frame for the same update method of the
+        same plot
+        args...
+            func: plot update method, e.g. cmap.update_image
+            args, kwargs: arguments for func
+        returns True if a pending frame was dropped
+        """
+
+        with self._lock:
+            self._submitted += 1
+            key = _get_key(func)
+            entry = self._pending.get(key)
+            dropped = False
+            if entry is None:
+                self._pending[key] = [func, args, kwargs, 1]
+            elif getattr(func, '__name__', None) == 'append_slice':
+                entry[1], entry[2] = _merge_appends(entry[1], entry[2], args, kwargs)
+                entry[3] += 1
+            else:
+                self._dropped += entry[3]
+                self._pending[key] = [func, args, kwargs, 1]  # Keeps its place in the queue
+                dropped = True
+            schedule = not self._scheduled
+            self._scheduled = True
+
+        if schedule:
+            self._get_doc().add_next_tick_callback(self._apply)
+
+        return dropped
+
+    async def put(self, func: Callable, *args: tuple, **kwargs: dict) -> None:
+
+        """
+        Queue a frame as for submit, but if it replaced a pending frame or
+        max_pending frames are pending (the producer is faster than the
+        updates) wait until the pending frames have been applied
+        """
+
+        if self.submit(func, *args, **kwargs) or (self.queue_depth >= self._max_pending):
+            await self.wait_applied()
+
+    async def ingest(self, frames: AsyncIterable, func: Callable) -> None:
+
+        """
+        Queue frames from an asynchronous iterable until it is exhausted
+        args...
+            frames: asynchronous iterable of argument tuples for func
+            func: plot update method, e.g. cmap.append_slice
+        """
+
+        async for frame in frames:
+            await self.put(func, *frame)
+
+    async def wait_applied(self) -> None:
+
+        """
+        Wait until the currently pending frames have been applied
+        """
+
+        with self._lock:
+            if not self._scheduled:
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append((future.get_loop(), future))
+
+        await future
+
+    def _apply(self) -> None:
+
+        """
+        Apply the pending frames (next tick callback of the document)
+        """
+
+        with self._lock:
+            pending = self._pending
+            waiters = self._waiters
+            self._pending = {}
+            self._waiters = []
+            self._scheduled = False
+
+        applied = failed = 0
+        try:
+            with Instrumentation.timer('FrameIngestor.apply'):
+                for func, args, kwargs, nframes in pending.values():
+                    try:
+                        func(*args, **kwargs)
+                    except Exception:
+                        logging.getLogger('bokcolmaps').exception('FrameIngestor: frame for %s failed',
+                                                                  getattr(func, '__qualname__', repr(func)))
+                        failed += nframes
+                    else:
+                        applied += nframes
+        finally:
+            with self._lock:
+                self._applied += applied
+                self._failed += failed
+            for loop, future in waiters:
+                loop.call_soon_threadsafe(_set_done, future)
+
+    def _get_doc(self) -> Document:
+
+        return self._doc
+
+    @property
+    def queue_depth(self) -> int:
+
+        """
+        Number of frames waiting to be applied
+        """
+
+        return len(self._pending)
+
+    def get_stats(self) -> dict:
+
+        """
+        Return the numbers of frames submitted, dropped (replaced before
+        being applied), applied and failed (raised an exception), and the
+        current queue depth
+        """
+
+        with self._lock:
+            return {'submitted': self._submitted, 'dropped': self._dropped,
+                    'applied': self._applied, 'failed': self._failed,
+                    'queue_depth': len(self._pending)}
+
+
+def _get_key(func: Callable) -> tuple:
+
+    """
+    Key of the pending frame of an update method: the plot (by id, as
+    Bokeh models are not hashable by value) and the method name, or the
+    function itself if it is not a bound method
+    """
+
+    owner = getattr(func, '__self__', None)
+    if owner is None:
+        return (func,)
+
+    return id(owner), func.__name__
+
+
+def _merge_appends(args: tuple, kwargs: dict, new_args: tuple, new_kwargs: dict) -> tuple:
+
+    """
+    Merge two append_slice calls into one, stacking the data and z values (a
+    scalar z value means a single slice) and keeping the newer other
+    arguments
+    """
+
+    ds = []
+    zvals = []
+    for a in [args, new_args]:
+        d, zval = a[0], a[1]
+        ds.append(numpy.asarray(d)[None] if numpy.ndim(zval) == 0 else numpy.asarray(d))
+        zvals.append(numpy.atleast_1d(zval))
+
+    return (numpy.concatenate(ds), numpy.concatenate(zvals)) + tuple(new_args[2:]), new_kwargs
+
+
+def _set_done(future: asyncio.Future) -> None:
+
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,166 @@
+"""
+FullResTiles class definition
+"""
+
+from collections import OrderedDict
+
+import numpy
+
+from bokeh.models import ColumnDataSource
+from bokeh.models.callbacks import CustomJS
+
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+class FullResTiles:
+
+    """
+    Full resolution data for the hover readout of a ColourMap displaying a
+    downsampled version (see its fullres kwarg, for Bokeh Server
+    applications). Tiles of the data are sent to the client when the cursor
+    first reaches them and cached on both sides.
+    """
+
+    server_slices = False  # The displayed slice index is also set by cjs_slider
+
+    def __init__(self, datasrc: ColumnDataSource, xf: numpy.array, yf: numpy.array, dmf: numpy.ndarray,
+                 zsize: int) -> None:
+
+        """
+        args...
+            datasrc: ColourMap data source (holding the displayed slice index)
+            xf: 1D NumPy array of full resolution x coordinates
+            yf: 1D NumPy array of full resolution y coordinates
+            dmf: full resolution data, dimensions zsize (if 3D), yf.size,
+                 xf.size (any array supporting NumPy slicing, e.g. memory
+                 mapped)
+            zsize: number of slices of the displayed data
+        """
+
+        if (dmf.shape[-2:] != (yf.size, xf.size)) or \
+           ((len(dmf.shape) == 3) and (dmf.shape[0] != zsize)) or (len(dmf.shape) not in [2, 3]):
+            raise ValueError('Invalid full resolution data: dimensions ' + str(dmf.shape))
+
+        self._datasrc = datasrc
+        self._xf = xf
+        self._yf = yf
+        self._dmf = dmf if len(dmf.shape) == 3 else dmf[None]
+
+        self._tiles = OrderedDict()  # (zind, ty, tx) to full resolution tile
+        self._tilesize = 32  # Tile width and height
+        self._ntiles = 256  # Number of tiles cached (on the server and each client)
+
+        self.reqsrc = ColumnDataSource(data={'key': ['']})
+        self.tilesrc = ColumnDataSource(data={'key': [''], 'tile': [numpy.zeros(0)], 'tw': [0]})
+        self.reqsrc.on_change('data', self._tile_request)
+
+        # Store the tiles received, the oldest removed first
+
+        js_tile = """
+        if (tilesrc._tiles == null) {
+            tilesrc._tiles = new Map();
+        }
+        var data = tilesrc.data;
+        tilesrc._tiles.set(data['key'][0], {'values': data['tile'][0], 'width': data['tw'][0]});
+        if (tilesrc._tiles.size > ntiles) {
+            tilesrc._tiles.delete(tilesrc._tiles.keys().next().value);
+        }
+        """
+
+        self.tilesrc.js_on_change('data', CustomJS(args={'tilesrc': self.tilesrc, 'ntiles': self._ntiles},
+                                                   code=js_tile))
+
+    def get_hover(self, js_hover: str) -> CustomJS:
+
+        """
+        Get the hover callback giving the full resolution coordinates and
+        values at the cursor (values from the tiles sent by the server)
+        args...
+            js_hover: JS code of the ColourMap hover callback (defining hx,
+                      hy and data)
+        """
+
+        # Hover on the full resolution grid (a tile is requested if not
+        # received yet, and the displayed value used meanwhile)
+
+        js_fullres = js_hover + """
+        var fx = Math.floor((hx + fdx/2 - fx0)/fdx);
+        var fy = Math.floor((hy + fdy/2 - fy0)/fdy);
+        var zi = data['zi'][0];
+
+        if ((fx >= 0) && (fx < fnx) && (fy >= 0) && (fy < fny) && (zi < fnz)) {
+            data['xp'] = [fx0 + fx*fdx];
+            data['yp'] = [fy0 + fy*fdy];
+            var tx = Math.floor(fx/tsize);
+            var ty = Math.floor(fy/tsize);
+            var key = zi + ',' + ty + ',' + tx;
+            var tile = (tilesrc._tiles == null) ? null : tilesrc._tiles.get(key);
+            if (tile != null) {
+                data['dp'] = [tile.values[(fy - ty*tsize)*tile.width + fx - tx*tsize]];
+            }
+            else if (reqsrc.data['key'][0] != key) {
+                reqsrc.data = {'key': [key]};
+            }
+        }
+        """
+
+        xf, yf = self._xf, self._yf
+
+        return CustomJS(args={'datasrc': self._datasrc, 'reqsrc': self.reqsrc, 'tilesrc': self.tilesrc,
+                              'fx0': xf[0], 'fdx': xf[1] - xf[0], 'fnx': xf.size,
+                              'fy0': yf[0], 'fdy': yf[1] - yf[0], 'fny': yf.size,
+                              'fnz': self._dmf.shape[0], 'tsize': self._tilesize},
+                        code=js_fullres)
+
+    def _get_tile(self, zind: int, ty: int, tx: int) -> numpy.ndarray:
+
+        """
+        Get a tile of the full resolution data (cached)
+        """
+
+        key = (zind, ty, tx)
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+
+        ts = self._tilesize
+        tile = numpy.asarray(self._dmf[zind, ty * ts:(ty + 1) * ts, tx * ts:(tx + 1) * ts], dtype=float)
+
+        self._tiles[key] = tile
+        if len(self._tiles) > self._ntiles:
+            self._tiles.popitem(last=False)
+
+        return tile
+
+    def _tile_request(self, attrname: str, old: dict, new: dict) -> None:
+
+        """
+        Callback for a full resolution tile requested by the client
+        """
+
+        with Instrumentation.timer('ColourMap.tile_request') as timer:
+            try:
+                zind, ty, tx = (int(v) for v in new['key'][0].split(','))
+            except ValueError:
+                return
+            if (zind < 0) or (zind >= self._dmf.shape[0]) or (ty < 0) or (tx < 0):
+                return
+            tile = self._get_tile(zind, ty, tx)
+            self.tilesrc.data = {'key': [new['key'][0]], 'tile': [tile.ravel()], 'tw': [tile.shape[1]]}
+            timer.nbytes = tile.nbytes
+
+    def update(self, zind: int) -> None:
+
+        """
+        Record the displayed slice for the hover readout (when changed on
+        the server)
+        """
+
+        self._datasrc.data['zi'] = [zind]
+
+    def invalidate(self, zinds: list=None) -> None:
+
+        """
+        Nothing to invalidate, as the full resolution data cannot change
+        (see ColourMap.append_slice and set_data)
+        """
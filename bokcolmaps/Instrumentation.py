@@ -0,0 +1,194 @@
+"""
+Instrumentation class definition
+"""
+
+import logging
+import threading
+import time
+
+
+class _Timer:
+
+    """
+    Context manager timing a single instrumented event. The number of bytes
+    patched/pushed can be set on the nbytes attribute before exit.
+    """
+
+    __slots__ = ('event', 'nbytes', '_t0')
+
+    def __init__(self, event: str, nbytes: int=0) -> None:
+
+        self.event = event
+        self.nbytes = nbytes
+        self._t0 = None
+
+    def start(self) -> '_Timer':
+
+        """
+        Start timing (if instrumentation is enabled)
+        """
+
+        if Instrumentation._enabled:
+            self._t0 = time.perf_counter()
+
+        return self
+
+    def stop(self) -> None:
+
+        """
+        Stop timing and record the event
+        """
+
+        if self._t0 is not None:
+            Instrumentation.record(self.event, time.perf_counter() - self._t0, self.nbytes)
+            self._t0 = None
+
+    def __enter__(self) -> '_Timer':
+
+        return self.start()
+
+    def __exit__(self, *exc_info: tuple) -> None:
+
+        self.stop()
+
+
+class Instrumentation:
+
+    """
+    Opt-in registry of timing hooks and cumulative counters for the
+    bokcolmaps classes (e.g. to find where time goes in a Bokeh Server
+    session). Disabled by default, in which case timing costs one attribute
+    lookup per instrumented call.
+
+    Usage...
+        Instrumentation.enable()
+        Instrumentation.add_hook(lambda event, duration, nbytes: print(event, duration))
+        ... (create and update plots) ...
+        counters = Instrumentation.get_counters()
+    """
+
+    _enabled = False
+    _hooks = []
+    _counters = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def enable(cls) -> None:
+
+        """
+        Switch instrumentation on
+        """
+
+        cls._enabled = True
+
+    @classmethod
+    def disable(cls) -> None:
+
+        """
+        Switch instrumentation off (counters are kept)
+        """
+
+        cls._enabled = False
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+
+        """
+        Return instrumentation setting
+        """
+
+        return cls._enabled
+
+    @classmethod
+    def add_hook(cls, hook: callable) -> None:
+
+        """
+        Register a hook called as hook(event, duration, nbytes) after
+        each instrumented event
+        """
+
+        with cls._lock:
+            cls._hooks.append(hook)
+
+    @classmethod
+    def remove_hook(cls, hook: callable) -> None:
+
+        """
+        Remove a previously registered hook
+        """
+
+        with cls._lock:
+            cls._hooks.remove(hook)
+
+    @classmethod
+    def timer(cls, event: str, nbytes: int=0) -> _Timer:
+
+        """
+        Timer for the named event, used as a context manager or with
+        explicit start() and stop() calls
+        """
+
+        return _Timer(event, nbytes)
+
+    @classmethod
+    def record(cls, event: str, duration: float, nbytes: int=0) -> None:
+
+        """
+        Add a measurement to the counters and pass it to the hooks
+        args...
+            event: event name (e.g. 'ColourMap.update_image')
+            duration: wall time (s)
+        kwargs...
+            nbytes: number of bytes patched/pushed to the document
+        """
+
+        with cls._lock:
+            counter = cls._counters.get(event)
+            if counter is None:
+                counter = cls._counters[event] = {'calls': 0, 'total_s': 0.0, 'max_s': 0.0, 'bytes': 0}
+            counter['calls'] += 1
+            counter['total_s'] += duration
+            counter['max_s'] = max(counter['max_s'], duration)
+            counter['bytes'] += int(nbytes)
+            hooks = list(cls._hooks)
+
+        for hook in hooks:
+            hook(event, duration, nbytes)
+
+    @classmethod
+    def get_counters(cls) -> dict:
+
+        """
+        Return a copy of the cumulative counters, keyed by event name
+        """
+
+        with cls._lock:
+            return {event: dict(counter) for event, counter in cls._counters.items()}
+
+    @classmethod
+    def log_counters(cls, logger: logging.Logger=None, level: int=logging.INFO) -> None:
+
+        """
+        Emit one log record per event with the cumulative counters
+        kwargs...
+            logger: logger to use (defaults to the 'bokcolmaps' logger)
+            level: logging level
+        """
+
+        if logger is None:
+            logger = logging.getLogger('bokcolmaps')
+
+        for event, counter in cls.get_counters().items():
+            logger.log(level, '%s: calls=%d total_s=%.6f max_s=%.6f bytes=%d', event,
+                       counter['calls'], counter['total_s'], counter['max_s'], counter['bytes'],
+                       extra={'bokcolmaps_event': event, 'bokcolmaps_counter': counter})
+
+    @classmethod
+    def reset(cls) -> None:
+
+        """
+        Clear the counters
+        """
+
+        with cls._lock:
+            cls._counters = {}
@@ -0,0 +1,165 @@
+"""
+RegionStats class definition
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable
+
+import numpy
+
+from bokeh.models import Plot, BoxSelectTool, Div, GlyphRenderer
+from bokeh.events import SelectionGeometry
+
+from bokcolmaps.get_summed_area_tables import get_summed_area_tables
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+class RegionStats:
+
+    """
+    Statistics of the finite values of rectangular regions of the slices of
+    a ColourMap (see ColourMap.get_region_stats), in constant time from the
+    summed-area tables of each slice (built when first needed and cached),
+    with an optional box select readout for the displayed slice (see the
+    ColourMap boxstats kwarg).
+    """
+
+    def __init__(self, x: numpy.array, y: numpy.array, get_slice: Callable, cache: int=16) -> None:
+
+        """
+        args...
+            x: 1D NumPy array of x coordinates
+            y: 1D NumPy array of y coordinates
+            get_slice: function returning the 2D slice for a z index
+        kwargs...
+            cache: number of slices of summed-area tables cached
+        """
+
+        self._x = x
+        self._y = y
+        self._get_slice = get_slice
+        self._cache = OrderedDict()  # zind to summed-area tables
+        self._cachesize = cache
+        self._zind = 0
+
+        self.statsdiv = None
+        self.server_slices = False  # Only the readout needs each displayed slice
+
+    def add_box_select(self, plot: Plot, renderer: GlyphRenderer, width: int) -> Div:
+
+        """
+        Add a box select tool (on the renderer) to the plot and return the
+        readout of the statistics of the selected region
+        """
+
+        plot.add_tools(BoxSelectTool(renderers=[renderer]))
+        plot.on_event(SelectionGeometry, self._box_stats)
+        self.statsdiv = Div(text='Box select for region statistics', width=width)
+        self.server_slices = True
+
+        return self.statsdiv
+
+    def _get_summed_area_tables(self, zind: int) -> numpy.ndarray:
+
+        """
+        Get the summed-area tables of a slice (built when first needed and
+        cached)
+        """
+
+        if zind in self._cache:
+            self._cache.move_to_end(zind)
+            return self._cache[zind]
+
+        with Instrumentation.timer('ColourMap.summed_area_tables'):
+            sat = get_summed_area_tables(self._get_slice(zind))
+
+        self._cache[zind] = sat
+        if len(self._cache) > self._cachesize:
+            self._cache.popitem(last=False)
+
+        return sat
+
+    def get_region_stats(self, x0: float, x1: float, y0: float, y1: float, zind: int=None) -> dict:
+
+        """
+        Get the statistics of the finite values of a slice in a rectangle
+        args...
+            x0, x1: x coordinate range
+            y0, y1: y coordinate range
+        kwargs...
+            zind: z index of the slice (the displayed slice if None)
+        returns dict of count, sum, mean and std (NaN if count is zero)
+        """
+
+        if zind is None:
+            zind = self._zind
+
+        inds = []
+        for c, (r0, r1) in [(self._x, (x0, x1)), (self._y, (y0, y1))]:
+            inds.append(_get_index_range(c, min(r0, r1), max(r0, r1)))
+        (i0, i1), (j0, j1) = inds
+
+        sat = self._get_summed_area_tables(zind)
+        total, total2, count = sat[:, j1, i1] - sat[:, j0, i1] - sat[:, j1, i0] + sat[:, j0, i0]
+
+        if count > 0:
+            mean = total / count
+            std = numpy.sqrt(max(total2 / count - mean * mean, 0))
+        else:
+            mean = std = numpy.nan
+
+        return {'count': int(count), 'sum': float(total), 'mean': float(mean), 'std': float(std)}
+
+    def _box_stats(self, event: SelectionGeometry) -> None:
+
+        """
+        Callback for the box select tool
+        """
+
+        geom = event.geometry
+        if geom.get('type') != 'rect':
+            return
+
+        with Instrumentation.timer('ColourMap.box_stats'):
+            stats = self.get_region_stats(geom['x0'], geom['x1'], geom['y0'], geom['y1'])
+            self.statsdiv.text = 'Count: ' + str(stats['count']) + \
+                ', sum: ' + '{:.4g}'.format(stats['sum']) + \
+                ', mean: ' + '{:.4g}'.format(stats['mean']) + \
+                ', std: ' + '{:.4g}'.format(stats['std'])
+
+    def update(self, zind: int) -> None:
+
+        """
+        Record the displayed slice (for the box select readout)
+        """
+
+        self._zind = zind
+
+    def invalidate(self, zinds: list=None) -> None:
+
+        """
+        Remove the cached tables of slices whose data have changed (all
+        slices if zinds is None)
+        """
+
+        if zinds is None:
+            self._cache.clear()
+        else:
+            for key in [k for k in self._cache if k in zinds]:
+                del self._cache[key]
+
+
+def _get_index_range(c: numpy.array, r0: float, r1: float) -> tuple:
+
+    """
+    Get the range of indices (start, stop) of the (monotonic) coordinates
+    c in the interval [r0, r1] by binary search, or (0, 0) if none
+    """
+
+    if c[-1] >= c[0]:
+        i0, i1 = numpy.searchsorted(c, r0, side='left'), numpy.searchsorted(c, r1, side='right')
+    else:  # Descending, searched as a reversed view
+        i0, i1 = c.size - numpy.searchsorted(c[::-1], r1, side='right'), \
+            c.size - numpy.searchsorted(c[::-1], r0, side='left')
+
+    return (int(i0), int(i1)) if i1 > i0 else (0, 0)
@@ -0,0 +1,105 @@
+"""
+SharedDataset class definition
+"""
+
+import threading
+
+import numpy
+
+from bokcolmaps.get_slice_min_max import get_slice_min_max
+from bokcolmaps.get_slice_histograms import get_slice_histograms
+from bokcolmaps.get_projection import get_projection
+
+
+class SharedDataset:
+
+    """
+    A data cube held once in memory as read-only arrays and shared by the
+    plots of every Bokeh Server session (see DatasetRegistry). ColourMap
+    uses the flattened view without copying and takes the per-slice colour
+    scale limits (and histograms) from this cache, so they are computed
+    once rather than per session.
+    """
+
+    def __init__(self, x: numpy.array, y: numpy.array, z: numpy.array, dm: numpy.ndarray) -> None:
+
+        """
+        args...
+            x: 1D NumPy array of x coordinates
+            y: 1D NumPy array of y coordinates
+            z: 1D NumPy array of z coordinates
+            dm: NumPy array of the data, e.g. dimensions z.size, y.size, x.size
+        """
+
+        self.x = _read_only(x)
+        self.y = _read_only(y)
+        self.z = _read_only(z)
+        self.dm = _read_only(numpy.ascontiguousarray(dm))
+        self.dmflat = self.dm.ravel()  # View, not a copy
+
+        self._lock = threading.Lock()
+        self._min_max = {}
+        self._histograms = {}
+        self._projections = {}
+
+    def shares_buffer(self, dm: numpy.ndarray) -> bool:
+
+        """
+        Return True if dm is (a contiguous reshaped view of) the whole data
+        """
+
+        return (dm.size == self.dm.size) and (dm.dtype == self.dm.dtype) and \
+            dm.flags.c_contiguous and \
+            (dm.__array_interface__['data'][0] == self.dm.__array_interface__['data'][0])
+
+    def get_slice_min_max(self, delta: float, mode: str='slice', plims: tuple=None,
+                          positive: bool=False) -> tuple:
+
+        """
+        Cached version of get_slice_min_max for the data (which must be 3D,
+        or 2D for a single slice). Returns copies, which may be modified.
+        """
+
+        key = (delta, mode, plims, positive)
+        with self._lock:
+            if key not in self._min_max:
+                self._min_max[key] = get_slice_min_max(self._get_3D(), delta, mode=mode, plims=plims,
+                                                       positive=positive)
+            minvals, maxvals = self._min_max[key]
+
+        return minvals.copy(), maxvals.copy()
+
+    def get_slice_histograms(self, minvals: list, maxvals: list, nbins: int) -> numpy.ndarray:
+
+        """
+        Cached version of get_slice_histograms for the data
+        """
+
+        key = (tuple(numpy.asarray(minvals, dtype=float)), tuple(numpy.asarray(maxvals, dtype=float)), nbins)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = _read_only(get_slice_histograms(self._get_3D(), minvals, maxvals, nbins))
+            return self._histograms[key]
+
+    def get_projection(self, mode: str) -> numpy.ndarray:
+
+        """
+        Cached version of get_projection for the data (read-only)
+        """
+
+        with self._lock:
+            if mode not in self._projections:
+                self._projections[mode] = _read_only(get_projection(self._get_3D(), mode))
+            return self._projections[mode]
+
+    def _get_3D(self) -> numpy.ndarray:
+
+        return self.dm.reshape((-1,) + self.dm.shape[-2:])
+
+
+def _read_only(a: numpy.ndarray) -> numpy.ndarray:
+
+    v = numpy.asarray(a).view()
+    v.setflags(write=False)
+
+    return v
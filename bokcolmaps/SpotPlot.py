@@ -2,23 +2,30 @@
 SpotPlot class definition
 """
 
+import functools
+
 import numpy
 
 from bokeh.model import DataModel
 
 from bokeh.models import ColumnDataSource, Plot, ColorBar
-from bokeh.models.mappers import LinearColorMapper
+from bokeh.models.mappers import ContinuousColorMapper, LinearColorMapper, LogColorMapper
 from bokeh.models.layouts import Column
+from bokeh.models.callbacks import CustomJS
+from bokeh.models.widgets import Slider
 
-from bokeh.core.properties import Instance, String, Int, Float, Bool
-
-from bokeh.plotting import figure
+from bokeh.core.properties import Instance, Nullable, String, Int, Float, Bool
 
 from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
 from bokcolmaps.check_kwargs import check_kwargs
 from bokcolmaps.generate_colourbar import generate_colourbar
 from bokcolmaps.read_colourmap import read_colourmap
 from bokcolmaps.get_min_max import get_min_max
+from bokcolmaps.get_percentile_min_max import get_percentile_min_max, parse_percentile
+from bokcolmaps.get_slice_min_max import get_slice_min_max
+from bokcolmaps.symlog_transform import symlog_transform
+from bokcolmaps.Instrumentation import Instrumentation
 
 
 class SpotPlot(Column, DataModel):
@@ -34,7 +41,8 @@ class SpotPlot(Column, DataModel):
     datasrc = Instance(ColumnDataSource)
     coldatasrc = Instance(ColumnDataSource)
     cvals = Instance(ColumnDataSource)
-    cmap = Instance(LinearColorMapper)
+    mmsrc = Nullable(Instance(ColumnDataSource))  # Slider preview limits (see link_slider)
+    cmap = Instance(ContinuousColorMapper)
 
     _title_root = String
     _zlab = String
@@ -45,6 +53,7 @@ class SpotPlot(Column, DataModel):
     _marker = String
     _autoscale = Bool
     _cbdelta = Float
+    _cscale = String
 
     def __init__(self, x: numpy.array, y: numpy.array, z: numpy.array, dm: numpy.ndarray, **kwargs: dict) -> None:
 
@@ -59,12 +68,18 @@ class SpotPlot(Column, DataModel):
             width: plot width (pixels)
             size: spot size (pixels as int or data units as float)
             marker: data marker (string)
+            cscale: colour scale, 'linear' (default), 'log' or 'symlog'
+                    (symmetric log, see symlog_transform)
+            linthresh: scale of the linear region for the symlog colour scale
         """
 
-        check_kwargs(kwargs, extra_kwargs=['height', 'width', 'size', 'marker'])
+        from bokeh.plotting import figure
+
+        check_kwargs(kwargs, extra_kwargs=['height', 'width', 'size', 'marker', 'cscale', 'linthresh'])
 
         palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
             rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
 
         height = kwargs.get('height', 575)
         width = kwargs.get('width', 500)
@@ -77,18 +92,37 @@ class SpotPlot(Column, DataModel):
 
         self._marker = kwargs.get('marker', 'circle')
 
+        cscale = kwargs.get('cscale', 'linear')
+        if cscale not in ['linear', 'log', 'symlog']:
+            raise ValueError('Invalid colour scale: ' + str(cscale))
+
         super().__init__()
 
+        self._cscale = cscale
+        self._linthresh = kwargs.get('linthresh', 1)
+
         self._cbdelta = 0.01  # Min colourbar range (used if values are equal)
 
         self._title_root = dmlab
         self._zlab = zlab
 
+        # Percentile limits mean autoscaling with robust minimum and maximum values
+
+        self._plims = None
+        pmin, pmax = parse_percentile(rmin), parse_percentile(rmax)
+        if (pmin is not None) or (pmax is not None):
+            if ((pmin is None) and (rmin is not None)) or ((pmax is None) and (rmax is not None)):
+                raise ValueError('rmin and rmax must both be percentiles if either is')
+            self._plims = (0 if pmin is None else pmin, 100 if pmax is None else pmax)
+            rmin = rmax = None
+
         is3D = True if z.size > 1 else False
 
         self._autoscale = True
         if (rmin is not None) and (rmax is not None):
             self._autoscale = False
+            if (cscale == 'log') and (min(rmin, rmax) <= 0):
+                raise ValueError('rmin and rmax must be positive for a log colour scale')
         else:
             if rmin is not None:
                 self._rmin = rmin
@@ -108,80 +142,134 @@ class SpotPlot(Column, DataModel):
         else:
             d = dm
 
-        if self._autoscale:
-            min_val, max_val = get_min_max(d, self._cbdelta)
-        else:
-            min_val = rmin
-            max_val = rmax
+        with Instrumentation.timer('SpotPlot.stats'):
+            if self._autoscale:
+                min_val, max_val = self._get_min_max(d)
+            else:
+                min_val = rmin
+                max_val = rmax
+
+        with Instrumentation.timer('SpotPlot.cmap'):
 
-        if cfile is not None:
-            self._read_cmap(cfile)
-            palette = self.cvals.data['colours']
-            if revcols:
-                self.cvals.data['colours'].reverse()
+            if cfile is not None:
+                self._read_cmap(cfile)
+                palette = self.cvals.data['colours']
+                if revcols:
+                    self.cvals.data['colours'].reverse()
 
-        self.cmap = LinearColorMapper(palette=palette, nan_color=nan_colour, low=min_val, high=max_val)
+            if self._cscale == 'log':
+                self.cmap = LogColorMapper(palette=palette, nan_color=nan_colour, low=min_val, high=max_val)
+            else:  # Mapper limits are transformed for the symlog colour scale
+                self.cmap = LinearColorMapper(palette=palette, nan_color=nan_colour,
+                                              low=self._transform(min_val), high=self._transform(max_val))
 
-        if revcols and (cfile is None):
-            pal = list(self.cmap.palette)
-            pal.reverse()
-            self.cmap.palette = tuple(pal)
+            if revcols and (cfile is None):
+                pal = list(self.cmap.palette)
+                pal.reverse()
+                self.cmap.palette = tuple(pal)
 
-        if cfile is None:
-            self.cvals = ColumnDataSource(data={'colours': self.cmap.palette})
+            if cfile is None:
+                self.cvals = ColumnDataSource(data={'colours': self.cmap.palette})
 
         self._bg_col = 'black'
         self._nan_col = nan_colour
 
         cols = [self._nan_col] * d.size  # Initially empty
         self.datasrc = ColumnDataSource(data={'z': [z], 'd': [d], 'dm': [dm]})
+        self._dmown = False  # Whether dm has been copied for appending
+        self._zhead = 0  # Ring buffer row for the next appended data
+        self._zind = 0  # Displayed row
+        self._zcallback = None  # Pending debounced slider update
         self.coldatasrc = ColumnDataSource(data={'x': x, 'y': y, 'cols': cols})
 
-        ptools = ['reset, pan, wheel_zoom, box_zoom, save']
+        with Instrumentation.timer('SpotPlot.figure'):
+
+            ptools = ['reset, pan, wheel_zoom, box_zoom, save']
+
+            # Default to entire range unless externally controlled
+            if xran is None:
+                xran = [x.min(), x.max()]
+            if yran is None:
+                yran = [y.min(), y.max()]
+
+            self.plot = figure(x_axis_label=xlab, y_axis_label=ylab, x_range=xran, y_range=yran,
+                               height=height, width=width,
+                               background_fill_color=self._bg_col, tools=ptools, toolbar_location='right',
+                               output_backend=output_backend)
+
+            if type(size) is int:
+                self.plot.scatter('x', 'y', marker=self._marker, size=self._sp_size_i, color='cols',
+                                  source=self.coldatasrc,
+                                  nonselection_fill_color='cols', selection_fill_color='cols',
+                                  fill_alpha=alpha, line_alpha=alpha,
+                                  nonselection_fill_alpha=alpha, selection_fill_alpha=alpha,
+                                  nonselection_line_alpha=0, selection_line_alpha=alpha,
+                                  nonselection_line_color='cols', selection_line_color='white', line_width=5)
+            else:
+                self.plot.circle('x', 'y', radius=self._sp_size_f / 2, color='cols', source=self.coldatasrc,
+                                 nonselection_fill_color='cols', selection_fill_color='cols',
+                                 fill_alpha=alpha, line_alpha=alpha,
+                                 nonselection_fill_alpha=alpha, selection_fill_alpha=alpha,
+                                 nonselection_line_alpha=0, selection_line_alpha=alpha,
+                                 nonselection_line_color='cols', selection_line_color='white', line_width=5)
 
-        # Default to entire range unless externally controlled
-        if xran is None:
-            xran = [x.min(), x.max()]
-        if yran is None:
-            yran = [y.min(), y.max()]
+            self.plot.grid.grid_line_color = 'grey'
 
-        self.plot = figure(x_axis_label=xlab, y_axis_label=ylab, x_range=xran, y_range=yran, height=height, width=width,
-                           background_fill_color=self._bg_col, tools=ptools, toolbar_location='right')
+            self.update_title(0)
 
-        if type(size) is int:
-            self.plot.scatter('x', 'y', marker=self._marker, size=self._sp_size_i, color='cols', source=self.coldatasrc,
-                              nonselection_fill_color='cols', selection_fill_color='cols', fill_alpha=alpha, line_alpha=alpha,
-                              nonselection_fill_alpha=alpha, selection_fill_alpha=alpha, nonselection_line_alpha=0, selection_line_alpha=alpha,
-                              nonselection_line_color='cols', selection_line_color='white', line_width=5)
+            self.plot.title.text_font = 'garamond'
+            self.plot.title.text_font_size = '12pt'
+            self.plot.title.text_font_style = 'bold'
+            self.plot.title.align = 'center'
+
+            self.plot.xaxis.axis_label_text_font = 'garamond'
+            self.plot.xaxis.axis_label_text_font_size = '10pt'
+            self.plot.xaxis.axis_label_text_font_style = 'bold'
+
+            self.plot.yaxis.axis_label_text_font = 'garamond'
+            self.plot.yaxis.axis_label_text_font_size = '10pt'
+            self.plot.yaxis.axis_label_text_font_style = 'bold'
+
+        self.update_colours()
+
+        if (self._cscale == 'symlog') and self._autoscale:  # Ticks over the whole data range
+            cblims = numpy.nanmin(dm), numpy.nanmax(dm)
         else:
-            self.plot.circle('x', 'y', radius=self._sp_size_f / 2, color='cols', source=self.coldatasrc,
-                             nonselection_fill_color='cols', selection_fill_color='cols', fill_alpha=alpha, line_alpha=alpha,
-                             nonselection_fill_alpha=alpha, selection_fill_alpha=alpha, nonselection_line_alpha=0, selection_line_alpha=alpha,
-                             nonselection_line_color='cols', selection_line_color='white', line_width=5)
+            cblims = min_val, max_val
+        self.cbar = generate_colourbar(self.cmap, cbarwidth=round(height / 20),
+                                       cscale=self._cscale, linthresh=self._linthresh,
+                                       rmin=cblims[0], rmax=cblims[1])
+        self.plot.add_layout(self.cbar, 'below')
+
+        self.children.append(self.plot)
+
+    def _get_min_max(self, d: numpy.ndarray) -> tuple:
 
-        self.plot.grid.grid_line_color = 'grey'
+        """
+        Get the autoscaling limits for a row of dm
+        """
 
-        self.update_title(0)
+        if self._plims is not None:  # Sampled before any masking
+            return get_percentile_min_max(d, self._cbdelta, *self._plims, positive=(self._cscale == 'log'))
 
-        self.plot.title.text_font = 'garamond'
-        self.plot.title.text_font_size = '12pt'
-        self.plot.title.text_font_style = 'bold'
-        self.plot.title.align = 'center'
+        if self._cscale == 'log':
+            d = d[d > 0]
+            if d.size == 0:
+                return 1, 1 + self._cbdelta
 
-        self.plot.xaxis.axis_label_text_font = 'garamond'
-        self.plot.xaxis.axis_label_text_font_size = '10pt'
-        self.plot.xaxis.axis_label_text_font_style = 'bold'
+        return get_min_max(d, self._cbdelta)
 
-        self.plot.yaxis.axis_label_text_font = 'garamond'
-        self.plot.yaxis.axis_label_text_font_size = '10pt'
-        self.plot.yaxis.axis_label_text_font_style = 'bold'
+    def _transform(self, d: numpy.ndarray) -> numpy.ndarray:
 
-        self.update_colours()
+        """
+        Transform values to the colour mapper scale (only needed for the
+        symlog colour scale)
+        """
 
-        self.cbar = generate_colourbar(self.cmap, cbarwidth=round(height / 20))
-        self.plot.add_layout(self.cbar, 'below')
+        if self._cscale == 'symlog':
+            return symlog_transform(d, self._linthresh)
 
-        self.children.append(self.plot)
+        return d
 
     def _read_cmap(self, fname: str) -> None:
 
@@ -201,12 +289,185 @@ class SpotPlot(Column, DataModel):
         if (len(self.datasrc.data['dm'][0].shape) > 1) and \
            (zind >= 0) and (zind < self.datasrc.data['dm'][0].shape[0]):
 
-            data = self.datasrc.data
-            newdata = data
-            d = data['dm'][0][zind]
-            newdata['d'] = [d]
+            # Setting the column sends only it to clients (not all of dm)
+            self.datasrc.data['d'] = [self.datasrc.data['dm'][0][zind]]
+
+    def append_slice(self, d: numpy.ndarray, zval: float, display: bool=True) -> int:
+
+        """
+        Add a new row of data (e.g. from a live feed), treating dm as a ring
+        buffer with capacity the initial number of rows: the oldest row is
+        overwritten and only the new row and its z value are sent to clients
+        (as patches). dm and z are copied on the first call so the arrays
+        passed in are not modified. Rows are stored in arrival order modulo
+        the capacity, so the z index of the newest row is the returned row.
+        Several rows can be appended at once (in a single patch).
+        args...
+            d: 1D NumPy array of the new data, same size as x (or 2D for
+               several rows in arrival order)
+            zval: z coordinate of the new data (or 1D NumPy array of them)
+        kwargs...
+            display: display the newest data if True
+        returns the ring buffer row (z index) of the newest data
+        """
+
+        dm = self.datasrc.data['dm'][0]
+        if (d.ndim not in [1, 2]) or (d.shape[-1:] != dm.shape[-1:]):
+            raise ValueError('Data size not consistent with dm array')
+
+        d = d.reshape((-1, d.shape[-1]))
+        zvals = numpy.atleast_1d(zval)
+        if zvals.size != d.shape[0]:
+            raise ValueError('Number of z values not consistent with number of rows')
+
+        with Instrumentation.timer('SpotPlot.append_slice', d.nbytes):
+
+            if not self._dmown:
+                dm = dm.copy()
+                newdata = {'dm': [dm], 'z': [self.datasrc.data['z'][0].copy()]}
+                if dm.ndim == 1:
+                    newdata['d'] = [dm]
+                self.datasrc.data.update(newdata)
+                self._dmown = True
+
+            # Only the newest rows fit in the buffer
+
+            nz = dm.shape[0] if dm.ndim > 1 else 1
+            d = d[-nz:]
+            zvals = zvals[-nz:]
+            zinds = (self._zhead + numpy.arange(d.shape[0])) % nz
+            self._zhead = (zinds[-1] + 1) % nz
+
+            # One patch entry per contiguous run of rows (two if the buffer wraps)
+
+            dmpatch = []
+            zpatch = []
+            for run in numpy.split(numpy.arange(zinds.size), numpy.nonzero(numpy.diff(zinds) != 1)[0] + 1):
+                z0, z1 = int(zinds[run[0]]), int(zinds[run[-1]]) + 1
+                if dm.ndim > 1:
+                    dmpatch.append(((0, slice(z0, z1), slice(None)), d[run]))
+                else:
+                    dmpatch.append(((0, slice(None)), d[run[-1]]))
+                zpatch.append(((0, slice(z0, z1)), zvals[run]))
+            self.datasrc.patch({'dm': dmpatch, 'z': zpatch})
+
+            if self.mmsrc is not None:  # Slider preview limits
+                minvals, maxvals = self._get_row_limits(numpy.sort(zinds))
+                self.mmsrc.patch({'minvals': [(int(z), v) for z, v in zip(numpy.sort(zinds), minvals)],
+                                  'maxvals': [(int(z), v) for z, v in zip(numpy.sort(zinds), maxvals)]})
+
+            if display:
+                self.input_change('value', None, int(zinds[-1]))
 
-            self.datasrc.trigger('data', data, newdata)
+        return int(zinds[-1])
+
+    def link_slider(self, slider: Slider, throttle: object=None) -> None:
+
+        """
+        Link a slider to the row being displayed (e.g. in SpotPlotSlider).
+        The full update (recolouring the spots) runs in Python for every
+        slider value unless throttled, in which case the title and colour
+        scale limits are updated in the browser as a preview while the
+        slider is dragged and the full update runs only for the final value.
+        args...
+            slider: Bokeh Slider of row indices
+        kwargs...
+            throttle: None for no throttling, 'release' for the full update
+                      when the slider is released or a debounce time
+                      (milliseconds) after which an unchanged value is
+                      also fully updated (earlier pending updates are
+                      cancelled)
+        """
+
+        if throttle is None:
+            slider.on_change('value', self.input_change)
+            return
+
+        if (throttle != 'release') and not (isinstance(throttle, (int, float)) and (throttle >= 0)):
+            raise ValueError('Invalid throttle: ' + str(throttle))
+
+        if self._autoscale:
+            minvals, maxvals = self._get_row_limits()
+        else:
+            minvals = maxvals = []
+        self.mmsrc = ColumnDataSource(data={'minvals': minvals, 'maxvals': maxvals})
+
+        js_preview = """
+        var zind = cb_obj.value;
+        var z = datasrc.data['z'][0];
+        if (z.length > 1) {
+            title.text = title_root + ', ' + zlab + ' = ' + z[zind].toString();
+        }
+        var minvals = mmsrc.data['minvals'];
+        if (minvals.length > 0) {
+            cmap.low = minvals[zind];
+            cmap.high = mmsrc.data['maxvals'][zind];
+        }
+        """
+
+        slider.js_on_change('value', CustomJS(args={'datasrc': self.datasrc, 'mmsrc': self.mmsrc,
+                                                    'cmap': self.cmap, 'title': self.plot.title,
+                                                    'title_root': self._title_root, 'zlab': self._zlab},
+                                              code=js_preview))
+
+        slider.on_change('value_throttled', self._throttled_change)
+        if throttle != 'release':
+            slider.on_change('value', functools.partial(self._debounced_change, throttle))
+
+    def _get_row_limits(self, zinds: numpy.ndarray=None) -> tuple:
+
+        """
+        Get the autoscaling limits (transformed for the colour mapper) of
+        the rows of dm (or those with indices zinds)
+        """
+
+        dm = self.datasrc.data['dm'][0]
+        dm = dm.reshape((-1, 1, dm.shape[-1]))
+        if zinds is not None:
+            dm = dm[zinds]
+
+        minvals, maxvals = get_slice_min_max(dm, self._cbdelta, plims=self._plims,
+                                             positive=(self._cscale == 'log'))
+
+        return list(self._transform(minvals)), list(self._transform(maxvals))
+
+    def _debounced_change(self, delay: float, attrname: str, old: int, new: int) -> None:
+
+        """
+        Slider callback updating after the slider value has been unchanged
+        for delay milliseconds (or immediately if there is no document, e.g.
+        for standalone use)
+        """
+
+        self._cancel_change()
+        if self.document is None:
+            self._throttled_change(attrname, old, new)
+        else:
+            self._zcallback = self.document.add_timeout_callback(
+                functools.partial(self._throttled_change, 'value', None, new), delay)
+
+    def _throttled_change(self, attrname: str, old: int, new: int) -> None:
+
+        """
+        Slider callback for the final value
+        """
+
+        self._cancel_change()
+        if new != self._zind:
+            self.input_change(attrname, old, new)
+
+    def _cancel_change(self) -> None:
+
+        """
+        Cancel any pending debounced update
+        """
+
+        if (self._zcallback is not None) and (self.document is not None):
+            try:
+                self.document.remove_timeout_callback(self._zcallback)
+            except ValueError:  # Already run
+                pass
+        self._zcallback = None
 
     def update_cbar(self) -> None:
 
@@ -216,11 +477,13 @@ class SpotPlot(Column, DataModel):
 
         if self._autoscale:
 
-            d = self.datasrc.data['d'][0]
-            min_val, max_val = get_min_max(d, self._cbdelta)
+            with Instrumentation.timer('SpotPlot.update_cbar'):
+
+                d = self.datasrc.data['d'][0]
+                min_val, max_val = self._get_min_max(d)
 
-            self.cmap.low = min_val
-            self.cmap.high = max_val
+                self.cmap.low = self._transform(min_val)
+                self.cmap.high = self._transform(max_val)
 
     def update_colours(self) -> None:
 
@@ -228,37 +491,39 @@ class SpotPlot(Column, DataModel):
         Update the spot colours (needed when the data for display changes)
         """
 
-        colset = self.cvals.data['colours']
-        ncols = len(colset)
+        with Instrumentation.timer('SpotPlot.update_colours') as timer:
 
-        d = self.datasrc.data['d'][0]
+            colset = self.cvals.data['colours']
+            ncols = len(colset)
 
-        data = self.coldatasrc.data
-        newdata = data
-        cols = data['cols']
-
-        min_val = self.cmap.low
-        max_val = self.cmap.high
-
-        for s in range(d.size):
+            d = self.datasrc.data['d'][0]
 
-            if numpy.isfinite(d[s]):
+            cols = self.coldatasrc.data['cols']
 
-                cind = int(round(ncols * (d[s] - min_val) / (max_val - min_val)))
-                if cind < 0:
-                    cind = 0
-                if cind >= ncols:
-                    cind = ncols - 1
+            min_val = self.cmap.low
+            max_val = self.cmap.high
 
-                cols[s] = colset[cind]
+            # Position of each value between the colour scale limits
 
+            fin = numpy.isfinite(d)
+            df = d[fin]
+            if self._cscale == 'log':
+                with numpy.errstate(divide='ignore', invalid='ignore'):
+                    f = (numpy.log10(df) - numpy.log10(min_val)) / (numpy.log10(max_val) - numpy.log10(min_val))
+                f[df <= 0] = 0
             else:
+                f = (self._transform(df) - min_val) / (max_val - min_val)
 
-                cols[s] = self._nan_col
+            cinds = numpy.clip(numpy.round(ncols * f), 0, ncols - 1).astype(int)
 
-        newdata['cols'] = cols
+            newcols = numpy.full(d.size, self._nan_col, dtype=object)
+            newcols[fin] = numpy.asarray(colset, dtype=object)[cinds]
+            cols[:] = newcols.tolist()
 
-        self.coldatasrc.trigger('data', data, newdata)
+            # Setting the column sends only it to clients (not x and y)
+            self.coldatasrc.data['cols'] = cols
+
+            timer.nbytes = sum(len(c) for c in cols) if Instrumentation.is_enabled() else 0
 
     def update_title(self, zind: int) -> None:
 
@@ -278,7 +543,9 @@ class SpotPlot(Column, DataModel):
         Callback for use with e.g. sliders
         """
 
-        self.changed(new)
-        self.update_cbar()
-        self.update_colours()
-        self.update_title(new)
+        with Instrumentation.timer('SpotPlot.input_change'):
+            self._zind = new
+            self.changed(new)
+            self.update_cbar()
+            self.update_colours()
+            self.update_title(new)
@@ -14,12 +14,12 @@ from bokeh.models.widgets import Div
 
 from bokeh.core.properties import Instance
 
-from bokeh.plotting import figure
-
 from bokcolmaps.SpotPlot import SpotPlot
 
 from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
 from bokcolmaps.check_kwargs import check_kwargs
+from bokcolmaps.get_percentile_min_max import parse_percentile
 
 
 class SpotPlotLP(Row, DataModel):
@@ -45,12 +45,18 @@ class SpotPlotLP(Row, DataModel):
         revz: reverse z axis in line plot if True.
         padleft: padding (pixels) to left of line plot (default 0)
         padabove: padding (pixels) above line plot (default 0)
+        cscale: colour scale ('linear', 'log' or 'symlog')
+        linthresh: scale of the linear region for the symlog colour scale
         """
 
-        check_kwargs(kwargs, extra_kwargs=['spheight', 'spwidth', 'lpheight', 'lpwidth', 'revz', 'padleft', 'padabove'])
+        from bokeh.plotting import figure
+
+        check_kwargs(kwargs, extra_kwargs=['spheight', 'spwidth', 'lpheight', 'lpwidth', 'revz', 'padleft', 'padabove',
+                                           'cscale', 'linthresh'])
 
         palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
             rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
 
         spheight = kwargs.get('spheight', 575)
         spwidth = kwargs.get('spwidth', 500)
@@ -59,25 +65,37 @@ class SpotPlotLP(Row, DataModel):
         revz = kwargs.get('revz', False)
         padleft = kwargs.get('padleft', 0)
         padabove = kwargs.get('padabove', 0)
+        cscale = kwargs.get('cscale', 'linear')
+        linthresh = kwargs.get('linthresh', 1)
 
         super().__init__()
 
+        # Data source for the line plot, in time order after appending data
+        # (slot is the ring buffer row of each point)
         xi = round(x.size / 2)
-        self.lpds = ColumnDataSource(data={'x': dm[:, xi], 'y': z, 'dm': dm})
+        self.lpds = ColumnDataSource(data={'x': dm[:, xi].copy(), 'y': z.copy(),
+                                           'slot': numpy.arange(z.size)})
+        self._lpind = xi  # Last profile position set from Python
 
-        jscode = """
-        var inds = psource.selected.indices;
-        if (inds.length > 0) {
-            var ind = inds[0];
+        # The tapped spot is kept to redraw the profile when data are appended
+
+        js_profile = """
             var data = dsource.data;
             var x = data['x'];
-            var y = data['y'];
-            var dm = data['dm'];
-            var skip = dm.length/y.length;
-            for (var i = 0; i < y.length; i++) {
-                x[i] = dm[ind + i*skip];
+            var slot = data['slot'];
+            var dm = dmsource.data['dm'][0];
+            var skip = dm.length/x.length;
+            for (var i = 0; i < x.length; i++) {
+                x[i] = dm[dsource._ind + slot[i]*skip];
             }
             dsource.change.emit();
+        """
+
+        jscode = """
+        var inds = psource.selected.indices;
+        if (inds.length > 0) {
+            dsource._ind = inds[0];
+            """ + js_profile + """
         }
         """
 
@@ -86,19 +104,27 @@ class SpotPlotLP(Row, DataModel):
                                xlab=xlab, ylab=ylab, zlab=zlab, dmlab=dmlab,
                                height=spheight, width=spwidth, rmin=rmin,
                                rmax=rmax, xran=xran, yran=yran,
-                               alpha=alpha, nan_colour=nan_colour)
+                               alpha=alpha, nan_colour=nan_colour, output_backend=output_backend,
+                               cscale=cscale, linthresh=linthresh)
 
-        update_lp = CustomJS(args={'dsource': self.lpds,
+        update_lp = CustomJS(args={'dsource': self.lpds, 'dmsource': self.spplot.datasrc,
                                    'psource': self.spplot.plot.renderers[0].data_source},
                              code=jscode)
 
         ttool = TapTool(callback=update_lp)
         self.spplot.plot.tools.append(ttool)
 
+        self.lpds.js_on_change('data', CustomJS(args={'dsource': self.lpds, 'dmsource': self.spplot.datasrc},
+                                                code="""
+        if (dsource._ind != null) {  // Profile at the tapped spot, not the one sent
+            """ + js_profile + """
+        }
+        """))
+
         self.lplot = figure(x_axis_label=dmlab, y_axis_label=zlab,
                             height=lpheight, width=lpwidth,
                             tools=['reset, pan, wheel_zoom, box_zoom, save'],
-                            toolbar_location='right')
+                            toolbar_location='right', output_backend=output_backend)
 
         self.lplot.line('x', 'y', source=self.lpds, line_color='blue',
                         line_width=2, line_alpha=1)
@@ -111,7 +137,8 @@ class SpotPlotLP(Row, DataModel):
             self.lplot.y_range.start, self.lplot.y_range.end = \
                 self.lplot.y_range.end, self.lplot.y_range.start
 
-        if (rmin is not None) and (rmax is not None):
+        if (rmin is not None) and (rmax is not None) and \
+           (parse_percentile(rmin) is None) and (parse_percentile(rmax) is None):
 
             self.lplot.x_range.start = rmin
             self.lplot.x_range.end = rmax
@@ -132,3 +159,38 @@ class SpotPlotLP(Row, DataModel):
         self.children.append(self.spplot)
         self.children.append(Div(text='', width=padleft, height=padabove + lpheight))
         self.children.append(self.lpcon)
+
+        self._revz = revz
+
+    def append_slice(self, d: numpy.ndarray, zval: float, display: bool=True) -> int:
+
+        """
+        Add a new row of data to the ring buffer of the spot plot (see
+        SpotPlot.append_slice) and resend the line plot profile in time order
+        (for the spot last tapped)
+        args...
+            d: 1D NumPy array of the new data, same size as x (or 2D for
+               several rows in arrival order)
+            zval: z coordinate of the new data (or 1D NumPy array of them)
+        kwargs...
+            display: display the newest data if True
+        returns the ring buffer row (z index) of the newest data
+        """
+
+        zind = self.spplot.append_slice(d, zval, display=display)
+
+        # Rows from the oldest to the newest data
+
+        nz = self.lpds.data['y'].size
+        slot = (zind + 1 + numpy.arange(nz)) % nz
+
+        ds = self.spplot.datasrc.data
+        self.lpds.data = {'x': ds['dm'][0][slot, self._lpind], 'y': ds['z'][0][slot], 'slot': slot}
+
+        z = self.lpds.data['y']
+        if self._revz:
+            self.lplot.y_range.start, self.lplot.y_range.end = z.max(), z.min()
+        else:
+            self.lplot.y_range.start, self.lplot.y_range.end = z.min(), z.max()
+
+        return zind
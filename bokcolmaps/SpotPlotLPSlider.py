@@ -14,6 +14,7 @@ from bokeh.core.properties import Instance
 from bokcolmaps.SpotPlotLP import SpotPlotLP
 
 from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
 from bokcolmaps.check_kwargs import check_kwargs
 
 
@@ -30,13 +31,17 @@ class SpotPlotLPSlider(Column, DataModel):
     def __init__(self, x: numpy.array, y: numpy.array, z: numpy.array, dm: numpy.ndarray, **kwargs: dict) -> None:
 
         """
-        All init arguments same as for SpotPlotLP
+        All init arguments same as for SpotPlotLP except for additional kwarg...
+        throttle: slider throttling, None (default), 'release' or a debounce
+                  time in milliseconds (see SpotPlot.link_slider)
         """
 
-        check_kwargs(kwargs, extra_kwargs=['spheight', 'spwidth', 'lpheight', 'lpwidth', 'revz', 'padleft', 'padabove'])
+        check_kwargs(kwargs, extra_kwargs=['spheight', 'spwidth', 'lpheight', 'lpwidth', 'revz', 'padleft', 'padabove',
+                                           'cscale', 'linthresh', 'throttle'])
 
         palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
             rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
 
         spheight = kwargs.get('spheight', 575)
         spwidth = kwargs.get('spwidth', 500)
@@ -45,6 +50,9 @@ class SpotPlotLPSlider(Column, DataModel):
         revz = kwargs.get('revz', False)
         padleft = kwargs.get('padleft', 0)
         padabove = kwargs.get('padabove', 0)
+        cscale = kwargs.get('cscale', 'linear')
+        linthresh = kwargs.get('linthresh', 1)
+        throttle = kwargs.get('throttle', None)
 
         super(SpotPlotLPSlider, self).__init__()
 
@@ -58,13 +66,15 @@ class SpotPlotLPSlider(Column, DataModel):
                                   lpheight=lpheight, lpwidth=lpwidth,
                                   rmin=rmin, rmax=rmax, xran=xran, yran=yran,
                                   revz=revz, alpha=alpha, nan_colour=nan_colour,
-                                  padleft=padleft, padabove=padabove)
+                                  output_backend=output_backend,
+                                  padleft=padleft, padabove=padabove,
+                                  cscale=cscale, linthresh=linthresh)
 
         self.zslider = Slider(title=zlab + ' index', start=0, end=z.size - 1,
                               step=1, value=0, orientation='horizontal',
                               width=self.splotlp.spplot.plot.width)
 
-        self.zslider.on_change('value', self.splotlp.spplot.input_change)
+        self.splotlp.spplot.link_slider(self.zslider, throttle=throttle)
 
         self.children.append(Column(self.zslider, width=self.width))
         self.children.append(self.splotlp)
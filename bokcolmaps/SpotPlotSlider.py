@@ -14,6 +14,7 @@ from bokeh.core.properties import Instance
 from bokcolmaps.SpotPlot import SpotPlot
 
 from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
 from bokcolmaps.check_kwargs import check_kwargs
 
 
@@ -30,16 +31,22 @@ class SpotPlotSlider(Column, DataModel):
     def __init__(self, x: numpy.array, y: numpy.array, z: numpy.array, dm: numpy.ndarray, **kwargs: dict) -> None:
 
         """
-        All init arguments same as for SpotPlot.
+        All init arguments same as for SpotPlot except for additional kwarg...
+        throttle: slider throttling, None (default), 'release' or a debounce
+                  time in milliseconds (see SpotPlot.link_slider)
         """
 
-        check_kwargs(kwargs, extra_kwargs=['height', 'width'])
+        check_kwargs(kwargs, extra_kwargs=['height', 'width', 'cscale', 'linthresh', 'throttle'])
 
         palette, cfile, revcols, xlab, ylab, zlab, dmlab, \
             rmin, rmax, xran, yran, alpha, nan_colour = get_common_kwargs(**kwargs)
+        output_backend = get_output_backend(**kwargs)
 
         height = kwargs.get('height', 575)
         width = kwargs.get('width', 500)
+        cscale = kwargs.get('cscale', 'linear')
+        linthresh = kwargs.get('linthresh', 1)
+        throttle = kwargs.get('throttle', None)
 
         super().__init__()
 
@@ -51,13 +58,14 @@ class SpotPlotSlider(Column, DataModel):
                               xlab=xlab, ylab=ylab, zlab=zlab, dmlab=dmlab,
                               height=height, width=width, rmin=rmin,
                               rmax=rmax, xran=xran, yran=yran,
-                              alpha=alpha, nan_colour=nan_colour)
+                              alpha=alpha, nan_colour=nan_colour, output_backend=output_backend,
+                              cscale=cscale, linthresh=linthresh)
 
         self.zslider = Slider(title='z index', start=0, end=z.size - 1,
                               step=1, value=0, orientation='horizontal',
                               width=self.splot.plot.width)
 
-        self.zslider.on_change('value', self.splot.input_change)
+        self.splot.link_slider(self.zslider, throttle=throttle)
 
         self.children.append(Column(self.zslider, width=self.width))
         self.children.append(self.splot)
@@ -0,0 +1,85 @@
+"""
+ThreadSafeUpdater class definition
+"""
+
+import functools
+
+from bokeh.document import Document
+from bokeh.model import Model
+
+from bokcolmaps.FrameIngestor import FrameIngestor
+
+# Plot methods which may be called through the updater
+
+_UPDATES = ['update_image', 'update_cbar', 'centre_lp', 'input_change', 'changed',
+            'update_colours', 'update_title', 'set_autoscale', 'append_slice']
+
+
+class ThreadSafeUpdater(FrameIngestor):
+
+    """
+    Thread-safe facade for updating a plot in a Bokeh Server document from
+    worker threads (e.g. a thread pool computing slices). Calls to the
+    plot's update methods (update_image, update_cbar, centre_lp,
+    input_change, append_slice etc.) may be made from any thread: they are
+    queued as FrameIngestor frames (so only the latest pending call of each
+    method is applied, except that append_slice calls are merged) in a
+    single next tick callback of the document, which is held
+    meanwhile (unless already held by the caller) so that repeated property
+    changes are sent once.
+
+    Usage...
+        updater = ThreadSafeUpdater(cmap, doc)
+        executor.submit(lambda: updater.append_slice(compute_slice(), zval))
+    """
+
+    def __init__(self, plot: Model, doc: Document=None) -> None:
+
+        """
+        args...
+            plot: ColourMap, ColourMapLP, SpotPlot or SpotPlotLP object
+        kwargs...
+            doc: Bokeh Document of the plot (plot.document if None)
+        """
+
+        super().__init__(doc)
+
+        self._plot = plot
+
+    def __getattr__(self, name: str) -> functools.partial:
+
+        if (name in _UPDATES) and hasattr(self._plot, name):
+            return functools.partial(self._queue, name)
+
+        raise AttributeError("'ThreadSafeUpdater' has no update method '" + name + "'")
+
+    def _queue(self, name: str, *args: tuple, **kwargs: dict) -> None:
+
+        """
+        Queue a call (from any thread)
+        """
+
+        self.submit(getattr(self._plot, name), *args, **kwargs)
+
+    def _apply(self) -> None:
+
+        """
+        Apply the pending calls (next tick callback of the document) with the
+        document held, restoring the caller's hold if there was one
+        """
+
+        doc = self._get_doc()
+
+        if doc.callbacks.hold_value is not None:
+            super()._apply()
+            return
+
+        doc.hold('combine')
+        try:
+            super()._apply()
+        finally:
+            doc.unhold()
+
+    def _get_doc(self) -> Document:
+
+        return self._doc if self._doc is not None else self._plot.document
@@ -3,6 +3,10 @@ __all__ = (
     'ColourMapSlider',
     'ColourMapLP',
     'ColourMapLPSlider',
+    'ColourMapLPFactory',
+    'ColourMapGrid',
+    'ColourMapSliderGroup',
+    'ColourMapOrtho',
     'CMSlicer',
     'CMSlicer2D',
     'CMSlicer3D',
@@ -12,8 +16,46 @@ __all__ = (
     'SpotPlotLPSlider',
     'generate_colourbar',
     'get_common_kwargs',
+    'get_output_backend',
     'get_min_max',
     'read_colourmap',
     'check_kwargs',
-    'plot_colourmap'
+    'plot_colourmap',
+    'Instrumentation',
+    'inspect_payload',
+    'get_slice_histograms',
+    'get_percentile_min_max',
+    'get_slice_min_max',
+    'symlog_transform',
+    'FrameIngestor',
+    'SharedDataset',
+    'DatasetRegistry',
+    'ThreadSafeUpdater',
+    'DocumentCache',
+    'ContourOverlay',
+    'RegionStats',
+    'FullResTiles',
+    'palette_to_rgba',
+    'get_contours',
+    'get_projection',
+    'get_summed_area_tables'
 )
+
+
+def __getattr__(name: str) -> object:
+
+    """
+    Import the submodules listed in __all__ on first access
+    (e.g. bokcolmaps.ColourMap), so that importing the package is fast
+    """
+
+    if name in __all__:
+        import importlib
+        return importlib.import_module('bokcolmaps.' + name)
+
+    raise AttributeError("module 'bokcolmaps' has no attribute '" + name + "'")
+
+
+def __dir__() -> list:
+
+    return sorted(set(globals()) | set(__all__))
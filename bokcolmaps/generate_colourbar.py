@@ -2,20 +2,87 @@
 generate_colourbar function definition
 """
 
+import numpy
+
 from bokeh.models import ColorBar
-from bokeh.models.tickers import AdaptiveTicker
-from bokeh.models.mappers import LinearColorMapper
+from bokeh.models.tickers import AdaptiveTicker, LogTicker, FixedTicker
+from bokeh.models.formatters import CustomJSTickFormatter
+from bokeh.models.mappers import ContinuousColorMapper
+
+from bokcolmaps.symlog_transform import symlog_transform, js_symlog_transform
 
 
-def generate_colourbar(cmap: LinearColorMapper, cbarwidth: float=25) -> ColorBar:
+def generate_colourbar(cmap: ContinuousColorMapper, cbarwidth: float=25, cscale: str='linear',
+                       linthresh: float=1, rmin: float=None, rmax: float=None) -> ColorBar:
 
     """
     Generate a colourbar for the the ColourMap and SpotPlot classes
+    kwargs...
+        cbarwidth: colourbar width (pixels)
+        cscale: colour scale ('linear', 'eqhist', 'log' or 'symlog')
+        linthresh: scale of the linear region for the symlog colour scale
+        rmin: minimum value (original units) for the symlog colour scale ticks
+              (the inverse transformed mapper limit if None)
+        rmax: maximum value for the symlog colour scale ticks
     """
 
+    formatter = None
+
+    if cscale == 'log':
+        ticker = LogTicker()
+    elif cscale == 'symlog':
+        # The mapper works on transformed values: tick at round values of
+        # the original values in the range and label in original units
+        if rmin is None:
+            rmin = symlog_transform(cmap.low, linthresh, inverse=True)
+        if rmax is None:
+            rmax = symlog_transform(cmap.high, linthresh, inverse=True)
+        ticks = symlog_transform(_get_symlog_ticks(rmin, rmax, linthresh), linthresh)
+        ticker = FixedTicker(ticks=list(ticks))
+        formatter = CustomJSTickFormatter(code=js_symlog_transform + """
+        return Number(itf(tick).toPrecision(3)).toString();
+        """, args={'linthresh': linthresh})
+    else:
+        ticker = AdaptiveTicker()
+
     cbar = ColorBar(color_mapper=cmap, location=(0, 0),
                     label_standoff=5, orientation='horizontal',
-                    height=cbarwidth, ticker=AdaptiveTicker(),
+                    height=cbarwidth, ticker=ticker,
                     bar_line_color='Black', major_tick_line_color='Black')
 
+    if formatter is not None:
+        cbar.formatter = formatter
+
     return cbar
+
+
+def _get_symlog_ticks(rmin: float, rmax: float, linthresh: float, max_ticks: int=12) -> numpy.ndarray:
+
+    """
+    Get symlog colour scale ticks (original units) between rmin and rmax:
+    the densest of 1 to 9, 1, 2 and 5, or 1 times powers of ten (and zero)
+    giving at most max_ticks, or else every few powers of ten. Magnitudes
+    go down to linthresh/10 if the range includes zero.
+    """
+
+    rmin, rmax = min(rmin, rmax), max(rmin, rmax)
+    hi = max(abs(rmin), abs(rmax))
+    if hi == 0:
+        return numpy.zeros(1)
+
+    lo = linthresh / 10 if rmin <= 0 <= rmax else min(abs(rmin), abs(rmax))
+    exps = numpy.arange(numpy.floor(numpy.log10(min(lo, hi))), numpy.ceil(numpy.log10(hi)) + 1)
+
+    def in_range(mags: numpy.ndarray) -> numpy.ndarray:
+
+        vals = numpy.concatenate((-mags[::-1], [0], mags))
+        return vals[(vals >= rmin) & (vals <= rmax)]
+
+    for mantissas in [numpy.arange(1, 10), numpy.array([1, 2, 5]), numpy.array([1])]:
+        ticks = in_range((mantissas[None, :] * 10.0 ** exps[:, None]).ravel())
+        if ticks.size <= max_ticks:
+            return ticks
+
+    step = int(numpy.ceil(ticks.size / max_ticks))
+
+    return in_range(10.0 ** exps[::step])
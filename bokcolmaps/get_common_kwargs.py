@@ -2,9 +2,8 @@
 get_common_kwargs function definition
 """
 
-from bokeh.palettes import Turbo256
-
-common_kwargs = ['palette', 'cfile', 'revcols', 'xlab', 'ylab', 'zlab', 'dmlab', 'rmin', 'rmax', 'xran', 'yran', 'alpha', 'nan_colour']
+common_kwargs = ['palette', 'cfile', 'revcols', 'xlab', 'ylab', 'zlab', 'dmlab', 'rmin', 'rmax', 'xran', 'yran',
+                 'alpha', 'nan_colour', 'output_backend']
 
 
 def get_common_kwargs(**kwargs: dict) -> tuple:
@@ -19,15 +18,20 @@ def get_common_kwargs(**kwargs: dict) -> tuple:
         ylab: y axis label
         zlab: z axis label
         dmlab: data label
-        rmin: minimum value for the colour scale (no autoscaling if neither this nor rmax is None)
-        rmax: maximum value for the colour scale
+        rmin: minimum value for the colour scale (no autoscaling if neither this nor rmax is None),
+              or a percentile string (e.g. '1%') for robust autoscaling
+        rmax: maximum value for the colour scale, or a percentile string (e.g. '99%')
         xran: x axis range
         yran: y axis range
         alpha: global image alpha
         nan_colour: NaN colour
+        output_backend: figure output backend (see get_output_backend)
     """
 
-    palette = kwargs.get('palette', Turbo256)
+    palette = kwargs.get('palette', None)
+    if palette is None:
+        from bokeh.palettes import Turbo256  # Deferred to keep import fast
+        palette = Turbo256
     cfile = kwargs.get('cfile', None)
     revcols = kwargs.get('revcols', False)
     xlab = kwargs.get('xlab', 'x')
@@ -0,0 +1,98 @@
+"""
+get_contours function definition
+"""
+
+import numpy
+
+# Marching squares segments for each cell case, as pairs of cell edges
+# (0 bottom, 1 right, 2 top, 3 left). The case bits are set for corners
+# above the level: 1 bottom left, 2 bottom right, 4 top right, 8 top left.
+# Saddles (5 and 10) are resolved from the cell centre value below.
+
+_EDGES = numpy.array([[[-1, -1], [-1, -1]],  # 0
+                      [[3, 0], [-1, -1]],  # 1
+                      [[0, 1], [-1, -1]],  # 2
+                      [[3, 1], [-1, -1]],  # 3
+                      [[1, 2], [-1, -1]],  # 4
+                      [[3, 0], [1, 2]],  # 5 (centre below)
+                      [[0, 2], [-1, -1]],  # 6
+                      [[3, 2], [-1, -1]],  # 7
+                      [[3, 2], [-1, -1]],  # 8
+                      [[0, 2], [-1, -1]],  # 9
+                      [[0, 1], [3, 2]],  # 10 (centre below)
+                      [[1, 2], [-1, -1]],  # 11
+                      [[3, 1], [-1, -1]],  # 12
+                      [[0, 1], [-1, -1]],  # 13
+                      [[3, 0], [-1, -1]],  # 14
+                      [[-1, -1], [-1, -1]]])  # 15
+
+_SADDLES = {5: [[0, 1], [3, 2]], 10: [[3, 0], [1, 2]]}  # Centre above
+
+
+def get_contours(x: numpy.array, y: numpy.array, d: numpy.ndarray, levels: list) -> tuple:
+
+    """
+    Get contour lines of a 2D array on a uniform grid by marching squares,
+    vectorised over the grid cells (the line segments are not joined)
+    args...
+        x: 1D NumPy array of x coordinates
+        y: 1D NumPy array of y coordinates
+        d: 2D NumPy array of the data, dimensions y.size, x.size
+        levels: contour levels
+    returns lists of x and y coordinate arrays, one of each per level, with
+    the segments separated by NaNs (for a Bokeh multi_line glyph)
+    """
+
+    v00, v01 = d[:-1, :-1], d[:-1, 1:]
+    v10, v11 = d[1:, :-1], d[1:, 1:]
+    valid = numpy.isfinite(v00) & numpy.isfinite(v01) & numpy.isfinite(v10) & numpy.isfinite(v11)
+
+    # Edge end points of each cell (bottom, right, top, left)
+
+    xl, xr = numpy.broadcast_to(x[:-1], v00.shape), numpy.broadcast_to(x[1:], v00.shape)
+    yb, yt = numpy.broadcast_to(y[:-1, None], v00.shape), numpy.broadcast_to(y[1:, None], v00.shape)
+    ends = [((xl, yb, v00), (xr, yb, v01)), ((xr, yb, v01), (xr, yt, v11)),
+            ((xl, yt, v10), (xr, yt, v11)), ((xl, yb, v00), (xl, yt, v10))]
+
+    xs = []
+    ys = []
+
+    for level in levels:
+
+        above = [v > level for v in (v00, v01, v11, v10)]
+        case = above[0] * 1 + above[1] * 2 + above[2] * 4 + above[3] * 8
+        case[~valid] = 0
+
+        cells = numpy.nonzero((case > 0) & (case < 15))
+        case = case[cells]
+        edges = _EDGES[case]
+        centre_above = (v00[cells] + v01[cells] + v10[cells] + v11[cells]) / 4 > level
+        for c, e in _SADDLES.items():
+            edges[(case == c) & centre_above] = e
+
+        # Crossing points of the level on each edge of the cells
+
+        px = numpy.empty((4, case.size))
+        py = numpy.empty((4, case.size))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            for e, ((xa, ya, va), (xb, yb_, vb)) in enumerate(ends):
+                va, vb = va[cells], vb[cells]
+                t = numpy.clip(numpy.nan_to_num((level - va) / (vb - va)), 0, 1)
+                px[e] = xa[cells] + t * (xb[cells] - xa[cells])
+                py[e] = ya[cells] + t * (yb_[cells] - ya[cells])
+
+        segs = numpy.concatenate([edges[:, 0], edges[:, 1]])
+        inds = numpy.concatenate([numpy.arange(case.size)] * 2)
+        keep = segs[:, 0] >= 0
+        segs, inds = segs[keep], inds[keep]
+
+        # Segments separated by NaNs
+
+        lx = numpy.full((segs.shape[0], 3), numpy.nan)
+        ly = numpy.full((segs.shape[0], 3), numpy.nan)
+        lx[:, 0], ly[:, 0] = px[segs[:, 0], inds], py[segs[:, 0], inds]
+        lx[:, 1], ly[:, 1] = px[segs[:, 1], inds], py[segs[:, 1], inds]
+        xs.append(lx.ravel()[:-1])
+        ys.append(ly.ravel()[:-1])
+
+    return xs, ys
@@ -0,0 +1,21 @@
+"""
+get_output_backend function definition
+"""
+
+
+def get_output_backend(**kwargs: dict) -> str:
+
+    """
+    Get the figure output backend for the ColourMap/ColourMap3, SpotPlot and
+    derived classes (separate from get_common_kwargs so that its return
+    values are unchanged)
+    kwargs...
+        output_backend: figure output backend, 'canvas' (default), 'svg' or 'webgl'
+                        (faster rendering of large scatters and long lines)
+    """
+
+    output_backend = kwargs.get('output_backend', 'canvas')
+    if output_backend not in ['canvas', 'svg', 'webgl']:
+        raise ValueError('Invalid output backend: ' + str(output_backend))
+
+    return output_backend
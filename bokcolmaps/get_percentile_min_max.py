@@ -0,0 +1,116 @@
+"""
+get_percentile_min_max function definition
+"""
+
+import numpy
+
+
+def parse_percentile(r: object) -> float:
+
+    """
+    Get the percentile from a colour scale limit given as a string, e.g. '99%'
+    (returns None if the limit is not a percentile)
+    """
+
+    if isinstance(r, str) and r.strip().endswith('%'):
+        p = float(r.strip()[:-1])
+        if (p < 0) or (p > 100):
+            raise ValueError('Percentile out of range: ' + r)
+        return p
+
+    return None
+
+
+def get_percentile_min_max(d: numpy.ndarray, delta: float, pmin: float, pmax: float,
+                           max_samples: int=2**18, chunk_size: int=2**22, seed: int=0,
+                           positive: bool=False, empty: tuple=None) -> tuple:
+
+    """
+    Get robust minimum and maximum values for colour mapping as percentiles
+    of the finite values. Large arrays are processed in chunks (along the
+    leading axes, so strided views are not copied) with a stratified random
+    sample taken from each, so memory is bounded and the cost depends on
+    the sample size rather than the number of values.
+    args...
+        d: NumPy array of values to be colour mapped, or a list of arrays
+           (e.g. several slices) whose values are pooled
+        delta: Offset to use instead if the values are the same
+        pmin: percentile (0 to 100) for the minimum value
+        pmax: percentile (0 to 100) for the maximum value
+    kwargs...
+        max_samples: maximum number of values used (exact percentiles below this)
+        chunk_size: number of values processed at once
+        seed: random number generator seed (for repeatable limits)
+        positive: use only the positive values (e.g. for a log colour scale),
+                  in which case the limits are 1 and 1 + delta if there are none
+        empty: limits returned as they are if there are no values (default
+               0 and delta, or 1 and 1 + delta if positive)
+    """
+
+    parts = list(d) if isinstance(d, (list, tuple)) else [d]
+    size = sum(p.size for p in parts)
+
+    if size <= max_samples:
+        samples = [p[_keep(p, positive)] for p in parts]
+    else:
+        rng = numpy.random.default_rng(seed)
+        samples = []
+        for p in parts:
+            for dc in _chunks(p, chunk_size):
+                ns = max(1, round(max_samples * dc.size / size))
+                # One random value from each of ns equal strata of the chunk
+                edges = numpy.arange(ns + 1) * dc.size // ns
+                inds = edges[:-1] + (rng.random(ns) * (edges[1:] - edges[:-1])).astype(int)
+                s = dc[numpy.unravel_index(inds, dc.shape)]
+                samples.append(s[_keep(s, positive)])  # Masked after sampling (no copy of the chunk)
+    sample = numpy.concatenate([numpy.ravel(s) for s in samples]) if samples else numpy.zeros(0)
+
+    if sample.size > 0:
+        min_val, max_val = numpy.percentile(sample, [pmin, pmax])
+    elif empty is not None:
+        return empty
+    elif positive:
+        max_val = min_val = 1
+    else:
+        max_val = min_val = 0
+    if max_val == min_val:
+        max_val += delta
+
+    return min_val, max_val
+
+
+def _chunks(d: numpy.ndarray, chunk_size: int) -> object:
+
+    """
+    Split an array into views of about chunk_size values (or fewer) along
+    its leading axes, without flattening it (which would copy a strided
+    view)
+    """
+
+    if d.size == 0:
+        return
+    if (d.ndim <= 1) or (d.size <= chunk_size):
+        for c0 in range(0, d.shape[0] if d.ndim > 0 else 1, max(1, chunk_size)):
+            yield d[c0:c0 + chunk_size] if d.ndim > 0 else d
+        return
+
+    rsize = d.size // d.shape[0]
+    if rsize > chunk_size:  # Rows too large, so split each
+        for row in d:
+            yield from _chunks(row, chunk_size)
+    else:
+        rows = chunk_size // rsize
+        for r0 in range(0, d.shape[0], rows):
+            yield d[r0:r0 + rows]
+
+
+def _keep(d: numpy.ndarray, positive: bool) -> numpy.ndarray:
+
+    """
+    Mask of the values used
+    """
+
+    if positive:
+        return numpy.isfinite(d) & (d > 0)
+
+    return numpy.isfinite(d)
@@ -0,0 +1,64 @@
+"""
+get_projection function definition
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+projection_modes = ['max', 'mean', 'min']
+
+
+def get_projection(dm: numpy.ndarray, mode: str, chunk_size: int=2**22, max_workers: int=None) -> numpy.ndarray:
+
+    """
+    Get a projection (reduction over z) of a 3D array ignoring non-finite
+    values, e.g. a maximum intensity projection. The array is processed in
+    chunks of rows of the output, reduced in parallel in a thread pool
+    (NumPy releases the GIL), and each chunk is read in blocks of slices, so
+    the temporary memory is bounded (e.g. for a memory mapped array).
+    args...
+        dm: 3D NumPy array, first dimension z
+        mode: 'max', 'mean' or 'min'
+    kwargs...
+        chunk_size: approximate number of values processed at once by each thread
+        max_workers: maximum number of threads (ThreadPoolExecutor default if None)
+    returns 2D NumPy array, NaN where there are no finite values
+    """
+
+    if mode not in projection_modes:
+        raise ValueError('Invalid projection mode: ' + str(mode))
+
+    nz, ny, nx = dm.shape
+
+    nrows = max(1, min(ny, chunk_size // max(nz * nx, 1)))
+    zstep = max(1, chunk_size // max(nrows * nx, 1))
+
+    proj = numpy.empty((ny, nx))
+
+    def reduce_rows(y0: int) -> None:
+
+        y1 = min(y0 + nrows, ny)
+        acc = numpy.full((y1 - y0, nx), numpy.nan if mode != 'mean' else 0.0)
+        count = numpy.zeros((y1 - y0, nx))
+        for z0 in range(0, nz, zstep):
+            dc = numpy.asarray(dm[z0:z0 + zstep, y0:y1], dtype=float)
+            fin = numpy.isfinite(dc)
+            if mode == 'max':
+                acc = numpy.fmax(acc, numpy.max(numpy.where(fin, dc, -numpy.inf), axis=0))
+            elif mode == 'min':
+                acc = numpy.fmin(acc, numpy.min(numpy.where(fin, dc, numpy.inf), axis=0))
+            else:
+                acc += numpy.where(fin, dc, 0).sum(axis=0)
+            count += fin.sum(axis=0)
+
+        if mode == 'mean':
+            acc = numpy.divide(acc, count, out=numpy.full_like(acc, numpy.nan), where=count > 0)
+        else:
+            acc[count == 0] = numpy.nan
+        proj[y0:y1] = acc
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(reduce_rows, range(0, ny, nrows)))  # list to raise any exceptions
+
+    return proj
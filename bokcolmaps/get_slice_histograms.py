@@ -0,0 +1,44 @@
+"""
+get_slice_histograms function definition
+"""
+
+import numpy
+
+
+def get_slice_histograms(dm: numpy.ndarray, minvals: list, maxvals: list, nbins: int,
+                         chunk_size: int=2**22) -> numpy.ndarray:
+
+    """
+    Get histograms of the finite values of every 2D slice of a 3D array in a
+    single vectorised pass (processed in chunks of whole slices to bound the
+    temporary memory). Values outside the limits are counted in the end bins.
+    args...
+        dm: 3D NumPy array (or 2D for a single slice), first dimension z
+        minvals: lower histogram limit for each slice
+        maxvals: upper histogram limit for each slice
+        nbins: number of bins
+    kwargs...
+        chunk_size: approximate number of values processed at once
+    returns 2D NumPy array of counts, dimensions number of slices by nbins
+    """
+
+    nz = dm.shape[0] if len(dm.shape) == 3 else 1
+    d = dm.reshape(nz, -1)
+
+    lo = numpy.asarray(minvals, dtype=float).reshape(nz, 1)
+    hi = numpy.asarray(maxvals, dtype=float).reshape(nz, 1)
+    scale = nbins / (hi - lo)
+
+    counts = numpy.empty((nz, nbins), dtype=numpy.int64)
+
+    zstep = max(1, chunk_size // max(d.shape[1], 1))
+    for z0 in range(0, nz, zstep):
+        z1 = min(z0 + zstep, nz)
+        b = numpy.floor((d[z0:z1] - lo[z0:z1]) * scale[z0:z1])
+        fin = numpy.isfinite(b)
+        b = numpy.clip(b, 0, nbins - 1)
+        b += (numpy.arange(z1 - z0) * nbins)[:, None]
+        counts[z0:z1] = numpy.bincount(b[fin].astype(numpy.int64),
+                                       minlength=(z1 - z0) * nbins).reshape(z1 - z0, nbins)
+
+    return counts
@@ -0,0 +1,102 @@
+"""
+get_slice_min_max function definition
+"""
+
+import numpy
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from bokcolmaps.get_percentile_min_max import get_percentile_min_max
+
+
+def parse_autoscale(mode: str) -> tuple:
+
+    """
+    Parse an autoscale mode string: 'slice', 'global' or 'window:N' (N a
+    positive number of slices), returning the mode and window size
+    """
+
+    if mode in ['slice', 'global']:
+        return mode, 1
+
+    if isinstance(mode, str) and mode.startswith('window:'):
+        try:
+            n = int(mode[7:])
+        except ValueError:
+            n = 0
+        if n > 0:
+            return 'window', n
+
+    raise ValueError('Invalid autoscale mode: ' + str(mode))
+
+
+def get_slice_min_max(dm: numpy.ndarray, delta: float, mode: str='slice', plims: tuple=None,
+                      positive: bool=False, chunk_size: int=2**22) -> tuple:
+
+    """
+    Get minimum and maximum values for colour mapping every 2D slice of a 3D
+    array, vectorised over the slices (processed in chunks of whole slices to
+    bound the temporary memory)
+    args...
+        dm: 3D NumPy array, first dimension z
+        delta: Offset to use instead if the values are the same
+    kwargs...
+        mode: 'slice' for the limits of each slice, 'global' for the limits of
+              the whole array or 'window:N' for the limits over a window of N
+              slices centred on each slice
+        plims: (minimum, maximum) percentiles for robust limits
+               (see get_percentile_min_max), None for the extreme values
+        positive: use only the positive values (e.g. for a log colour scale)
+        chunk_size: approximate number of values processed at once
+    returns 1D NumPy arrays of the minimum and maximum values
+    """
+
+    mode, nwin = parse_autoscale(mode)
+
+    nz = dm.shape[0]
+    ssize = int(numpy.prod(dm.shape[1:]))
+
+    if plims is None:
+
+        minvals = numpy.empty(nz)
+        maxvals = numpy.empty(nz)
+
+        zstep = max(1, chunk_size // max(ssize, 1))
+        for z0 in range(0, nz, zstep):
+            dc = dm[z0:z0 + zstep].reshape(-1, ssize)  # Only a chunk copied if dm is a strided view
+            fin = numpy.isfinite(dc)
+            if positive:
+                fin &= dc > 0
+            minvals[z0:z0 + zstep] = numpy.min(numpy.where(fin, dc, numpy.inf), axis=1, initial=numpy.inf)
+            maxvals[z0:z0 + zstep] = numpy.max(numpy.where(fin, dc, -numpy.inf), axis=1, initial=-numpy.inf)
+
+    else:
+
+        # Deltas are applied below, after any combination of slices, and
+        # slices with no values give infinite limits (as above) so they are
+        # ignored by the combination and fixed up as empty
+        limits = numpy.array([get_percentile_min_max(dm[zind], 0, *plims, positive=positive,
+                                                     empty=(numpy.inf, -numpy.inf)) for zind in range(nz)])
+        minvals, maxvals = limits[:, 0], limits[:, 1]
+
+    if mode == 'global':
+        minvals = numpy.full(nz, numpy.min(minvals))
+        maxvals = numpy.full(nz, numpy.max(maxvals))
+    elif mode == 'window':
+        before = (nwin - 1) // 2
+        after = nwin - 1 - before
+        minvals = sliding_window_view(numpy.pad(minvals, (before, after), constant_values=numpy.inf),
+                                      nwin).min(axis=1)
+        maxvals = sliding_window_view(numpy.pad(maxvals, (before, after), constant_values=-numpy.inf),
+                                      nwin).max(axis=1)
+
+    # No finite (or positive) values: as for get_min_max, but positive
+    # limits are needed for log scaling
+
+    empty = ~numpy.isfinite(minvals) | (positive & (minvals <= 0))
+    minvals[empty] = 1 if positive else 0
+    maxvals[empty] = minvals[empty]
+
+    maxvals[maxvals == minvals] += delta
+
+    return minvals, maxvals
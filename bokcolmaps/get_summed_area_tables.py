@@ -0,0 +1,30 @@
+"""
+get_summed_area_tables function definition
+"""
+
+import numpy
+
+
+def get_summed_area_tables(d: numpy.ndarray) -> numpy.ndarray:
+
+    """
+    Get summed-area tables (integral images) of the sum, sum of squares and
+    number of the finite values of a 2D array, so that the statistics of any
+    rectangle are given by four lookups, e.g. for rows y0 to y1 and columns
+    x0 to x1 inclusive:
+        sat[:, y1 + 1, x1 + 1] - sat[:, y0, x1 + 1] - sat[:, y1 + 1, x0] + sat[:, y0, x0]
+    args...
+        d: 2D NumPy array
+    returns 3D NumPy array, dimensions 3 (sum, sum of squares, count),
+    d.shape[0] + 1, d.shape[1] + 1 (first row and column zero)
+    """
+
+    fin = numpy.isfinite(d)
+    df = numpy.where(fin, d, 0).astype(float)
+
+    sat = numpy.zeros((3, d.shape[0] + 1, d.shape[1] + 1))
+    sat[0, 1:, 1:] = df
+    sat[1, 1:, 1:] = df * df
+    sat[2, 1:, 1:] = fin
+
+    return sat.cumsum(axis=1).cumsum(axis=2)
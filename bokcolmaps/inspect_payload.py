@@ -0,0 +1,115 @@
+"""
+inspect_payload function definition
+"""
+
+import json
+
+import numpy
+
+from bokeh.model import Model
+from bokeh.models import ColumnDataSource
+from bokeh.core.serialization import Serializer
+
+
+def _encoded_size(serializer: Serializer, obj: object) -> int:
+
+    """
+    Size (bytes) of the JSON encoding of an object as sent to the browser
+    """
+
+    return len(json.dumps(serializer.encode(obj), separators=(',', ':')))
+
+
+def _source_labels(models: set) -> dict:
+
+    """
+    Label ColumnDataSources by their owning bokcolmaps class and attribute
+    (e.g. 'ColourMap.datasrc'), falling back to the model id
+    """
+
+    labels = {}
+    for model in models:
+        if type(model).__module__.startswith('bokcolmaps'):
+            for name, value in model.properties_with_values(include_defaults=False).items():
+                if isinstance(value, ColumnDataSource):
+                    labels[value.id] = type(model).__name__ + '.' + name
+
+    return labels
+
+
+def _arrays(value: object) -> list:
+
+    """
+    NumPy arrays held in a data source column (either the column itself or
+    its items, e.g. the single item lists used by ColourMap)
+    """
+
+    if isinstance(value, numpy.ndarray):
+        if value.dtype == object:
+            return [v for v in value if isinstance(v, numpy.ndarray)]
+        return [value]
+
+    return [v for v in value if isinstance(v, numpy.ndarray)]
+
+
+def inspect_payload(model: Model) -> dict:
+
+    """
+    Report the encoded size of a model graph (e.g. any bokcolmaps layout)
+    per model and per data source column, and flag duplicated array buffers.
+    args...
+        model: Bokeh model at the root of the layout
+    returns a dict with...
+        total_bytes: sum of the model sizes
+        models: list of dicts (id, type, bytes), largest first
+        columns: list of dicts (source, id, column, bytes), largest first
+        duplicates: list of dicts (bytes, columns) for array buffers shared
+                    (e.g. as views) by more than one column
+    """
+
+    models = model.references()
+    serializer = Serializer(references=set(models), deferred=False)
+    labels = _source_labels(models)
+
+    model_sizes = []
+    column_sizes = []
+    buffers = []
+
+    for m in models:
+
+        attrs = m.properties_with_values(include_defaults=False)
+        size = _encoded_size(serializer, {'type': m.__qualified_model__, 'id': m.id, 'attributes': attrs})
+        model_sizes.append({'id': m.id, 'type': type(m).__name__, 'bytes': size})
+
+        if isinstance(m, ColumnDataSource):
+
+            source = labels.get(m.id, m.id)
+
+            for column, value in m.data.items():
+
+                column_sizes.append({'source': source, 'id': m.id, 'column': column,
+                                     'bytes': _encoded_size(serializer, value)})
+
+                for a in _arrays(value):
+                    if a.size == 0:
+                        continue
+                    for group in buffers:
+                        if numpy.shares_memory(group['array'], a):
+                            break
+                    else:
+                        group = {'array': a, 'bytes': 0, 'columns': []}
+                        buffers.append(group)
+                    group['bytes'] = max(group['bytes'], a.nbytes)
+                    group['columns'].append(source + ':' + column)
+
+    duplicates = [{'bytes': group['bytes'], 'columns': group['columns']}
+                  for group in buffers if len(group['columns']) > 1]
+
+    model_sizes.sort(key=lambda r: r['bytes'], reverse=True)
+    column_sizes.sort(key=lambda r: r['bytes'], reverse=True)
+    duplicates.sort(key=lambda r: r['bytes'], reverse=True)
+
+    return {'total_bytes': sum(r['bytes'] for r in model_sizes),
+            'models': model_sizes,
+            'columns': column_sizes,
+            'duplicates': duplicates}
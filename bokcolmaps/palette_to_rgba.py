@@ -0,0 +1,39 @@
+"""
+palette_to_rgba function definition
+"""
+
+import numpy
+
+
+def palette_to_rgba(palette: list) -> numpy.ndarray:
+
+    """
+    Convert a palette to a lookup table of packed RGBA values, as used by
+    the Bokeh image_rgba glyph
+    args...
+        palette: list of colours, each a hex string ('#rrggbb' or
+                 '#rrggbbaa'), a CSS colour name or an (r, g, b[, a]) tuple
+                 (alpha from 0 to 1)
+    returns 1D NumPy uint32 array, one value per colour
+    """
+
+    from bokeh.colors import named  # Deferred to keep import fast
+
+    rgba = numpy.empty((len(palette), 4), dtype=numpy.uint8)
+
+    for i, c in enumerate(palette):
+        if isinstance(c, str) and c.startswith('#'):
+            h = c[1:]
+            if len(h) not in [6, 8]:
+                raise ValueError('Invalid colour: ' + c)
+            vals = [int(h[j:j + 2], 16) for j in range(0, len(h), 2)]
+            rgba[i] = vals + [255] * (4 - len(vals))
+        elif isinstance(c, str):
+            nc = getattr(named, c.lower(), None)
+            if nc is None:
+                raise ValueError('Invalid colour: ' + c)
+            rgba[i] = nc.r, nc.g, nc.b, round(255 * nc.a)
+        else:
+            rgba[i] = tuple(c[:3]) + (round(255 * (c[3] if len(c) > 3 else 1)),)
+
+    return rgba.view(numpy.uint32).ravel()  # Bytes in RGBA order whatever the endianness
@@ -5,12 +5,13 @@ plot_colourmap function definition
 import numpy
 
 from bokeh.palettes import Turbo256
-from bokeh.plotting import show
-from bokeh.io import output_file
+from bokeh.io import output_file, show
+from bokeh.util.browser import view
 
 from bokcolmaps.ColourMap import ColourMap
 from bokcolmaps.ColourMapSlider import ColourMapSlider
 from bokcolmaps.ColourMapLPSlider import ColourMapLPSlider
+from bokcolmaps.DocumentCache import DocumentCache
 
 
 def plot_colourmap(data: numpy.ndarray, **kwargs: dict) -> None:
@@ -32,14 +33,21 @@ def plot_colourmap(data: numpy.ndarray, **kwargs: dict) -> None:
         zlab: z axis label
         dmlab: data label
         line_plot: line plot on True for hover tool with 3D data
-        rmin: minimum value for the colour scale (no autoscaling if neither this nor rmax is None)
-        rmax: maximum value for the colour scale
+        rmin: minimum value for the colour scale (no autoscaling if neither this nor rmax is None),
+              or a percentile string (e.g. '1%') for robust autoscaling
+        rmax: maximum value for the colour scale, or a percentile string (e.g. '99%')
         revz: reverse z axis in line plot if True
         palette: A Bokeh palette for the colour mapping
         revcols: reverse colour palette if True
         alpha: global image alpha
         nan_colour: NaN colour
+        cscale: colour scale ('linear', 'eqhist', 'log' or 'symlog')
+        autoscale: autoscaling mode ('slice', 'global' or 'window:N')
+        linthresh: scale of the linear region for the symlog colour scale
+        output_backend: figure output backend ('canvas', 'svg' or 'webgl')
         fname: output file name
+        cache: DocumentCache to reuse the plot if plotted before with the
+               same data and kwargs (None for no caching)
     """
 
     # Inputs
@@ -65,8 +73,16 @@ def plot_colourmap(data: numpy.ndarray, **kwargs: dict) -> None:
     revcols = kwargs.get('revcols', False)
     alpha = kwargs.get('alpha', 1)
     nan_colour = kwargs.get('nan_colour', 'Grey')
+    cscale = kwargs.get('cscale', 'linear')
+    autoscale = kwargs.get('autoscale', 'slice')
+    linthresh = kwargs.get('linthresh', 1)
+    output_backend = kwargs.get('output_backend', 'canvas')
 
     fname = kwargs.get('fname', 'colourmap.html')
+    cache = kwargs.get('cache', None)
+
+    if (cache is not None) and (not isinstance(cache, DocumentCache)):
+        raise ValueError('Invalid cache: ' + str(cache))
 
     # Dimensions
 
@@ -104,17 +120,30 @@ def plot_colourmap(data: numpy.ndarray, **kwargs: dict) -> None:
 
     if lp:
 
-        cmap = cmap_class(x, y, z, data, cmheight=height, cmwidth=width, lpheight=height,
-                          xlab=xlab, ylab=ylab, zlab=zlab, dmlab=dmlab, rmin=rmin, rmax=rmax, revz=revz,
-                          palette=palette, revcols=revcols, alpha=alpha, nan_colour=nan_colour)
+        cmap_kwargs = dict(cmheight=height, cmwidth=width, lpheight=height,
+                           xlab=xlab, ylab=ylab, zlab=zlab, dmlab=dmlab, rmin=rmin, rmax=rmax, revz=revz,
+                           palette=palette, revcols=revcols, alpha=alpha, nan_colour=nan_colour,
+                           cscale=cscale, autoscale=autoscale, linthresh=linthresh,
+                           output_backend=output_backend)
 
     else:
 
-        cmap = cmap_class(x, y, z, data, height=height, width=width,
-                          xlab=xlab, ylab=ylab, zlab=zlab, dmlab=dmlab, rmin=rmin, rmax=rmax,
-                          palette=palette, revcols=revcols, alpha=alpha, nan_colour=nan_colour)
+        cmap_kwargs = dict(height=height, width=width,
+                           xlab=xlab, ylab=ylab, zlab=zlab, dmlab=dmlab, rmin=rmin, rmax=rmax,
+                           palette=palette, revcols=revcols, alpha=alpha, nan_colour=nan_colour,
+                           cscale=cscale, autoscale=autoscale, linthresh=linthresh,
+                           output_backend=output_backend)
+
+    # Display and save (the cached document if there is one)
+
+    if cache is not None:
+        html = cache.get_document(cmap_class, x, y, z, data, **cmap_kwargs)
+        with open(fname, 'wt', encoding='utf-8') as f:
+            f.write(html)
+        view(fname)
+        return
 
-    # Display and save
+    cmap = cmap_class(x, y, z, data, **cmap_kwargs)
 
     output_file(fname, mode='inline')
     show(cmap)
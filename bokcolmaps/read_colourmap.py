@@ -2,10 +2,13 @@
 read_colourmap function definition
 """
 
-from bokeh.models import ColumnDataSource
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from bokeh.models import ColumnDataSource
 
-def read_colourmap(fname: str) -> ColumnDataSource:
+
+def read_colourmap(fname: str) -> 'ColumnDataSource':
 
     """
     Read in the colour scale.
@@ -13,6 +16,8 @@ def read_colourmap(fname: str) -> ColumnDataSource:
         fname: path to file containing comma separated RGBA floats
     """
 
+    from bokeh.models import ColumnDataSource  # Deferred to keep import fast
+
     f = open(fname, 'rt')
     cmap = []
     for l in f:
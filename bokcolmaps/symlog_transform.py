@@ -0,0 +1,31 @@
+"""
+symlog_transform function definition
+"""
+
+import numpy
+
+# JS forward (tf) and inverse (itf) transforms, for use in callbacks with a
+# linthresh variable or argument
+
+js_symlog_transform = """
+        var tf = function(v) {return Math.sign(v)*Math.log10(1 + Math.abs(v)/linthresh);};
+        var itf = function(v) {return Math.sign(v)*linthresh*(Math.pow(10, Math.abs(v)) - 1);};
+        """
+
+
+def symlog_transform(d: numpy.ndarray, linthresh: float, inverse: bool=False) -> numpy.ndarray:
+
+    """
+    Symmetric log transform, sign(d)*log10(1 + |d|/linthresh), which is
+    linear near zero and logarithmic for |d| much greater than linthresh
+    args...
+        d: NumPy array (or scalar) of values
+        linthresh: scale of the linear region
+    kwargs...
+        inverse: apply the inverse transform if True
+    """
+
+    if inverse:
+        return numpy.sign(d) * linthresh * (10 ** numpy.abs(d) - 1)
+
+    return numpy.sign(d) * numpy.log10(1 + numpy.abs(d) / linthresh)
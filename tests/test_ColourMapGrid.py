@@ -0,0 +1,46 @@
+"""
+Tests for the colour scale limits and hover callbacks of ColourMapGrid
+"""
+
+import numpy
+import pytest
+
+from bokeh.models import HoverTool
+
+from bokcolmaps.ColourMapGrid import ColourMapGrid
+
+
+def make_data() -> tuple:
+
+    rng = numpy.random.default_rng(0)
+    dm = rng.random((6, 4, 5)) * numpy.arange(1, 7)[:, None, None]
+    dm[2, 1, 1] = numpy.nan
+
+    return numpy.arange(5.0), numpy.arange(4.0), numpy.arange(6.0), dm
+
+
+def test_limits():
+
+    x, y, z, dm = make_data()
+
+    for zinds in [[1, 2, 3], [4, 0, 2], [3]]:
+        grid = ColourMapGrid(x, y, z, dm, zinds=zinds)
+        assert numpy.isclose(grid.cmap.low, numpy.nanmin(dm[zinds]))
+        assert numpy.isclose(grid.cmap.high, numpy.nanmax(dm[zinds]))
+
+    for zinds in [[1, 2, 3], [3, 1, 2]]:  # Same slices, so same limits
+        grid = ColourMapGrid(x, y, z, dm, zinds=zinds, rmin='10%', rmax='90%')
+        assert numpy.allclose([grid.cmap.low, grid.cmap.high], numpy.nanpercentile(dm[1:4], [10, 90]))
+
+    with pytest.raises(ValueError):
+        ColourMapGrid(x, y, z, dm, zinds=[])
+
+
+def test_shared_hover():
+
+    x, y, z, dm = make_data()
+    grid = ColourMapGrid(x, y, z, dm, zinds=[5, 1])
+
+    callbacks = [plot.select_one({'type': HoverTool}).callback for plot in grid.plots]
+    assert callbacks[0] is callbacks[1]
+    assert 'p' not in callbacks[0].args
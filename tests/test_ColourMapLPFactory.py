@@ -0,0 +1,72 @@
+"""
+Tests that ColourMapLPFactory plots match directly constructed ColourMapLPs
+"""
+
+import json
+
+import numpy
+import pytest
+
+from bokeh.document import Document
+
+from bokcolmaps.ColourMapLP import ColourMapLP
+from bokcolmaps.ColourMapLPFactory import ColourMapLPFactory
+
+
+def embed(item: str) -> ColourMapLP:
+
+    item = json.loads(item)
+    doc = Document.from_json(item['doc'])
+
+    return doc.get_model_by_id(item['root_id'])
+
+
+def assert_sources_equal(a: dict, b: dict) -> None:
+
+    assert set(a) == set(b)
+    for key in a:
+        assert len(a[key]) == len(b[key])
+        for va, vb in zip(a[key], b[key]):
+            assert numpy.allclose(numpy.asarray(va, dtype=float), numpy.asarray(vb, dtype=float))
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'cscale': 'log', 'revz': True}, {'cscale': 'symlog', 'linthresh': 0.5}])
+def test_matches_direct_construction(kwargs):
+
+    rng = numpy.random.default_rng(0)
+    factory = ColourMapLPFactory(cmheight=300, cmwidth=300, **kwargs)
+
+    for n, (nx, ny, nz) in enumerate([(5, 4, 3), (8, 6, 2)]):
+
+        x, y, z = numpy.linspace(0, 2, nx), numpy.linspace(3, 1, ny), numpy.arange(nz) + 10.0
+        dm = rng.random((nz, ny, nx)) + 0.1
+
+        plot = embed(factory.get_json(x, y, z, dm, title='Plot ' + str(n)))
+        ref = ColourMapLP(x, y, z, dm, cmheight=300, cmwidth=300, dmlab='Plot ' + str(n), **kwargs)
+
+        cm, cmref = plot.cmplot, ref.cmplot
+        for src, srcref in [(cm.datasrc, cmref.datasrc), (cm.mmsrc, cmref.mmsrc), (plot.lpds, ref.lpds)]:
+            assert_sources_equal(src.data, srcref.data)
+
+        assert cm.plot.title.text == cmref.plot.title.text
+        assert (cm.cmap.low, cm.cmap.high) == pytest.approx((cmref.cmap.low, cmref.cmap.high))
+        for r, rref in [(cm.plot.x_range, cmref.plot.x_range), (cm.plot.y_range, cmref.plot.y_range),
+                        (plot.lplot.y_range, ref.lplot.y_range)]:
+            assert (r.start, r.end) == pytest.approx((rref.start, rref.end))
+
+        for renderer, rref in [(cm.plot.renderers[0], cmref.plot.renderers[0]),
+                               (cm.plot.renderers[-1], cmref.plot.renderers[-1])]:
+            assert type(renderer.glyph) is type(rref.glyph)
+            for attr, val in rref.glyph.properties_with_values(include_defaults=False).items():
+                if attr not in ['data_source', 'color_mapper']:
+                    assert getattr(renderer.glyph, attr) == val
+
+        assert cm.cjs_slider.args['title_root'] == 'Plot ' + str(n)
+
+
+def test_single_coordinate_axes():
+
+    factory = ColourMapLPFactory()
+
+    with pytest.raises(ValueError):
+        factory.get_json(numpy.arange(1.0), numpy.arange(3.0), numpy.arange(2.0), numpy.ones((2, 3, 1)))
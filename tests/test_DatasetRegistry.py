@@ -0,0 +1,115 @@
+"""
+Tests for the shared datasets of DatasetRegistry and their cached statistics
+"""
+
+import numpy
+import pytest
+
+import bokcolmaps.SharedDataset
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.DatasetRegistry import DatasetRegistry
+from bokcolmaps.get_slice_min_max import get_slice_min_max
+
+
+def _loader(offset: float=0) -> callable:
+
+    def load():
+        x = numpy.arange(6.0)
+        y = numpy.arange(5.0)
+        z = numpy.arange(4.0)
+        return x, y, z, numpy.arange(120.0).reshape(4, 5, 6) + offset
+
+    return load
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+
+    DatasetRegistry.clear()
+    yield
+    DatasetRegistry.clear()
+
+
+def test_read_only_views():
+
+    ds = DatasetRegistry.get('cube', _loader())
+
+    assert DatasetRegistry.get('cube', _loader(1)) is ds  # Loader only called once
+
+    for a in (ds.x, ds.y, ds.z, ds.dm, ds.dmflat, ds.get_projection('max')):
+        assert not a.flags.writeable
+        with pytest.raises(ValueError):
+            a[0] = 0
+
+    assert numpy.shares_memory(ds.dm, ds.dmflat)
+
+    hists = ds.get_slice_histograms([0] * 4, [120] * 4, 8)
+    assert not hists.flags.writeable
+    assert ds.get_slice_histograms([0] * 4, [120] * 4, 8) is hists
+
+    # Limits are copies, so modifying them does not change the cache
+
+    minvals, maxvals = ds.get_slice_min_max(0)
+    minvals[0] = -1
+    assert ds.get_slice_min_max(0)[0][0] == 0
+
+
+def test_cached_limits(monkeypatch):
+
+    ds = DatasetRegistry.get('cube', _loader())
+
+    calls = []
+
+    def counted(*args, **kwargs):
+        calls.append(kwargs['mode'])
+        return get_slice_min_max(*args, **kwargs)
+
+    monkeypatch.setattr(bokcolmaps.SharedDataset, 'get_slice_min_max', counted)
+
+    # Any read-only contiguous view of the whole buffer finds the dataset
+
+    assert DatasetRegistry.find(ds.dm) is ds
+    assert DatasetRegistry.find(ds.dmflat) is ds
+    assert DatasetRegistry.find(ds.dm.reshape(20, 6)) is ds
+
+    cm1 = ColourMap(ds.x, ds.y, ds.z, ds.dm)
+    cm2 = ColourMap(ds.x, ds.y, ds.z, ds.dm)
+    cm3 = ColourMap(ds.x, ds.y, ds.z, ds.dm, autoscale='global')
+
+    assert calls == ['slice', 'global']  # Once per set of parameters
+
+    expected = get_slice_min_max(ds.dm, cm1._cbdelta)
+    for cm in (cm1, cm2):
+        assert numpy.array_equal(cm.mmsrc.data['minvals'], expected[0])
+        assert numpy.array_equal(cm.mmsrc.data['maxvals'], expected[1])
+    assert numpy.all(cm3.mmsrc.data['minvals'] == expected[0][0])
+
+
+def test_no_stale_entries():
+
+    ds = DatasetRegistry.get('cube', _loader())
+
+    # Arrays with the same values or parts of the buffer are not the dataset
+
+    copy = ds.dm.copy()
+    assert DatasetRegistry.find(copy) is None
+    copy.setflags(write=False)
+    assert DatasetRegistry.find(copy) is None
+
+    assert DatasetRegistry.find(ds.dm[1:]) is None
+    assert DatasetRegistry.find(ds.dm[:, :, ::-1]) is None
+    assert DatasetRegistry.find(ds.dm.astype(numpy.float32)) is None
+
+    # A replaced dataset is not found, and its limits are not reused
+
+    DatasetRegistry.remove('cube')
+    assert DatasetRegistry.find(ds.dm) is None
+
+    ds2 = DatasetRegistry.get('cube', _loader(1000))
+    assert ds2 is not ds
+    assert DatasetRegistry.find(ds2.dm) is ds2
+
+    cm = ColourMap(ds2.x, ds2.y, ds2.z, ds2.dm)
+    assert numpy.array_equal(cm.mmsrc.data['minvals'], get_slice_min_max(ds2.dm, cm._cbdelta)[0])
+    assert cm.mmsrc.data['minvals'][0] >= 1000
@@ -0,0 +1,63 @@
+"""
+Tests for the cache keys and eviction of DocumentCache
+"""
+
+import os
+
+import numpy
+
+from bokeh.models import Range1d
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.DocumentCache import DocumentCache
+
+
+def test_keys():
+
+    a = numpy.arange(24.0).reshape(4, 6)
+
+    assert DocumentCache.get_key(a, cscale='log') == DocumentCache.get_key(a.copy(), cscale='log')
+    assert DocumentCache.get_key(a.T) == DocumentCache.get_key(numpy.ascontiguousarray(a.T))
+    assert DocumentCache.get_key(a) != DocumentCache.get_key(a.astype(numpy.float32))
+    assert DocumentCache.get_key(a, cscale='log') != DocumentCache.get_key(a, cscale='linear')
+
+    # Models by property values, not by id
+
+    assert DocumentCache.get_key(a, xran=Range1d(0, 5)) == DocumentCache.get_key(a, xran=Range1d(0, 5))
+    assert DocumentCache.get_key(a, xran=Range1d(0, 5)) != DocumentCache.get_key(a, xran=Range1d(0, 6))
+
+
+def test_get_document(tmp_path):
+
+    cache = DocumentCache(str(tmp_path))
+    builds = []
+
+    def build(*args, **kwargs):
+        builds.append(args)
+        return ColourMap(*args, **kwargs)
+
+    c = numpy.arange(3.0)
+    dm = numpy.random.default_rng(0).random((3, 3, 3))
+
+    doc = cache.get_document(build, c, c, c, dm, fmt='json', xran=Range1d(0, 2))
+    assert cache.get_document(build, c, c, c, dm.copy(), fmt='json', xran=Range1d(0, 2)) == doc
+    assert len(builds) == 1
+
+    cache.get_document(build, c, c, c, dm * 2, fmt='json')
+    assert len(builds) == 2
+
+
+def test_eviction(tmp_path):
+
+    cache = DocumentCache(str(tmp_path), max_bytes=250)
+
+    for n, key in enumerate(['a', 'b', 'c']):
+        cache.put(key, 'x' * 100)
+        os.utime(os.path.join(str(tmp_path), key + '.html'), (n, n))  # Distinct use times
+
+    cache.put('d', 'x' * 100)
+
+    assert cache.get('a') is None
+    assert cache.get('b') is None
+    assert cache.get('d') is not None
+    assert cache.get_size() <= 250
@@ -0,0 +1,125 @@
+"""
+Tests for the frame coalescing of FrameIngestor
+"""
+
+import numpy
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.FrameIngestor import FrameIngestor
+
+
+class FakeDoc:
+
+    def __init__(self) -> None:
+
+        self.callbacks = []
+
+    def add_next_tick_callback(self, callback) -> None:
+
+        self.callbacks.append(callback)
+
+    def run(self) -> None:
+
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def test_coalesce_per_method():
+
+    calls = []
+
+    def update_a(v):
+        calls.append(('a', v))
+
+    def update_b(v):
+        calls.append(('b', v))
+
+    doc = FakeDoc()
+    ingestor = FrameIngestor(doc)
+
+    assert not ingestor.submit(update_a, 1)
+    assert ingestor.submit(update_a, 2)
+    assert not ingestor.submit(update_b, 3)
+    assert ingestor.submit(update_a, 4)
+    assert len(doc.callbacks) == 1
+
+    doc.run()
+
+    assert calls == [('a', 4), ('b', 3)]
+    assert ingestor.get_stats() == {'submitted': 4, 'dropped': 2, 'applied': 2,
+                                    'failed': 0, 'queue_depth': 0}
+
+
+class Plot:
+
+    def __init__(self) -> None:
+
+        self.images = []
+
+    def update_image(self, zind) -> None:
+
+        self.images.append(zind)
+
+
+def test_interleaved_plots():
+
+    plots = [Plot(), Plot()]
+
+    doc = FakeDoc()
+    ingestor = FrameIngestor(doc)
+    for n in range(10):
+        for plot in plots:
+            ingestor.submit(plot.update_image, n)
+
+    assert ingestor.queue_depth == 2  # One pending frame per plot
+
+    doc.run()
+
+    assert [plot.images for plot in plots] == [[9], [9]]
+    assert ingestor.get_stats()['dropped'] == 18
+
+
+def test_failed_frame_does_not_stop_others():
+
+    calls = []
+
+    def fail():
+        raise RuntimeError('fail')
+
+    doc = FakeDoc()
+    ingestor = FrameIngestor(doc)
+    ingestor.submit(fail)
+    ingestor.submit(calls.append, 1)
+
+    doc.run()
+
+    assert calls == [1]
+    stats = ingestor.get_stats()
+    assert (stats['applied'], stats['failed']) == (1, 1)
+
+
+def test_appends_merged():
+
+    rng = numpy.random.default_rng(0)
+    x, y, z = numpy.arange(6.0), numpy.arange(4.0), numpy.arange(5.0)
+    dm = rng.random((5, 4, 6))
+    new = rng.random((3, 4, 6))
+
+    cm = ColourMap(x, y, z, dm)
+    ref = ColourMap(x, y, z, dm)
+
+    doc = FakeDoc()
+    ingestor = FrameIngestor(doc)
+    ingestor.submit(cm.append_slice, new[0], 5.0)
+    assert not ingestor.submit(cm.append_slice, new[1:], numpy.array([6.0, 7.0]))
+
+    doc.run()
+
+    for n in range(3):
+        ref.append_slice(new[n], 5.0 + n)
+
+    assert numpy.array_equal(cm.get_dm(), ref.get_dm())
+    assert numpy.array_equal(cm.datasrc.data['z'][0], ref.datasrc.data['z'][0])
+    stats = ingestor.get_stats()
+    assert (stats['dropped'], stats['applied']) == (0, 2)
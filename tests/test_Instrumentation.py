@@ -0,0 +1,82 @@
+"""
+Tests for the Instrumentation registry and timers
+"""
+
+import pytest
+
+from bokcolmaps.Instrumentation import Instrumentation
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+
+    Instrumentation.reset()
+    yield
+    Instrumentation.disable()
+    Instrumentation.reset()
+
+
+def test_disabled_by_default():
+
+    assert not Instrumentation.is_enabled()
+
+    with Instrumentation.timer('event'):
+        pass
+
+    assert Instrumentation.get_counters() == {}
+
+
+def test_record_and_hooks():
+
+    calls = []
+
+    def hook(event, duration, nbytes):
+        calls.append((event, duration, nbytes))
+
+    Instrumentation.add_hook(hook)
+    try:
+        Instrumentation.record('event', 0.5, 10)
+        Instrumentation.record('event', 0.25, 6)
+    finally:
+        Instrumentation.remove_hook(hook)
+    Instrumentation.record('event', 0.125)
+
+    assert calls == [('event', 0.5, 10), ('event', 0.25, 6)]
+    assert Instrumentation.get_counters() == {'event': {'calls': 3, 'total_s': 0.875, 'max_s': 0.5, 'bytes': 16}}
+
+    counters = Instrumentation.get_counters()
+    counters['event']['calls'] = 0
+    assert Instrumentation.get_counters()['event']['calls'] == 3
+
+    Instrumentation.reset()
+    assert Instrumentation.get_counters() == {}
+
+
+def test_nested_timers():
+
+    Instrumentation.enable()
+
+    with Instrumentation.timer('outer') as outer:
+        with Instrumentation.timer('inner', 4):
+            pass
+        with Instrumentation.timer('inner') as inner:
+            inner.nbytes = 8
+        outer.nbytes = 2
+
+    counters = Instrumentation.get_counters()
+    assert counters['outer']['calls'] == 1
+    assert counters['outer']['bytes'] == 2
+    assert counters['inner']['calls'] == 2
+    assert counters['inner']['bytes'] == 12
+    assert counters['outer']['total_s'] >= counters['inner']['total_s']
+
+
+def test_timer_records_on_exception():
+
+    Instrumentation.enable()
+
+    with pytest.raises(RuntimeError):
+        with Instrumentation.timer('event'):
+            raise RuntimeError('fail')
+
+    assert Instrumentation.get_counters()['event']['calls'] == 1
@@ -0,0 +1,98 @@
+"""
+Tests for the slider throttling and preview of SpotPlot (via SpotPlotSlider)
+"""
+
+import numpy
+import pytest
+
+from bokeh.document import Document
+
+from bokcolmaps.SpotPlotSlider import SpotPlotSlider
+from bokcolmaps.get_slice_min_max import get_slice_min_max
+
+
+def _spot_plot_slider(**kwargs: dict) -> SpotPlotSlider:
+
+    x = numpy.arange(5.0)
+    y = numpy.arange(5.0)
+    z = numpy.arange(4.0)
+    dm = numpy.arange(20.0).reshape(4, 5) * numpy.array([[1], [2], [3], [4]])
+
+    return SpotPlotSlider(x, y, z, dm, **kwargs)
+
+
+def test_unthrottled():
+
+    sps = _spot_plot_slider()
+
+    sps.zslider.value = 2
+    assert sps.splot._zind == 2
+    assert sps.splot.mmsrc is None
+
+
+def test_release():
+
+    sps = _spot_plot_slider(throttle='release')
+
+    sps.zslider.value = 2
+    assert sps.splot._zind == 0  # Preview only
+
+    sps.zslider.trigger('value_throttled', 0, 2)  # As sent by the browser
+    assert sps.splot._zind == 2
+
+
+def test_debounce():
+
+    # Without a document (standalone use) the update is immediate
+
+    sps = _spot_plot_slider(throttle=100)
+    sps.zslider.value = 2
+    assert sps.splot._zind == 2
+
+    # Otherwise only the last value is updated, after the delay
+
+    sps = _spot_plot_slider(throttle=100)
+    doc = Document()
+    doc.add_root(sps)
+
+    sps.zslider.value = 1
+    sps.zslider.value = 3
+    assert sps.splot._zind == 0
+
+    pending = doc.session_callbacks
+    assert len(pending) == 1
+    assert pending[0].timeout == 100
+
+    pending[0].callback()
+    assert sps.splot._zind == 3
+    assert sps.splot._zcallback is None
+
+    # The final (released) value cancels any pending update
+
+    sps.zslider.value = 1
+    sps.zslider.trigger('value_throttled', 3, 1)
+    assert sps.splot._zind == 1
+    assert len(doc.session_callbacks) == 0
+
+    with pytest.raises(ValueError):
+        _spot_plot_slider(throttle=-1)
+
+
+def test_preview():
+
+    sps = _spot_plot_slider(throttle='release')
+    splot = sps.splot
+
+    minvals, maxvals = get_slice_min_max(splot.datasrc.data['dm'][0].reshape(4, 1, 5), splot._cbdelta)
+    assert numpy.allclose(splot.mmsrc.data['minvals'], minvals)
+    assert numpy.allclose(splot.mmsrc.data['maxvals'], maxvals)
+
+    callback, = sps.zslider.js_property_callbacks['change:value']
+    assert callback.args['mmsrc'] is splot.mmsrc
+    assert callback.args['cmap'] is splot.cmap
+    assert callback.args['title'] is splot.plot.title
+
+    # Without autoscaling the preview leaves the colour scale limits alone
+
+    sps = _spot_plot_slider(throttle='release', rmin=0, rmax=10)
+    assert sps.splot.mmsrc.data == {'minvals': [], 'maxvals': []}
@@ -0,0 +1,78 @@
+"""
+Tests for ThreadSafeUpdater call ordering and document holds
+"""
+
+import numpy
+
+from bokeh.document import Document
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.ThreadSafeUpdater import ThreadSafeUpdater
+
+
+def make_cmap() -> ColourMap:
+
+    rng = numpy.random.default_rng(0)
+
+    return ColourMap(numpy.arange(6.0), numpy.arange(4.0), numpy.arange(5.0), rng.random((5, 4, 6)))
+
+
+def run_callbacks(doc: Document) -> None:
+
+    for callback in list(doc.session_callbacks):
+        doc.remove_next_tick_callback(callback)
+        callback.callback()
+
+
+class FakePlot:
+
+    def __init__(self) -> None:
+
+        self.document = Document()
+        self.calls = []
+
+    def update_image(self, *args) -> None:
+
+        self.calls.append(('image', args))
+
+    def update_title(self, *args) -> None:
+
+        self.calls.append(('title', args))
+
+
+def test_calls_coalesced_per_method():
+
+    plot = FakePlot()
+    doc = plot.document
+
+    updater = ThreadSafeUpdater(plot)
+    updater.update_image(1)
+    updater.update_title(2)
+    updater.update_image(3)
+    updater.update_image(4)
+    run_callbacks(doc)
+
+    assert plot.calls == [('image', (4,)), ('title', (2,))]
+
+
+def test_caller_hold_kept():
+
+    cm = make_cmap()
+    doc = Document()
+    doc.add_root(cm)
+
+    updater = ThreadSafeUpdater(cm, doc)
+    updater.append_slice(numpy.ones((4, 6)), 5.0)
+    updater.append_slice(numpy.zeros((4, 6)), 6.0)
+
+    doc.hold('collect')
+    run_callbacks(doc)
+    assert doc.callbacks.hold_value == 'collect'
+    doc.unhold()
+
+    assert numpy.array_equal(cm.get_dm().reshape(5, 4, 6)[:2], numpy.stack([numpy.ones((4, 6)), numpy.zeros((4, 6))]))
+    assert updater.get_stats()['applied'] == 2
+
+    updater.update_image(0)
+    run_callbacks(doc)
+    assert doc.callbacks.hold_value is None
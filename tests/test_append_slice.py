@@ -0,0 +1,96 @@
+"""
+Tests for the ring buffer append_slice of ColourMap, SpotPlot and their
+line plot classes
+"""
+
+import numpy
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.ColourMapLP import ColourMapLP
+from bokcolmaps.SpotPlotLP import SpotPlotLP
+
+
+def make_data(nz: int=5, ny: int=4, nx: int=6) -> tuple:
+
+    rng = numpy.random.default_rng(0)
+
+    return numpy.arange(nx, dtype=float), numpy.arange(ny, dtype=float), \
+        numpy.arange(nz, dtype=float), rng.random((nz, ny, nx))
+
+
+def test_ring_buffer_contents():
+
+    x, y, z, dm = make_data()
+    dm0 = dm.copy()
+    cm = ColourMap(x, y, z, dm)
+
+    new = numpy.random.default_rng(1).random((3, y.size, x.size))
+    for n in range(3):
+        zind = cm.append_slice(new[n], 5.0 + n)
+
+    assert zind == 2
+    assert numpy.array_equal(dm, dm0)  # Not modified
+    buf = cm.get_dm().reshape(dm.shape)
+    assert numpy.array_equal(buf[:3], new)
+    assert numpy.array_equal(buf[3:], dm[3:])
+    assert numpy.array_equal(cm.datasrc.data['z'][0], [5, 6, 7, 3, 4])
+    assert numpy.allclose(cm.mmsrc.data['minvals'], buf.reshape(5, -1).min(axis=1))
+    assert numpy.allclose(cm.mmsrc.data['maxvals'], buf.reshape(5, -1).max(axis=1))
+
+
+def test_ring_buffer_several_slices_wrap():
+
+    x, y, z, dm = make_data()
+    cm = ColourMap(x, y, z, dm, dmserver=True)
+
+    new = numpy.random.default_rng(2).random((7, y.size, x.size))
+    cm.append_slice(new[:4], numpy.arange(5, 9.0))
+    zind = cm.append_slice(new[4:], numpy.arange(9, 12.0))
+
+    # Slots 0 to 4 hold z = 10, 11, 7, 8, 9
+    assert zind == 1
+    assert numpy.array_equal(cm.datasrc.data['z'][0], [10, 11, 7, 8, 9])
+    assert numpy.array_equal(cm.get_dm().reshape(dm.shape), new[[5, 6, 2, 3, 4]])
+
+
+def check_profile(lpds: dict, zvals: numpy.ndarray, profile: numpy.ndarray) -> None:
+
+    assert numpy.all(numpy.diff(lpds['y']) > 0)
+    assert numpy.array_equal(lpds['y'], zvals)
+    assert numpy.array_equal(lpds['x'], profile)
+
+
+def test_lp_profile_time_order():
+
+    for dmserver in [False, True]:
+
+        x, y, z, dm = make_data()
+        cmlp = ColourMapLP(x, y, z, dm, dmserver=dmserver)
+
+        new = numpy.random.default_rng(3).random((3, y.size, x.size))
+        for n in range(3):
+            cmlp.append_slice(new[n], 5.0 + n)
+
+        xi, yi = cmlp._lpind % x.size, cmlp._lpind // x.size
+        ref = numpy.concatenate((dm[3:], new))  # Oldest to newest
+        check_profile(cmlp.lpds.data, numpy.arange(3, 8.0), ref[:, yi, xi])
+        assert numpy.array_equal(cmlp.lpds.data['slot'], [3, 4, 0, 1, 2])
+
+        cmlp._set_profile(1, 2)  # e.g. server side hover
+        check_profile(cmlp.lpds.data, numpy.arange(3, 8.0), ref[:, 2, 1])
+
+
+def test_spot_lp_profile_time_order():
+
+    rng = numpy.random.default_rng(4)
+    x, y = rng.random(8), rng.random(8)
+    z = numpy.arange(5, dtype=float)
+    dm = rng.random((5, 8))
+    splp = SpotPlotLP(x, y, z, dm)
+
+    new = rng.random((3, 8))
+    splp.append_slice(new[:2], numpy.array([5.0, 6.0]))
+    splp.append_slice(new[2], 7.0)
+
+    ref = numpy.concatenate((dm[3:], new))
+    check_profile(splp.lpds.data, numpy.arange(3, 8.0), ref[:, splp._lpind])
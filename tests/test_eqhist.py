@@ -0,0 +1,47 @@
+"""
+Tests for the slice histograms and palette indices of the histogram
+equalised colour scale
+"""
+
+import numpy
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.get_slice_histograms import get_slice_histograms
+
+
+def test_slice_histograms():
+
+    dm = numpy.random.default_rng(0).random((3, 20, 30))
+    dm[1, 2, 3] = numpy.nan
+    minvals, maxvals = [0.1, 0.0, 0.2], [0.9, 1.0, 0.5]
+
+    hists = get_slice_histograms(dm, minvals, maxvals, 16, chunk_size=1000)
+
+    for d, lo, hi, h in zip(dm, minvals, maxvals, hists):
+        d = numpy.clip(d[numpy.isfinite(d)], lo, hi)  # Outside values in the end bins
+        ref, _ = numpy.histogram(d, bins=16, range=(lo, hi))
+        assert numpy.array_equal(h, ref)
+
+
+def test_palette_indices():
+
+    rng = numpy.random.default_rng(0)
+    dm = rng.exponential(size=(2, 60, 80))  # Skewed, so far from linear
+
+    cm = ColourMap(numpy.arange(80.0), numpy.arange(60.0), numpy.arange(2.0), dm, cscale='eqhist')
+    ncols = len(cm._palette)
+
+    for zind in range(2):
+        d = dm[zind]
+        lo, hi = cm.mmsrc.data['minvals'][zind], cm.mmsrc.data['maxvals'][zind]
+        hist, _ = numpy.histogram(d, bins=1024, range=(lo, hi))
+        cdf = (numpy.cumsum(hist) - hist / 2) / hist.sum()
+        ref = numpy.clip(numpy.floor(cdf * ncols), 0, ncols - 1)
+        cinds = numpy.asarray(cm.mmsrc.data['cinds'][zind])
+        assert numpy.array_equal(cinds, ref)
+
+        # Equalised: the pixels are spread evenly over the palette
+
+        bins = numpy.clip(numpy.floor((d - lo) / (hi - lo) * 1024), 0, 1023).astype(int)
+        counts = numpy.bincount(cinds[bins].ravel(), minlength=ncols).reshape(16, -1).sum(axis=1)
+        assert counts.max() < 1.5 * counts.min()
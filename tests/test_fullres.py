@@ -0,0 +1,46 @@
+"""
+Tests for the full resolution hover tiles of ColourMap
+"""
+
+import numpy
+import pytest
+
+from bokeh.models import HoverTool
+
+from bokcolmaps.ColourMap import ColourMap
+
+
+def test_tile_request():
+
+    xf, yf = numpy.arange(80.0), numpy.arange(70.0)
+    dmf = numpy.random.default_rng(0).random((2, 70, 80))
+    x, y = xf[::8], yf[::7]
+
+    cm = ColourMap(x, y, numpy.arange(2.0), dmf[:, ::7, ::8], fullres=(xf, yf, dmf))
+    cm.reqsrc.data = {'key': ['1,2,1']}
+
+    assert cm.tilesrc.data['key'] == ['1,2,1']
+    assert cm.tilesrc.data['tw'] == [32]
+    assert numpy.array_equal(cm.tilesrc.data['tile'][0], dmf[1, 64:70, 32:64].ravel())
+
+    with pytest.raises(ValueError):
+        ColourMap(x, y, numpy.arange(2.0), dmf[:, ::7, ::8], fullres=(xf, yf, dmf[:, :, :-1]))
+
+
+def test_hover():
+
+    xf, yf = numpy.arange(80.0), numpy.arange(70.0)
+    dmf = numpy.random.default_rng(0).random((2, 70, 80))
+
+    cm = ColourMap(xf[::8], yf[::7], numpy.arange(2.0), dmf[:, ::7, ::8], fullres=(xf, yf, dmf))
+    assert not cm._server_slices  # cjs_slider also sets the displayed slice index
+
+    htool, = [t for t in cm.plot.tools if isinstance(t, HoverTool)]
+    assert htool.callback.args['reqsrc'] is cm.reqsrc
+    assert htool.callback.args['tilesrc'] is cm.tilesrc
+
+    cm.update_image(1)
+    assert cm.datasrc.data['zi'] == [1]
+
+    with pytest.raises(ValueError):
+        cm.set_data(dmf[:, ::7, ::8])
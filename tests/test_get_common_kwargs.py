@@ -0,0 +1,27 @@
+"""
+Tests for get_common_kwargs and get_output_backend
+"""
+
+import numpy
+import pytest
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.get_common_kwargs import get_common_kwargs
+from bokcolmaps.get_output_backend import get_output_backend
+
+
+def test_common_kwargs_unchanged():
+
+    assert len(get_common_kwargs(output_backend='webgl')) == 13
+
+
+def test_output_backend():
+
+    assert get_output_backend() == 'canvas'
+    assert get_output_backend(output_backend='webgl') == 'webgl'
+    with pytest.raises(ValueError):
+        get_output_backend(output_backend='gl')
+
+    c = numpy.arange(2, dtype=float)
+    cm = ColourMap(c, c, c, numpy.ones((2, 2, 2)), output_backend='svg')
+    assert cm.plot.output_backend == 'svg'
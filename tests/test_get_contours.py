@@ -0,0 +1,74 @@
+"""
+Tests for the marching-squares contours of get_contours and ColourMap
+"""
+
+import numpy
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.get_contours import get_contours
+
+
+def test_linear_field():
+
+    x, y = numpy.linspace(0, 4, 9), numpy.linspace(-1, 2, 7)
+    d = 0.7 * x[None, :] - 1.3 * y[:, None]
+    levels = [-1.0, 0.25, 2.0]
+
+    xs, ys = get_contours(x, y, d, levels)
+
+    for level, lx, ly in zip(levels, xs, ys):
+        fin = numpy.isfinite(lx)
+        assert fin.sum() > 0
+        assert numpy.allclose(0.7 * lx[fin] - 1.3 * ly[fin], level)
+
+
+def test_points_interpolate_to_level():
+
+    x, y = numpy.arange(12.0), numpy.arange(10.0)
+    d = numpy.random.default_rng(0).random((10, 12))
+
+    xs, ys = get_contours(x, y, d, [0.5])
+    lx, ly = xs[0], ys[0]
+    fin = numpy.isfinite(lx)
+    assert fin.sum() > 0
+
+    # Every point is on a grid line, where d is interpolated linearly
+
+    for px, py in zip(lx[fin], ly[fin]):
+        if numpy.isclose(px, numpy.round(px)):
+            v = numpy.interp(py, y, d[:, int(numpy.round(px))])
+        else:
+            v = numpy.interp(px, x, d[int(numpy.round(py)), :])
+        assert numpy.isclose(v, 0.5)
+
+
+def test_colourmap_contours():
+
+    x, y, z = numpy.arange(8.0), numpy.arange(6.0), numpy.arange(3.0)
+    dm = numpy.random.default_rng(1).random((3, 6, 8))
+
+    cm = ColourMap(x, y, z, dm, contours=[0.3, 0.6])
+    assert cm._server_slices
+    cm.update_image(2)
+
+    xs, ys = get_contours(x, y, dm[2], [0.3, 0.6])
+    for a, b in zip(cm.ctsrc.data['xs'] + cm.ctsrc.data['ys'], xs + ys):
+        assert numpy.array_equal(a, b, equal_nan=True)
+
+
+def test_contours_after_set_data():
+
+    x, y, z = numpy.arange(8.0), numpy.arange(6.0), numpy.arange(3.0)
+    rng = numpy.random.default_rng(1)
+    dm, new = rng.random((3, 6, 8)), rng.random((3, 6, 8))
+
+    cm = ColourMap(x, y, z, dm, contours=[0.5])
+    cm.update_image(1)
+    cm.set_data(new)  # Cached lines invalidated
+
+    xs, ys = get_contours(x, y, new[1], [0.5])
+    for a, b in zip(cm.ctsrc.data['xs'] + cm.ctsrc.data['ys'], xs + ys):
+        assert numpy.array_equal(a, b, equal_nan=True)
+
+    cm.set_contours([0.2, 0.8])
+    assert cm.ctsrc.data['level'] == [0.2, 0.8]
@@ -0,0 +1,149 @@
+"""
+Tests for get_percentile_min_max and the percentile mode of get_slice_min_max
+"""
+
+import tracemalloc
+
+import numpy
+
+from bokcolmaps.get_percentile_min_max import get_percentile_min_max, parse_percentile
+from bokcolmaps.get_slice_min_max import get_slice_min_max
+
+
+def test_exact_below_max_samples():
+
+    d = numpy.random.default_rng(1).normal(size=(50, 40))
+    d[3, 4] = numpy.nan
+
+    min_val, max_val = get_percentile_min_max(d, 0.01, 1, 99)
+
+    assert numpy.allclose([min_val, max_val], numpy.nanpercentile(d, [1, 99]))
+
+
+def test_stratified_sample_close_to_exact():
+
+    d = numpy.random.default_rng(2).random(2**20)
+
+    min_val, max_val = get_percentile_min_max(d, 0.01, 5, 95, max_samples=2**14, chunk_size=2**16)
+
+    ref = numpy.percentile(d, [5, 95])
+    assert abs(min_val - ref[0]) < 0.02
+    assert abs(max_val - ref[1]) < 0.02
+
+
+def test_positive_matches_masked_reference():
+
+    d = numpy.random.default_rng(3).normal(size=2**20)
+
+    min_val, max_val = get_percentile_min_max(d, 0.01, 10, 90, max_samples=2**14, chunk_size=2**16,
+                                              positive=True)
+
+    ref = numpy.percentile(d[d > 0], [10, 90])
+    assert min_val > 0
+    assert abs(min_val - ref[0]) < 0.05
+    assert abs(max_val - ref[1]) < 0.05
+
+    exact = get_percentile_min_max(d[:1000], 0.01, 10, 90, positive=True)
+    assert numpy.allclose(exact, numpy.percentile(d[:1000][d[:1000] > 0], [10, 90]))
+
+
+def test_strided_view_not_copied():
+
+    dm = numpy.random.default_rng(5).random((64, 128, 256))
+    section = dm[:, 7, :]  # Strided (as for ColourMapOrtho)
+    big = dm[:, ::2, :]
+
+    tracemalloc.start()
+    min_val, max_val = get_percentile_min_max(big, 0.01, 5, 95, max_samples=2**12, chunk_size=2**14)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert peak < big.nbytes / 10
+    assert abs(min_val - 0.05) < 0.03
+    assert abs(max_val - 0.95) < 0.03
+
+    assert numpy.allclose(get_percentile_min_max(section, 0.01, 5, 95), numpy.percentile(section, [5, 95]))
+
+
+def test_pooled_list():
+
+    dm = numpy.random.default_rng(6).normal(size=(4, 10, 12))
+
+    pooled = get_percentile_min_max([dm[0], dm[2], dm[3]], 0.01, 5, 95)
+    assert numpy.allclose(pooled, numpy.percentile(dm[[0, 2, 3]], [5, 95]))
+
+    pooled = get_percentile_min_max([dm[0], dm[2], dm[3]], 0.01, 5, 95, max_samples=200, chunk_size=50)
+    ref = numpy.percentile(dm[[0, 2, 3]], [5, 95])
+    assert numpy.allclose(pooled, ref, atol=0.5)
+
+
+def test_positive_no_values():
+
+    assert get_percentile_min_max(-numpy.ones(10), 0.5, 1, 99, positive=True) == (1, 1.5)
+
+
+def test_equal_values_offset():
+
+    assert get_percentile_min_max(numpy.full(10, 2.0), 0.5, 1, 99) == (2.0, 2.5)
+
+
+def test_slice_min_max_percentiles():
+
+    dm = numpy.random.default_rng(4).normal(size=(3, 20, 30))
+
+    minvals, maxvals = get_slice_min_max(dm, 0.01, plims=(2, 98))
+    ref = numpy.percentile(dm.reshape(3, -1), [2, 98], axis=1)
+    assert numpy.allclose(minvals, ref[0])
+    assert numpy.allclose(maxvals, ref[1])
+
+    minvals, maxvals = get_slice_min_max(dm, 0.01, plims=(2, 98), positive=True)
+    for zind in range(3):
+        d = dm[zind][dm[zind] > 0]
+        assert numpy.allclose([minvals[zind], maxvals[zind]], numpy.percentile(d, [2, 98]))
+
+
+def test_parse_percentile():
+
+    assert parse_percentile('99%') == 99
+    assert parse_percentile(5) is None
+
+
+def test_empty_slices_ignored_when_combined():
+
+    dm = numpy.random.default_rng(7).random((5, 6, 7)) + 2
+    dm[1] = numpy.nan
+    dm[3] = -1  # No positive values
+
+    for plims in [None, (0, 100)]:
+
+        minvals, maxvals = get_slice_min_max(dm, 0.01, mode='global', plims=plims, positive=True)
+        valid = dm[[0, 2, 4]]
+        assert numpy.allclose(minvals, valid.min())
+        assert numpy.allclose(maxvals, valid.max())
+
+        minvals, maxvals = get_slice_min_max(dm, 0.01, mode='window:3', plims=plims, positive=True)
+        for zind in range(5):
+            window = [z for z in range(max(zind - 1, 0), min(zind + 2, 5)) if z in [0, 2, 4]]
+            assert numpy.isclose(minvals[zind], dm[window].min())
+            assert numpy.isclose(maxvals[zind], dm[window].max())
+
+        minvals, maxvals = get_slice_min_max(dm, 0.01, plims=plims, positive=True)
+        assert (minvals[1], maxvals[1]) == (1, 1.01)  # Empty slice fixed up for log scaling
+        assert (minvals[3], maxvals[3]) == (1, 1.01)
+
+
+def test_global_and_window_modes():
+
+    dm = numpy.random.default_rng(8).normal(size=(6, 5, 4))
+    dm[2, 1, 1] = numpy.nan
+    sl = numpy.nanpercentile(dm.reshape(6, -1), [5, 95], axis=1)
+
+    minvals, maxvals = get_slice_min_max(dm, 0.01, mode='global', plims=(5, 95))
+    assert numpy.allclose(minvals, sl[0].min())
+    assert numpy.allclose(maxvals, sl[1].max())
+
+    minvals, maxvals = get_slice_min_max(dm, 0.01, mode='window:2')
+    ext = numpy.nanmin(dm.reshape(6, -1), axis=1), numpy.nanmax(dm.reshape(6, -1), axis=1)
+    for zind in range(6):
+        assert numpy.isclose(minvals[zind], ext[0][zind:zind + 2].min())
+        assert numpy.isclose(maxvals[zind], ext[1][zind:zind + 2].max())
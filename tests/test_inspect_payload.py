@@ -0,0 +1,38 @@
+"""
+Tests for the sizes and duplicate buffers reported by inspect_payload
+"""
+
+import numpy
+
+from bokeh.models import ColumnDataSource, CustomJS
+
+from bokcolmaps.inspect_payload import inspect_payload
+
+
+def test_duplicates_by_buffer():
+
+    a = numpy.arange(24.0).reshape(4, 6)
+
+    # Views of one buffer are duplicates, equal contents in separate buffers
+    # (including empty arrays) are not
+
+    src1 = ColumnDataSource(data={'image': [a], 'zeros': [numpy.zeros((3, 3))], 'empty': [numpy.zeros(0)]})
+    src2 = ColumnDataSource(data={'view': [a[1:3]], 'copy': [a.copy()], 'zeros': [numpy.zeros((3, 3))],
+                                  'empty': [numpy.zeros(0)]})
+
+    report = inspect_payload(CustomJS(args={'src1': src1, 'src2': src2}, code=''))
+
+    assert len(report['duplicates']) == 1
+    assert report['duplicates'][0]['bytes'] == a.nbytes
+    assert sorted(report['duplicates'][0]['columns']) == sorted([src1.id + ':image', src2.id + ':view'])
+
+
+def test_sizes():
+
+    src = ColumnDataSource(data={'small': [numpy.zeros(2)], 'large': [numpy.zeros(1000)]})
+
+    report = inspect_payload(CustomJS(args={'src': src}, code=''))
+
+    assert report['total_bytes'] == sum(r['bytes'] for r in report['models'])
+    assert [r['column'] for r in report['columns']] == ['large', 'small']
+    assert report['duplicates'] == []
@@ -0,0 +1,53 @@
+"""
+Tests for the palette lookup table of palette_to_rgba and the RGBA render
+mode of ColourMap
+"""
+
+import numpy
+import pytest
+
+from bokeh.palettes import Viridis256
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.palette_to_rgba import palette_to_rgba
+
+
+def unpack(lut: numpy.ndarray) -> numpy.ndarray:
+
+    return lut.view(numpy.uint8).reshape(-1, 4)
+
+
+def test_lut():
+
+    lut = palette_to_rgba(['#ff8000', '#10203040', 'Red', (1, 2, 3), (4, 5, 6, 0.5)])
+
+    assert lut.dtype == numpy.uint32
+    assert numpy.array_equal(unpack(lut), [[255, 128, 0, 255], [16, 32, 48, 64], [255, 0, 0, 255],
+                                           [1, 2, 3, 255], [4, 5, 6, 128]])
+
+    ref = [[int(c[j:j + 2], 16) for j in (1, 3, 5)] + [255] for c in Viridis256]
+    assert numpy.array_equal(unpack(palette_to_rgba(Viridis256)), ref)
+
+    with pytest.raises(ValueError):
+        palette_to_rgba(['#12345'])
+    with pytest.raises(ValueError):
+        palette_to_rgba(['NotAColour'])
+
+
+def test_rgba_render():
+
+    x, y, z = numpy.arange(7.0), numpy.arange(5.0), numpy.arange(2.0)
+    dm = numpy.random.default_rng(0).random((2, 5, 7))
+    dm[1, 2, 2] = numpy.nan
+
+    cm = ColourMap(x, y, z, dm, render='rgba', palette=Viridis256, nan_colour='Grey')
+    cm.update_image(1)
+
+    d = dm[1]
+    low, high = cm.cmap.low, cm.cmap.high
+    with numpy.errstate(invalid='ignore'):
+        inds = numpy.clip(numpy.floor((d - low) / (high - low) * 256), 0, 255)
+    ref = palette_to_rgba(Viridis256)[numpy.nan_to_num(inds).astype(int)]
+    ref[numpy.isnan(d)] = palette_to_rgba(['Grey'])[0]
+
+    assert numpy.array_equal(cm.datasrc.data['image'][0], ref)
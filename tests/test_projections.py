@@ -0,0 +1,23 @@
+"""
+Tests for the z projections displayed as extra ColourMap slices
+"""
+
+import numpy
+
+from bokcolmaps.ColourMap import ColourMap
+
+
+def test_projection_slices():
+
+    x, y, z = numpy.arange(6.0), numpy.arange(4.0), numpy.arange(5.0)
+    dm = numpy.random.default_rng(0).random((5, 4, 6))
+
+    cm = ColourMap(x, y, z, dm, projections=['max', 'mean', 'min'])
+    for p, ref in enumerate([dm.max(axis=0), dm.mean(axis=0), dm.min(axis=0)]):
+        cm.update_image(5 + p)
+        assert numpy.allclose(cm.datasrc.data['image'][0], ref)
+        assert numpy.isclose(cm.mmsrc.data['minvals'][5 + p], ref.min())
+        assert numpy.isclose(cm.mmsrc.data['maxvals'][5 + p], ref.max())
+
+    cm = ColourMap(x, y, z, dm, projections=['max'], rmin=0.2, rmax=0.8)
+    assert list(cm.mmsrc.data['minvals']) == [0.2] * 6
@@ -0,0 +1,80 @@
+"""
+Tests for the summed-area table region statistics of ColourMap
+"""
+
+import numpy
+
+from bokeh.events import SelectionGeometry
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.get_summed_area_tables import get_summed_area_tables
+
+
+def reference_stats(x: numpy.array, y: numpy.array, d: numpy.ndarray, x0: float, x1: float,
+                    y0: float, y1: float) -> tuple:
+
+    xin = (x >= min(x0, x1)) & (x <= max(x0, x1))
+    yin = (y >= min(y0, y1)) & (y <= max(y0, y1))
+    r = d[numpy.ix_(yin, xin)]
+    r = r[numpy.isfinite(r)]
+
+    return r.size, r.sum(), (r.mean() if r.size > 0 else numpy.nan), (r.std() if r.size > 0 else numpy.nan)
+
+
+def test_summed_area_tables():
+
+    d = numpy.random.default_rng(0).random((7, 9))
+    d[2, 3] = numpy.nan
+    sat = get_summed_area_tables(d)
+    total, total2, count = sat[:, 5, 7] - sat[:, 1, 7] - sat[:, 5, 2] + sat[:, 1, 2]
+    r = d[1:5, 2:7]
+    r = r[numpy.isfinite(r)]
+    assert count == r.size
+    assert numpy.isclose(total, r.sum())
+    assert numpy.isclose(total2, (r * r).sum())
+
+
+def test_region_stats():
+
+    rng = numpy.random.default_rng(0)
+    dm = rng.random((3, 12, 15))
+    dm[1, 4, 5] = numpy.nan
+    dm[1, 6, :] = numpy.inf
+
+    for x, y in [(numpy.linspace(0, 7, 15), numpy.linspace(-3, 8, 12)),
+                 (numpy.linspace(7, 0, 15), numpy.linspace(8, -3, 12))]:
+        cm = ColourMap(x, y, numpy.arange(3.0), dm)
+        for _ in range(50):
+            x0, x1 = rng.uniform(-1, 8, 2)
+            y0, y1 = rng.uniform(-4, 9, 2)
+            stats = cm.get_region_stats(x0, x1, y0, y1, zind=1)
+            count, total, mean, std = reference_stats(x, y, dm[1], x0, x1, y0, y1)
+            assert stats['count'] == count
+            assert numpy.isclose(stats['sum'], total)
+            assert numpy.allclose([stats['mean'], stats['std']], [mean, std], equal_nan=True)
+
+
+def test_box_stats_readout():
+
+    c = numpy.arange(5.0)
+    cm = ColourMap(c, c, c, numpy.ones((5, 5, 5)), boxstats=True)
+    assert cm.children[-1] is cm.statsdiv
+
+    cm.plot._trigger_event(SelectionGeometry(cm.plot, geometry={'type': 'rect', 'x0': 0, 'x1': 1, 'y0': 0, 'y1': 2}))
+    assert cm.statsdiv.text == 'Count: 6, sum: 6, mean: 1, std: 0'
+
+
+def test_stats_after_set_data():
+
+    c = numpy.arange(5.0)
+    cm = ColourMap(c, c, c, numpy.ones((5, 5, 5)), boxstats=True)
+    assert cm._server_slices
+    assert not ColourMap(c, c, c, numpy.ones((5, 5, 5)))._server_slices
+
+    assert cm.get_region_stats(0, 4, 0, 4)['sum'] == 25
+    cm.set_data(numpy.full((5, 5, 5), 2.0))  # Cached tables invalidated
+    assert cm.get_region_stats(0, 4, 0, 4)['sum'] == 50
+
+    cm.update_image(3)
+    cm.plot._trigger_event(SelectionGeometry(cm.plot, geometry={'type': 'rect', 'x0': 0, 'x1': 1, 'y0': 0, 'y1': 0}))
+    assert cm.statsdiv.text == 'Count: 2, sum: 4, mean: 2, std: 0'
@@ -0,0 +1,64 @@
+"""
+Tests for ColourMap.set_data and the sections of ColourMapOrtho
+"""
+
+import numpy
+import pytest
+
+from bokcolmaps.ColourMap import ColourMap
+from bokcolmaps.ColourMapOrtho import ColourMapOrtho
+
+
+def make_data(nz: int=5, ny: int=4, nx: int=6) -> tuple:
+
+    rng = numpy.random.default_rng(0)
+
+    return numpy.arange(nx, dtype=float), numpy.arange(ny, dtype=float), \
+        numpy.arange(nz, dtype=float), rng.random((nz, ny, nx))
+
+
+def test_set_data_matches_construction():
+
+    x, y, z, dm = make_data()
+    new = numpy.random.default_rng(1).random(dm.shape) * 10
+
+    for kwargs in [{}, {'dmserver': True}, {'cscale': 'eqhist', 'projections': ['max']}]:
+        cm = ColourMap(x, y, z, dm, **kwargs)
+        cm.update_image(2)
+        cm.set_data(new)
+        ref = ColourMap(x, y, z, new, **kwargs)
+        ref.update_image(2)
+        assert numpy.array_equal(cm.get_dm(), ref.get_dm())
+        for key in ['minvals', 'maxvals']:
+            assert numpy.allclose(cm.mmsrc.data[key], ref.mmsrc.data[key])
+        assert numpy.array_equal(cm.datasrc.data['image'][0], ref.datasrc.data['image'][0])
+        assert (cm.cmap.low, cm.cmap.high) == (ref.cmap.low, ref.cmap.high)
+        assert list(cm.cmap.palette) == list(ref.cmap.palette)
+
+
+def test_ortho_sections():
+
+    x, y, z, dm = make_data()
+    ortho = ColourMapOrtho(x, y, z, dm)
+    ortho.set_position(1, 3, 2)
+
+    for panel, section in [(ortho.xzplot, dm[:, 3, :]), (ortho.yzplot, dm[:, :, 1])]:
+        assert numpy.array_equal(panel.get_dm(), section.ravel())
+        assert numpy.array_equal(panel.datasrc.data['image'][0], section)
+        assert numpy.isclose(panel.mmsrc.data['minvals'][0], section.min())
+        assert numpy.isclose(panel.mmsrc.data['maxvals'][0], section.max())
+
+
+def test_ortho_invalid_position():
+
+    x, y, z, dm = make_data()
+    ortho = ColourMapOrtho(x, y, z, dm)
+    ortho.set_position(1, 3, 2)
+
+    for inds in [(-1, 0, 0), (6, 0, 0), (0, 4, 0), (0, 0, 5), (0, 0, 1.5)]:
+        with pytest.raises(ValueError):
+            ortho.set_position(*inds)
+        assert ortho.get_position() == (1, 3, 2)  # Unchanged
+
+    ortho.set_position(numpy.int64(5), 0, 4)
+    assert ortho.get_position() == (5, 0, 4)
@@ -0,0 +1,56 @@
+"""
+Tests for symlog_transform and the symlog colour bar ticks
+"""
+
+import numpy
+
+from bokcolmaps.symlog_transform import symlog_transform
+from bokcolmaps.generate_colourbar import _get_symlog_ticks
+from bokcolmaps.CMSlicer3D import CMSlicer3D
+
+
+def test_inverse_round_trip():
+
+    d = numpy.array([-1e4, -3.0, -0.1, 0, 0.2, 7.0, 1e6])
+
+    t = symlog_transform(d, 2.0)
+
+    assert numpy.all(numpy.diff(t) > 0)
+    assert numpy.allclose(symlog_transform(t, 2.0, inverse=True), d)
+
+
+def test_ticks_small_range():
+
+    ticks = _get_symlog_ticks(0.5, 0.9, 1)
+
+    assert numpy.allclose(ticks, [0.5, 0.6, 0.7, 0.8, 0.9])
+
+
+def test_ticks_large_range():
+
+    ticks = _get_symlog_ticks(-1e6, 1e9, 1)
+
+    assert ticks.size <= 12
+    assert (ticks.min() >= -1e6) and (ticks.max() <= 1e9)
+    assert 0 in ticks
+    assert numpy.all(numpy.diff(ticks) > 0)
+
+
+def test_ticks_within_range():
+
+    for rmin, rmax, linthresh in [(2, 3000, 1), (-50, 50, 0.01), (-1e-4, 1e-4, 1e-5), (-7, -0.02, 1)]:
+        ticks = _get_symlog_ticks(rmin, rmax, linthresh)
+        assert 2 <= ticks.size <= 12
+        assert (ticks.min() >= rmin) and (ticks.max() <= rmax)
+
+
+def test_slicer_section_settings():
+
+    x, y, z = numpy.linspace(0, 1, 8), numpy.linspace(0, 1, 6), numpy.arange(4.0)
+    dm = numpy.random.default_rng(0).normal(size=(4, 6, 8)) * 100
+
+    slicer = CMSlicer3D(x, y, z, dm, cscale='symlog', linthresh=0.1, autoscale='global')
+    section = slicer.children[1].children[1].children[1]
+
+    assert section._linthresh == 0.1
+    assert section._automode == 'global'